@@ -1,41 +1,18 @@
 import io
+import os
 import sys
 import math
-import numpy as np
-import pandas as pd
 import streamlit as st
-import seaborn as sns
-import matplotlib.pyplot as plt
-from typing import Optional
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.importaciones import importar_diferido
+from utils import graficas, netflix
+
+# Seaborn/Matplotlib solo se necesitan despues de subir un CSV
+sns = importar_diferido("seaborn")
+plt = importar_diferido("matplotlib.pyplot")
  
 st.set_page_config(page_title="Netflix Data Dashboard", layout="wide")
  
-# ----------------------
-# Helpers
-# ----------------------
-@st.cache_data(show_spinner=False)
-def load_csv(file) -> pd.DataFrame:
-    return pd.read_csv(file)
- 
-def coerce_numeric_columns(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
-    # release_year -> numeric
-    if "release_year" in out.columns:
-        out["release_year_num"] = pd.to_numeric(out["release_year"], errors="coerce")
-    # duration -> numeric (minutes for Movies / seasons for TV Show)
-    if "duration" in out.columns:
-        extracted = out["duration"].astype(str).str.extract(r"(\d+)")[0]
-        out["duration_num"] = pd.to_numeric(extracted, errors="coerce")
-    return out
- 
-def count_by_year(df: pd.DataFrame, content_type: Optional[str] = None) -> pd.Series:
-    q = df
-    if content_type in ("Movie", "TV Show"):
-        q = q[q["type"] == content_type]
-    if "release_year_num" not in q.columns:
-        return pd.Series(dtype="int64")
-    return q["release_year_num"].dropna().astype(int).value_counts().sort_index()
- 
 # ----------------------
 # Sidebar
 # ----------------------
@@ -49,7 +26,7 @@ Si tu CSV tiene columnas diferentes, ajusta las opciones de columnas más abajo.
 st.sidebar.info(sample_notice, icon="ℹ️")
  
 pairplot_rows = st.sidebar.slider("Límite de filas para Pairplot (muestra aleatoria)", 200, 5000, 1000, step=100)
-show_reg = st.sidebar.checkbox("Agregar línea de regresión en scatter (regplot)", value=False)
+show_reg = st.sidebar.checkbox("Agregar línea de regresión en scatter", value=False)
 content_filter = st.sidebar.selectbox("Filtrar por tipo", ["Todos", "Movie", "TV Show"])
  
 # ----------------------
@@ -62,7 +39,8 @@ if uploaded is None:
     st.stop()
  
 try:
-    data = load_csv(uploaded)
+    # Parseo compartido por contenido: el mismo archivo subido por otra sesion ya esta en memoria
+    data = netflix.leer_subido(uploaded.getvalue())
 except Exception as e:
     st.error(f"No se pudo leer el CSV: {e}")
     st.stop()
@@ -77,45 +55,26 @@ with st.expander("⚙️ Mapear columnas (opcional)", expanded=False):
     duration_col = st.selectbox("Columna de duración", [None] + list(data.columns), index=(list(data.columns).index(default_duration_col)+1 if default_duration_col in data.columns else 0))
     type_col = st.selectbox("Columna de tipo (Movie / TV Show)", [None] + list(data.columns), index=(list(data.columns).index(default_type_col)+1 if default_type_col in data.columns else 0))
  
-# If user mapped different names, align to canonical ones
-data = data.copy()
-if release_col and release_col != "release_year":
-    data["release_year"] = data[release_col]
-if duration_col and duration_col != "duration":
-    data["duration"] = data[duration_col]
-if type_col and type_col != "type":
-    data["type"] = data[type_col]
- 
-df = coerce_numeric_columns(data)
- 
-if content_filter in ("Movie", "TV Show") and "type" in df.columns:
-    df_view = df[df["type"] == content_filter]
-else:
-    df_view = df
+# Columnas canonicas y *_num una vez por (archivo, mapeo); las vistas de cada tipo se
+# precalculan en segundo plano (ver utils/netflix.py)
+df = netflix.procesar(data, {"release_year": release_col, "duration": duration_col, "type": type_col})
+df_view = netflix.vista_por_tipo(df, content_filter)
+resumen = netflix.resumen(df_view)
  
 # ----------------------
 # KPIs
 # ----------------------
 left, mid, right = st.columns(3)
 with left:
-    total = len(df_view)
-    st.metric("Registros", f"{total:,}")
+    st.metric("Registros", f"{resumen['registros']:,}")
 with mid:
-    if "release_year_num" in df_view.columns:
-        years = df_view["release_year_num"].dropna()
-        if not years.empty:
-            st.metric("Rango de años", f"{int(years.min())} — {int(years.max())}")
-        else:
-            st.metric("Rango de años", "N/D")
+    if resumen["year_min"] is not None:
+        st.metric("Rango de años", f"{resumen['year_min']} — {resumen['year_max']}")
     else:
         st.metric("Rango de años", "N/D")
 with right:
-    if "duration_num" in df_view.columns:
-        d = df_view["duration_num"].dropna()
-        if not d.empty:
-            st.metric("Duración/Temporadas (mediana)", f"{np.median(d):.0f}")
-        else:
-            st.metric("Duración/Temporadas (mediana)", "N/D")
+    if resumen["duracion_mediana"] is not None:
+        st.metric("Duración/Temporadas (mediana)", f"{resumen['duracion_mediana']:.0f}")
     else:
         st.metric("Duración/Temporadas (mediana)", "N/D")
  
@@ -128,7 +87,7 @@ tab1, tab2, tab3, tab4 = st.tabs(["📈 Tendencias", "🧪 Pairplot", "🔗 Corr
 # ----------------------
 with tab1:
     st.subheader("Títulos por año de estreno")
-    counts = count_by_year(df_view, content_type=None if content_filter == "Todos" else content_filter)
+    counts = netflix.conteo_por_year(df_view)
     if counts.empty:
         st.info("No hay datos suficientes para esta vista.")
     else:
@@ -143,7 +102,7 @@ with tab1:
 # ----------------------
 with tab2:
     st.subheader("Relaciones entre columnas numéricas (pairplot)")
-    numeric_cols = df_view.select_dtypes(include="number").columns.tolist()
+    numeric_cols = netflix.columnas_numericas(df_view)
     if not numeric_cols:
         st.info("No hay columnas numéricas para mostrar. Asegúrate de haber convertido `release_year` y `duration`.")
     else:
@@ -152,9 +111,7 @@ with tab2:
             st.info("Selecciona al menos dos columnas.")
         else:
             # Sample to keep it lightweight
-            plot_df = df_view[sel].dropna()
-            if len(plot_df) > pairplot_rows:
-                plot_df = plot_df.sample(pairplot_rows, random_state=42)
+            plot_df = netflix.muestra(df_view, sel, pairplot_rows)
             with st.spinner("Generando pairplot..."):
                 g = sns.pairplot(plot_df, diag_kind="hist")
                 st.pyplot(g.fig, clear_figure=True)
@@ -164,11 +121,10 @@ with tab2:
 # ----------------------
 with tab3:
     st.subheader("Matriz de correlación")
-    numeric_df = df_view.select_dtypes(include="number").dropna(axis=1, how="all")
-    if numeric_df.empty or numeric_df.shape[1] < 2:
+    corr = netflix.correlacion(df_view)
+    if corr.empty:
         st.info("No hay suficientes columnas numéricas para calcular correlaciones.")
     else:
-        corr = numeric_df.corr(numeric_only=True)
         fig, ax = plt.subplots(figsize=(8, 6))
         sns.heatmap(corr, annot=True, fmt=".2f", cmap="coolwarm", ax=ax)
         st.pyplot(fig, clear_figure=True)
@@ -181,7 +137,7 @@ with tab4:
     if "release_year_num" not in df_view.columns:
         st.info("No existe `release_year_num`. Mapea y convierte primero la columna de año.")
     else:
-        numeric_cols = [c for c in df_view.select_dtypes(include="number").columns if c != "release_year_num"]
+        numeric_cols = [c for c in netflix.columnas_numericas(df_view) if c != "release_year_num"]
         if not numeric_cols:
             st.info("No hay columnas numéricas para comparar.")
         else:
@@ -190,13 +146,13 @@ with tab4:
             if plot_df.empty:
                 st.info("No hay datos suficientes para graficar.")
             else:
-                fig, ax = plt.subplots(figsize=(10, 4))
-                if show_reg:
-                    sns.regplot(x="release_year_num", y=ycol, data=plot_df, ax=ax, scatter_kws=dict(s=20, alpha=0.6))
-                else:
-                    sns.scatterplot(x="release_year_num", y=ycol, data=plot_df, ax=ax, s=20)
-                ax.set_xlabel("Año de estreno")
-                ax.set_ylabel(ycol)
-                st.pyplot(fig, clear_figure=True)
- 
-st.caption("Hecho con Streamlit • Seaborn • Matplotlib • Pandas")
+                # Plotly en el navegador (WebGL si hay muchas filas) en lugar de un PNG de matplotlib
+                fig = graficas.dispersion(
+                    plot_df, "release_year_num", ycol, regresion=show_reg,
+                    labels={"release_year_num": "Año de estreno"}, opacity=0.6, height=400
+                )
+                st.plotly_chart(fig, use_container_width=True)
+                if graficas.usar_webgl(len(plot_df)):
+                    st.caption(f"Modo WebGL: {len(plot_df):,} puntos")
+ 
+st.caption("Hecho con Streamlit • Seaborn • Matplotlib • Plotly • Pandas")
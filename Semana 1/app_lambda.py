@@ -1,46 +1,70 @@
 import pandas as pd 
 import streamlit as st
-import boto3
-import io
 import json
-import plotly.express as px
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.importaciones import importar_diferido
+from utils.datos import obtener_almacenamiento
+from utils import manifiesto
+
+px = importar_diferido("plotly.express")
+
+BUCKET = os.getenv("BUCKET_LAMBDA", "xideralaws-curso-yalbani")
+OUTPUT_PREFIX = "processed/"
 
 # --- Carga de Datos Procesados desde S3 ---
-@st.cache_data
-def cargar_datos_procesados():
-    s3 = boto3.client("s3")
-    bucket = "xideralaws-curso-yalbani"
-    OUTPUT_PREFIX = "processed/"
+@st.cache_data(ttl=600)
+def cargar_datos_procesados(version=None):
+    s3 = obtener_almacenamiento(BUCKET)
     
     try:
-        # Listar todos los archivos en la carpeta procesada
-        response = s3.list_objects_v2(Bucket=bucket, Prefix=OUTPUT_PREFIX)
-        
-        if "Contents" not in response:
-            st.warning("Lambda no ha ejecutado el procesamiento. No se encontraron archivos procesados.")
-            return pd.DataFrame()
+        if version is not None:
+            # Version anterior pedida desde el sidebar (utils/manifiesto.py)
+            latest_key = manifiesto.version(s3, OUTPUT_PREFIX, version)["key"]
+        else:
+            # El productor de processed/ no publica manifiestos: si alguien registro un archivo
+            # a mano, solo se usa mientras no haya un archivo mas nuevo en la carpeta. El
+            # listado ya trae el apuntador, asi que sin manifiesto no hay GET extra
+            listado = s3.listar(OUTPUT_PREFIX)
+            contenidos = [obj for obj in listado if "/_manifiesto/" not in obj["Key"]]
+            apuntador = [obj for obj in listado if obj["Key"] == manifiesto.key_actual(OUTPUT_PREFIX)]
+            if apuntador and all(obj["LastModified"] <= apuntador[0]["LastModified"] for obj in contenidos):
+                vigente = manifiesto.actual(s3, OUTPUT_PREFIX) or {}
+                contenidos = [obj for obj in contenidos if obj["Key"] == vigente.get("key")] or contenidos
             
-        # Encontrar el archivo mas reciente (timestamp mas alto)
-        all_files = response["Contents"]
-        # Filtrar solo archivos CSV si fuera necesario, y ordenar por la ultima modificacion
-        all_files = sorted(all_files, key=lambda x: x['LastModified'], reverse=True)
-        
-        # El archivo mas reciente es el primero
-        latest_key = all_files[0]['Key'] 
+            if not contenidos:
+                st.warning("Lambda no ha ejecutado el procesamiento. No se encontraron archivos procesados.")
+                return pd.DataFrame()
+                
+            # Encontrar el archivo mas reciente (timestamp mas alto)
+            all_files = sorted(contenidos, key=lambda x: x['LastModified'], reverse=True)
+            
+            # El archivo mas reciente es el primero
+            latest_key = all_files[0]['Key'] 
         
         # Leer el archivo mas reciente
         st.info(f"Cargando el ultimo archivo procesado: {latest_key.split('/')[-1]}")
-        obj = s3.get_object(Bucket=bucket, Key=latest_key)
-        body = obj["Body"].read()
-        
-        df_final = pd.read_csv(io.BytesIO(body))
+        df_final = pd.read_csv(s3.abrir(latest_key))
         return df_final
         
     except Exception as e:
         st.error(f"Error al cargar el CSV procesado desde S3: {e}")
         return pd.DataFrame() 
 
-df_analisis = cargar_datos_procesados()
+@st.cache_data(ttl=600)
+def listar_versiones():
+    return manifiesto.versiones(obtener_almacenamiento(BUCKET), OUTPUT_PREFIX)
+
+version_elegida = None
+if st.sidebar.checkbox("🕰️ Ver una versión anterior"):
+    numeros = listar_versiones()
+    if numeros:
+        version_elegida = st.sidebar.selectbox("Versión del manifiesto", numeros)
+    else:
+        st.sidebar.caption("Aun no hay manifiestos publicados.")
+
+df_analisis = cargar_datos_procesados(version_elegida)
 
 # --- Sidebar ---
 st.sidebar.header("Filtros")
@@ -59,7 +83,7 @@ total_peliculas = len(total_df) # No son peliculas, es el número de directores
 st.markdown("---")
 st.header("🎬 Top 5 Directores de Netflix (Procesado por Lambda)")
 
-df_directores = cargar_datos_procesados()
+df_directores = df_analisis
 
 if not df_directores.empty:  
     df_top_5 = df_directores.head(5) 
@@ -1,61 +1,47 @@
 # --- Imports ---
-import pandas as pd 
 import streamlit as st
-import plotly.express as px 
-import matplotlib.pyplot as plt
-import boto3
-import json
 from io import StringIO
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils import almacen_arrow
+from utils.datos import obtener_almacenamiento
+from utils import servidores, agregacion, graficas
 
 # --- Config ---
 st.set_page_config(page_title="Monitor de STATUS de Servidores", layout="wide")
-@st.cache_data
 
 # --- Carga de Datos desde S3 (Función Corregida) ---
+BUCKET_SERVIDORES = os.getenv("BUCKET_SERVIDORES", "xideralaws-curso-benjamin2")
+
 @st.cache_data
 def carga_datos():
-    bucket_name = "xideralaws-curso-benjamin2"
-    s3 = boto3.client("s3")
-    prefix = "raw/"
-    response = s3.list_objects_v2(Bucket=bucket_name , Prefix=prefix)
-    data_frames = []
-    
-    if "Contents" in response:
-        for obj in response["Contents"]:
-            key = obj["Key"]
-            if key.endswith(".json"):
-                file_obj = s3.get_object(Bucket=bucket_name, Key=key)
-                content = file_obj["Body"].read().decode("utf-8")
-                json_data = json.loads(content)
-                df_temp = pd.json_normalize(json_data)
-                data_frames.append(df_temp)
-
-    if data_frames:
-        df = pd.concat(data_frames , ignore_index=True)
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
-    else:
-        expected_cols = [
-            'timestamp', 
-            'server_id', 
-            'status', 
-            'cpu_usage', 
-            'memory_usage', 
-            'disk_usage', 
-            'region'
-        ]
-        df = pd.DataFrame(columns=expected_cols)
-
-    return df
+    s3 = obtener_almacenamiento(BUCKET_SERVIDORES)
+    return servidores.construir_df(s3, [obj["Key"] for obj in servidores.listar_snapshots(s3)])
+
+@st.cache_resource(ttl=600)
+def carga_datos_mapeados():
+    # Con ARROW_DIR: un solo archivo Arrow por version de los snapshots, compartido via mmap
+    s3 = obtener_almacenamiento(BUCKET_SERVIDORES)
+    objetos = servidores.listar_snapshots(s3)
+    version = almacen_arrow.version_de(*(f"{obj['Key']}:{obj.get('ETag')}" for obj in objetos))
+    return almacen_arrow.obtener_o_construir(
+        "servidores/raw", version, lambda: servidores.construir_df(s3, [obj["Key"] for obj in objetos])
+    )
 
 # --- Procesamiento de Datos ---
-df = carga_datos()   
+df = carga_datos_mapeados() if almacen_arrow.activo() else carga_datos()
 
 # --- Sidebar ---
 st.sidebar.header("Filtros")
 status = st.sidebar.multiselect("Status disponibles", options=df['status'].unique(), default=df['status'].unique())
 server = st.sidebar.multiselect("Servidores analizados", options=df['server_id'].unique(), default=df['server_id'].unique())
  
-filtered_df = df[(df['status'].isin(status)) & (df['server_id'].isin(server))]
+nivel_detalle = st.sidebar.select_slider(
+    "Nivel de detalle", options=list(agregacion.NIVELES_DETALLE), value=agregacion.NIVEL_DEFAULT
+)
+ 
+filtered_df = servidores.filtrar(df, status, server)
  
 # --- KPIs ---
 total_estados = len(filtered_df)
@@ -95,41 +81,43 @@ st.markdown("---")
 
 # --- Gráficos ---
 st.header("Distribucion total de los estados en todos los servidores disponibles")
-estados_count = df['status'].value_counts()
-fig1 = px.pie(
-    estados_count,
-    values = estados_count.values,
-    names = estados_count.index,
-    title = "Estados en servidores",
-    color_discrete_map={'ERROR':'red', 'WARN':'yellow', 'OK':'green'}
-
-)
+fig1 = servidores.figura_estados(df)
 st.plotly_chart(fig1)
  
 st.header("Uso Promedio de Recursos")
 
 if not filtered_df.empty:
     # Calcular el promedio de los datos a analizar
-    usage_cols = ['cpu_usage', 'memory_usage', 'disk_usage']
-    mean_usage = filtered_df[usage_cols].mean()
-
-    usage_df = mean_usage.reset_index()
-    usage_df.columns = ['Recurso', 'Uso Promedio']
-    usage_df['Uso Promedio'] = usage_df['Uso Promedio'].round(2)
-
-    fig2 = px.bar(
-        usage_df,
-        x='Recurso',
-        y='Uso Promedio',
-        title="Uso Promedio de CPU, Memoria y Disco (en %)",
-        color='Recurso',
-        text='Uso Promedio' # valor en la barra
-    )
-    fig2.update_yaxes(range=[0, 100])
+    usage_df = servidores.uso_promedio(filtered_df)
+    fig2 = servidores.figura_uso(usage_df)
     st.plotly_chart(fig2, use_container_width=True)
 else:
     st.warning("No hay datos para calcular el Uso Promedio de Recursos.")
 
+# --- Uso en el tiempo (promedio por intervalo, calculado en el servidor) ---
+st.header("Uso de Recursos en el Tiempo")
+if not filtered_df.empty:
+    uso_tiempo = agregacion.agregar_por_tiempo(
+        filtered_df, 'timestamp', servidores.USO_COLS, agregacion.max_puntos(nivel_detalle)
+    )
+    st.plotly_chart(servidores.figura_uso_tiempo(uso_tiempo), use_container_width=True)
+
+# --- CPU por servidor (todas las lecturas; WebGL + LTTB cuando son muchas) ---
+st.header("CPU por Servidor")
+if not filtered_df.empty:
+    fig_cpu = graficas.serie_temporal(
+        filtered_df, 'timestamp', 'cpu_usage', color='server_id',
+        max_puntos=agregacion.max_puntos(nivel_detalle),
+        title="Uso de CPU por servidor (%)",
+        labels={'cpu_usage': 'CPU (%)', 'timestamp': 'Tiempo', 'server_id': 'Servidor'}
+    )
+    st.plotly_chart(fig_cpu, use_container_width=True)
+
 # --- Detalle Servidores ---
 st.markdown("### 👀 Detalle de Servidores")
-st.dataframe(filtered_df[['timestamp', 'server_id', 'cpu_usage', 'memory_usage', 'disk_usage', 'region', 'status']])
\ No newline at end of file
+# Solo los registros mas recientes viajan al navegador
+max_filas = agregacion.max_puntos(nivel_detalle)
+detalle = filtered_df.nlargest(max_filas, 'timestamp') if len(filtered_df) > max_filas else filtered_df
+if len(detalle) < len(filtered_df):
+    st.caption(f"Mostrando los {len(detalle):,} registros más recientes de {len(filtered_df):,}.")
+st.dataframe(detalle[['timestamp', 'server_id', 'cpu_usage', 'memory_usage', 'disk_usage', 'region', 'status']])
\ No newline at end of file
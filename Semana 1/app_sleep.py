@@ -1,8 +1,13 @@
 # --- Imports ---
 import pandas as pd 
 import streamlit as st
-import plotly.express as px 
-import matplotlib.pyplot as plt
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.importaciones import importar_diferido
+from utils.crossfilter import Crossfilter, TODAS
+
+px = importar_diferido("plotly.express")
 
 # --- Config ---
 st.set_page_config(page_title="Lifestyle and Sleep Pattern Dashboard", layout="wide")
@@ -11,25 +16,95 @@ st.set_page_config(page_title="Lifestyle and Sleep Pattern Dashboard", layout="w
 def load_data():
     return pd.read_csv("Sleep_health_and_lifestyle_dataset.csv")
  
-df = load_data()
+# --- Crossfilter ---
+# Cada grafica agrupa por una dimension; seleccionar barras/puntos filtra a las demas.
+# Los filtros del sidebar y las selecciones de las graficas son dimensiones separadas.
+DIMENSIONES = {
+    "genero": "Gender",
+    "estres": "Stress Level",
+    "ocupacion": "Occupation",
+    "estres_grafica": "Stress Level",
+}
+MEDIDAS = ["Heart Rate", "Quality of Sleep", "Sleep Duration"]
+COLOR_BASE = "#636efa"
+COLOR_SELECCION = "#ff7f2a"
+COLOR_FUERA = "rgba(150, 150, 150, 0.35)"
+
+
+@st.cache_resource(show_spinner=False)
+def crossfilter_base():
+    """Indices y grupos iniciales, una vez por proceso; cada sesion clona su estado"""
+    base = Crossfilter(load_data(), DIMENSIONES, MEDIDAS)
+    base.grupo("ocupacion")
+    base.grupo("ritmo", "ocupacion", medida="Heart Rate")
+    base.grupo("estres_grafica")
+    base.grupo("calidad", "estres_grafica", medida="Quality of Sleep")
+    base.grupo("total", TODAS, medida="Sleep Duration")
+    base.grupo("niveles_estres", "estres", ignorar_propio=False)
+    return base
+
+
+def crossfilter_sesion():
+    if "crossfilter" not in st.session_state:
+        st.session_state.crossfilter = crossfilter_base().clonar()
+        st.session_state.ronda_seleccion = 0
+    return st.session_state.crossfilter
+
+
+def _seleccionar(key, dimension):
+    """Callback de una grafica: sus puntos seleccionados se vuelven el filtro de `dimension`"""
+    puntos = st.session_state[key]["selection"]["points"]
+    categorias = st.session_state[f"{key}:categorias"]
+    elegidas = [categorias[p["point_index"]] for p in puntos if p.get("point_index") is not None]
+    crossfilter_sesion().filtrar(dimension, elegidas or None)
+
+
+def grafica_enlazada(fig, nombre, dimension, categorias):
+    """st.plotly_chart seleccionable (clic, caja o lazo) que filtra `dimension`"""
+    key = f"{nombre}:{st.session_state.ronda_seleccion}"
+    # point_index -> categoria, en el orden en que se dibujaron
+    st.session_state[f"{key}:categorias"] = list(categorias)
+    st.plotly_chart(
+        fig, use_container_width=True, key=key,
+        on_select=lambda: _seleccionar(key, dimension), selection_mode=("points", "box", "lasso")
+    )
+
+
+def colores(categorias, dimension):
+    """Resalta las categorias seleccionadas en `dimension` (sin seleccion, todas igual)"""
+    elegidas = cf.filtro(dimension)
+    if elegidas is None:
+        return [COLOR_BASE] * len(categorias)
+    return [COLOR_SELECCION if c in elegidas else COLOR_FUERA for c in categorias]
+
+
+cf = crossfilter_sesion()
+df = cf.df
  
 # --- Sidebar ---
 st.sidebar.header("Filtros")
 gender_filter = st.sidebar.multiselect("Genero", options=df['Gender'].unique(), default=df['Gender'].unique())
 stress_filter = st.sidebar.multiselect("Nivel de estres!", options=df['Stress Level'].unique(), default=df['Stress Level'].unique())
- 
-filtered_df = df[(df['Gender'].isin(gender_filter)) & (df['Stress Level'].isin(stress_filter))]
+# Solo se actualizan las filas de las categorias que entran o salen del filtro
+cf.filtrar("genero", gender_filter)
+cf.filtrar("estres", stress_filter)
+
+if st.sidebar.button("Limpiar selección de las gráficas"):
+    cf.filtrar("ocupacion", None)
+    cf.filtrar("estres_grafica", None)
+    # Graficas nuevas (otra key) para que tambien se borre la seleccion dibujada
+    st.session_state.ronda_seleccion += 1
+st.sidebar.caption("Haz clic en las barras o puntos (o selecciona con caja/lazo) para filtrar las demás gráficas.")
  
 # --- KPIs ---
-total_muestra = len(filtered_df)
-avg_sleep_duration = filtered_df['Sleep Duration'].mean()
-stress_level = filtered_df['Stress Level'].nunique()
+total_muestra, avg_sleep_duration = cf.total("total")
+stress_level = len(cf.reduccion("niveles_estres"))
  
 st.title("🧠 Lifestyle and Sleep Pattern Dashboard")
  
 col1, col2, col3 = st.columns(3)
 col1.metric("Personas Totales", total_muestra)
-col2.metric("Promedio de Duracion de Sueño", f"{avg_sleep_duration:.1f}")
+col2.metric("Promedio de Duracion de Sueño", f"{avg_sleep_duration:.1f}" if avg_sleep_duration is not None else "N/D")
 col3.metric("Nivel de estrés promedio", stress_level)
  
 st.markdown("---")
@@ -38,36 +113,41 @@ st.markdown("---")
 col1, col2 = st.columns(2)
  
 with col1:
-    fig1 = px.bar(filtered_df['Occupation'].value_counts(), title="Ocupación de los Participantes", labels={'index':'Ocupacion', 'value':'Cantidad'})
-    st.plotly_chart(fig1, use_container_width=True)
+    ocupaciones = cf.reduccion("ocupacion").sort_values("conteo", ascending=False)
+    fig1 = px.bar(ocupaciones, x="categoria", y="conteo", title="Ocupación de los Participantes", labels={'categoria':'Ocupacion', 'conteo':'Cantidad'})
+    fig1.update_traces(marker_color=colores(ocupaciones["categoria"], "ocupacion"))
+    grafica_enlazada(fig1, "grafica_ocupacion", "ocupacion", ocupaciones["categoria"])
  
 with col2:
-    fig2 = px.pie(filtered_df, names='Stress Level', title="Distribución por nivel de estrés")
+    niveles = cf.reduccion("estres_grafica")
+    elegidos = cf.filtro("estres_grafica") or []
+    fig2 = px.pie(niveles, names="categoria", values="conteo", title="Distribución por nivel de estrés")
+    # Los niveles seleccionados (en la grafica de calidad de sueño) se separan del pastel
+    fig2.update_traces(pull=[0.1 if n in elegidos else 0 for n in niveles["categoria"]])
     st.plotly_chart(fig2, use_container_width=True)
  
  
 # --- Top Ritmo Cardiaco ---
 st.markdown("### ⭐ Top 10 ocupaciones con más alto ritmo cardiaco ")
-# Lógica de Pandas para obtener el Top 10
-heart_occupation = df.groupby('Occupation')['Heart Rate'].mean().sort_values(ascending=False)
-top10_heart = heart_occupation.head(10)
+# Promedio por ocupacion sobre las filas filtradas (reduccion incremental, no groupby)
+top10_heart = cf.reduccion("ritmo").dropna(subset=["promedio"]).nlargest(10, "promedio")
 # Ordenar de menor a mayor para que el top 1 quede arriba en el gráfico horizontal
-top10_sorted = top10_heart.sort_values(ascending=True)
-top10_df = top10_sorted.reset_index()
-top10_df.columns = ['Occupation', 'Ritmo Cardiaco Promedio']
+top10_df = top10_heart.sort_values("promedio", ascending=True)
+top10_df = top10_df.rename(columns={"categoria": "Occupation", "promedio": "Ritmo Cardiaco Promedio"})
 fig3 = px.bar(top10_df, x='Ritmo Cardiaco Promedio', y='Occupation', orientation='h', title="Ritmo Cardíaco Promedio por Ocupación (Descendente)")
-st.plotly_chart(fig3, use_container_width=True)
+fig3.update_traces(marker_color=colores(top10_df["Occupation"], "ocupacion"))
+grafica_enlazada(fig3, "grafica_ritmo", "ocupacion", top10_df["Occupation"])
 
 # --- Top Ritmo Cardiaco ---
 st.markdown("### 📉 Relación: Estrés vs. Calidad de Sueño Promedio")
-stress_quality_data = df.groupby('Stress Level')['Quality of Sleep'].mean().sort_index(ascending=True)
-stress_quality_df = stress_quality_data.reset_index()
-stress_quality_df.columns = ['Nivel de Estrés', 'Calidad de Sueño Promedio']
+stress_quality_df = cf.reduccion("calidad").sort_values("categoria")
+stress_quality_df = stress_quality_df.rename(columns={"categoria": "Nivel de Estrés", "promedio": "Calidad de Sueño Promedio"})
 fig4 = px.line(stress_quality_df, x='Nivel de Estrés', y='Calidad de Sueño Promedio', title="Calidad de Sueño Promedio por Nivel de Estrés", markers=True) # Añade puntos a la línea
+fig4.update_traces(marker=dict(size=12, color=colores(stress_quality_df["Nivel de Estrés"], "estres_grafica")))
 # Mejorar eje X como números enteros (niveles de estrés)
 fig4.update_xaxes(dtick=1)
-st.plotly_chart(fig4, use_container_width=True)
+grafica_enlazada(fig4, "grafica_calidad", "estres_grafica", stress_quality_df["Nivel de Estrés"])
 
 # --- Detalle Participantes ---
 st.markdown("### 👀 Detalle de Participantes")
-st.dataframe(filtered_df[['Age', 'Gender', 'Occupation', 'Sleep Duration', 'Quality of Sleep', 'Stress Level', 'Sleep Disorder']])
+st.dataframe(cf.filtrado(['Age', 'Gender', 'Occupation', 'Sleep Duration', 'Quality of Sleep', 'Stress Level', 'Sleep Disorder']))
@@ -1,27 +1,35 @@
 import pandas as pd 
 import streamlit as st
-import boto3
-import io
-import plotly.express as px
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.importaciones import importar_diferido
+from utils.datos import obtener_almacenamiento
+from utils import compresion, manifiesto
+
+px = importar_diferido("plotly.express")
 
 st.set_page_config(layout="wide")
 
+BUCKET = os.getenv("BUCKET_LAMBDA", "xideralaws-curso-yalbani")
+AGREGADOS_PREFIX = "db_export/agregados/"
+CDC_PREFIX = "db_export/cdc/"
+
 # --- Carga de Datos desde S3 ---
 @st.cache_data
 def cargar_datos_procesados():
-    s3 = boto3.client("s3")
-    bucket = "xideralaws-curso-yalbani"
+    s3 = obtener_almacenamiento(BUCKET)
     OUTPUT_PREFIX = "db_export/" 
     
     try:
-        response = s3.list_objects_v2(Bucket=bucket, Prefix=OUTPUT_PREFIX)
+        contenidos = s3.listar(OUTPUT_PREFIX)
         
-        if "Contents" not in response:
+        if not contenidos:
             st.warning("La función Lambda aun no ha subido datos. No se encontraron archivos. CHECALO!")
             return pd.DataFrame()
             
         all_files = [
-            f for f in response["Contents"] 
+            f for f in contenidos 
             if f['Key'].endswith('.csv') and f['Size'] > 0
         ]
         
@@ -33,22 +41,74 @@ def cargar_datos_procesados():
         latest_key = all_files[0]['Key'] 
         
         st.info(f"Cargando el ultimo archivo: {latest_key.split('/')[-1]}")
-        obj = s3.get_object(Bucket=bucket, Key=latest_key)
-        body = obj["Body"].read()
-        
-        df_final = pd.read_csv(io.BytesIO(body))
+        df_final = pd.read_csv(s3.abrir(latest_key))
         return df_final
         
     except Exception as e:
         st.error(f" Error al cargar el CSV desde S3. Verifica el bucket. {e}")
         return pd.DataFrame() 
 
-df_analisis = cargar_datos_procesados()
+def resolver(s3, prefix, version=None):
+    # --- Un GET al manifiesto (o a una version anterior si se pide) ---
+    if version is None:
+        return manifiesto.actual(s3, prefix)
+    return manifiesto.version(s3, prefix, version)
+
+@st.cache_data(ttl=600)
+def cargar_agregados(version=None):
+    # --- Export en Parquet (lambdas/exportar_mysql.py): solo el conteo por ciudad y la muestra ---
+    s3 = obtener_almacenamiento(BUCKET)
+    vigente = resolver(s3, AGREGADOS_PREFIX, version)
+    if vigente is None:
+        return None
+    df_conteo = compresion.leer_csv(s3, vigente["key"])
+    df_muestra = compresion.leer_csv(s3, vigente["muestra"])
+    return {"filas": vigente["filas"], "fecha": vigente["fecha"]}, df_conteo, df_muestra
+
+@st.cache_data(ttl=600)
+def cargar_cdc(version=None):
+    # --- Export incremental: conteo del snapshot + cambios por ciudad de cada delta y la muestra ---
+    # Solo CSV chicos que mantiene la Lambda; nunca se leen los Parquet
+    s3 = obtener_almacenamiento(BUCKET)
+    vigente = resolver(s3, CDC_PREFIX, version)
+    if vigente is None or not vigente.get("muestra"):
+        # Manifiestos de antes de los conteos: hace falta un `--modo compactar`
+        return None
+    conteos = []
+    if vigente.get("conteo"):
+        conteos.append(compresion.leer_csv(s3, vigente["conteo"]))
+    for cambio in vigente.get("cambios", []):
+        conteos.append(compresion.leer_csv(s3, cambio["conteo"]).rename(columns={'cambio': 'Total Personas'}))
+    df_conteo = pd.DataFrame(columns=['ciudad', 'Total Personas'])
+    if conteos:
+        df_conteo = pd.concat(conteos, ignore_index=True).groupby('ciudad', as_index=False)['Total Personas'].sum()
+        df_conteo = df_conteo[df_conteo['Total Personas'] > 0]
+    df_muestra = compresion.leer_csv(s3, vigente["muestra"])
+    resumen = {"filas": vigente["filas"], "fecha": vigente["creado"][:10]}
+    return resumen, df_conteo, df_muestra
+
+@st.cache_data(ttl=600)
+def prefijo_fuente():
+    # La exportacion (completa o incremental) publicada mas recientemente
+    s3 = obtener_almacenamiento(BUCKET)
+    candidatos = []
+    for prefix in (CDC_PREFIX, AGREGADOS_PREFIX):
+        vigente = manifiesto.actual(s3, prefix)
+        if vigente is not None:
+            candidatos.append((vigente["creado"], prefix))
+    return max(candidatos)[1] if candidatos else AGREGADOS_PREFIX
+
+@st.cache_data(ttl=600)
+def listar_versiones(prefix):
+    # Solo se lista la carpeta de manifiestos cuando el usuario pide ver versiones anteriores
+    return manifiesto.versiones(obtener_almacenamiento(BUCKET), prefix)
 
 # --- Funciones de Detalle ---
-def get_head_and_tail(dataframe):
+def get_head_and_tail(dataframe, total=None):
     # --- Devuelve las primeras filas y las ultimas filas. ---
-    if dataframe.shape[0] <= 10:
+    # `total`: filas reales cuando `dataframe` ya es la muestra (5 primeras + 5 ultimas)
+    total = dataframe.shape[0] if total is None else total
+    if total <= 10:
         return dataframe
     else:
         df_head = dataframe.head(5)
@@ -57,13 +117,37 @@ def get_head_and_tail(dataframe):
         return pd.concat([df_head, separator, df_tail], ignore_index=True)
 
 
+# --- Fuente: export incremental (CDC) si existe, si no la ultima exportacion completa ---
+fuente_prefix = prefijo_fuente()
+cargar_fuente = cargar_cdc if fuente_prefix == CDC_PREFIX else cargar_agregados
+
+version_elegida = None
+if st.sidebar.checkbox("🕰️ Ver una versión anterior"):
+    numeros = listar_versiones(fuente_prefix)
+    if numeros:
+        version_elegida = st.sidebar.selectbox("Versión del manifiesto", numeros)
+
+agregados = cargar_fuente(version_elegida)
+if agregados is not None:
+    resumen, df_conteo, df_muestra = agregados
+    total_registros = resumen["filas"]
+    st.info(f"Cargando la exportacion del {resumen['fecha']} ({total_registros:,} registros)")
+else:
+    # Exportaciones viejas: CSV completo
+    df_analisis = cargar_datos_procesados()
+    df_conteo = pd.DataFrame()
+    if not df_analisis.empty:
+        df_conteo = df_analisis.groupby('ciudad').size().reset_index(name='Total Personas')
+    df_muestra = df_analisis
+    total_registros = len(df_analisis)
+
+
 # --- KPIs ---
 st.header("📊 Analisis de Personas por Ciudad (Datos MySQL a S3)")
 
-if not df_analisis.empty:
+if not df_conteo.empty:
     
     # Conteo por Ciudad
-    df_conteo = df_analisis.groupby('ciudad').size().reset_index(name='Total Personas')
     df_conteo = df_conteo.sort_values('Total Personas', ascending=False)
 
     # --- Sidebar ---
@@ -80,7 +164,7 @@ if not df_analisis.empty:
     df_filtrado = df_conteo[df_conteo['Total Personas'] >= min_personas_filter]
 
     col1, col2 = st.columns(2)
-    col1.metric("Total de Registros en la DB", len(df_analisis))
+    col1.metric("Total de Registros en la DB", total_registros)
     col2.metric("Ciudades que Cumplen el Filtro", len(df_filtrado))
 
     st.markdown("---")
@@ -107,5 +191,4 @@ if not df_analisis.empty:
     st.markdown("---")
     st.subheader("👀 Muestra de Registros Extraidos (Head & Tail)")
     
-    df_muestra = get_head_and_tail(df_analisis)
-    st.dataframe(df_muestra, use_container_width=True)
\ No newline at end of file
+    st.dataframe(get_head_and_tail(df_muestra, total_registros), use_container_width=True)
\ No newline at end of file
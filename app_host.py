@@ -0,0 +1,31 @@
+"""Host multipagina: corre todos los dashboards del repositorio en un solo proceso.
+
+Todas las paginas comparten el cliente S3 (un solo pool de conexiones), la cache
+de datasets de utils/datos.py y los modulos ya calentados.
+
+Uso:
+    streamlit run app_host.py
+    python -m utils.arranque app_host.py --server.port=8501
+"""
+import streamlit as st
+
+from utils.importaciones import calentar_en_segundo_plano
+
+calentar_en_segundo_plano()
+
+paginas = {
+    "Proyecto Final": [
+        st.Page("app_proyecto.py", title="Mundial 2026", icon="🏆", url_path="mundial", default=True),
+    ],
+    "Semana 1": [
+        st.Page("Semana 1/app.py", title="Netflix", icon="📺", url_path="netflix"),
+        st.Page("Semana 1/app_servers.py", title="Servidores", icon="🚦", url_path="servidores"),
+        st.Page("Semana 1/app_sleep.py", title="Sueño y Estilo de Vida", icon="🧠", url_path="sueno"),
+        st.Page("Semana 1/app_lambda.py", title="Directores (Lambda)", icon="🎬", url_path="directores"),
+    ],
+    "Semana 2": [
+        st.Page("Semana 2/app_lambda_mysql.py", title="MySQL a S3", icon="📊", url_path="mysql"),
+    ],
+}
+
+st.navigation(paginas).run()
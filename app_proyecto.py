@@ -1,36 +1,39 @@
 import pandas as pd
 import streamlit as st
-import boto3
-import io
-import plotly.express as px
-import plotly.graph_objects as go
 import os
 from dotenv import load_dotenv
+from utils.importaciones import importar_diferido, calentar_en_segundo_plano
+from utils.metricas import medir, cronometrar, iniciar_seccion, FigurasMedidas, panel_admin
+from utils import mundial, agregacion, cubo, busqueda, resultados
+from utils.almacenamiento import backend_configurado
+from utils.datos import obtener_almacenamiento, cargar_varios_csv_refrescados
+
+# Modulos pesados: se importan hasta que una seccion los usa
+# (FigurasMedidas registra cuanto tarda en construirse cada figura)
+px = FigurasMedidas(importar_diferido("plotly.express"))
+calentar_en_segundo_plano()
 
 # Cargar variables de entorno
 load_dotenv()
 # ==========================================
-# CONFIGURACIÓN DE AWS
+# CONFIGURACIÓN DE ALMACENAMIENTO
 # ==========================================
+# ALMACENAMIENTO_BACKEND=local|memoria permite correr sin AWS (ver utils/almacenamiento.py)
+backend = backend_configurado()
 aws_key = os.getenv('AWS_ACCESS_KEY_ID', '')
 aws_secret = os.getenv('AWS_SECRET_ACCESS_KEY', '')
-aws_region = os.getenv('AWS_DEFAULT_REGION', 'us-west-1')
 
-if not aws_key or not aws_secret:
+if backend == "s3" and (not aws_key or not aws_secret):
     st.error("❌ CREDENCIALES DE AWS NO ENCONTRADAS")
     st.error("Verifica que las variables de entorno estén configuradas correctamente")
     st.stop()
 
 try:
-    s3_client = boto3.client(
-        's3',
-        aws_access_key_id=aws_key,
-        aws_secret_access_key=aws_secret,
-        region_name=aws_region
-    )
-    st.sidebar.success("✅ Cliente S3 listo!")
+    # Almacenamiento compartido por todas las paginas del proceso (ver app_host.py)
+    obtener_almacenamiento(os.getenv("BUCKET_MUNDIAL", "xideralaws-curso-yalbani"))
+    st.sidebar.success("✅ Cliente S3 listo!" if backend == "s3" else f"✅ Almacenamiento {backend} listo!")
 except Exception as e:
-    st.error(f"❌ Error al configurar cliente S3: {e}")
+    st.error(f"❌ Error al configurar el almacenamiento: {e}")
     st.stop()
 
 # ==========================================
@@ -105,41 +108,85 @@ div[data-testid="stMetricValue"] {
 # ==========================================
 # CARGA DESDE S3
 # ==========================================
-@st.cache_data(ttl=600)
-def cargar_csv_desde_s3(bucket, key):
-    """Carga un archivo CSV desde S3 con cache"""
-    try:
-        obj = s3_client.get_object(Bucket=bucket, Key=key)
-        body = obj["Body"].read()
-        return pd.read_csv(io.BytesIO(body))
-    except Exception as e:
-        st.error(f"❌ Error al cargar {key}: {e}")
-        st.error(f"Bucket: {bucket}, Key: {key}")
-        return pd.DataFrame()
+def mostrar_grafica(fig, etapa, **kwargs):
+    """st.plotly_chart con medicion del tiempo de serializacion/envio"""
+    with medir(f"{etapa}:plotly_chart"):
+        st.plotly_chart(fig, **kwargs)
+
+def mostrar_tabla(datos, **kwargs):
+    """st.dataframe con medicion (incluye el render del Styler)"""
+    with medir("tabla:dataframe"):
+        st.dataframe(datos, **kwargs)
+
+@cronometrar("s3_y_parseo")
+def cargar_csvs_desde_s3(bucket, keys, intervalos=None, derivados=None):
+    """Devuelve los DataFrames en el mismo orden que `keys`.
+
+    Se sirven desde memoria y un hilo de fondo los recarga antes de que venzan
+    (stale-while-revalidate): solo la primera carga del proceso espera a S3.
+    """
+    # Con ARROW_DIR, los datasets se comparten entre sesiones via mmap (sin copia por sesion)
+    datasets, errores = cargar_varios_csv_refrescados(bucket, tuple(keys), intervalos, derivados)
+    if errores:
+        # Los datasets que fallaron se reintentan cuando vence su backoff
+        for key, error in errores.items():
+            st.error(f"❌ Error al cargar {key}: {error}")
+            st.error(f"Bucket: {bucket}, Key: {key}")
+    return [datasets.get(key, pd.DataFrame()) for key in keys]
         
 # ==========================================
 # CONFIGURACIÓN S3
 # ==========================================
-BUCKET = "xideralaws-curso-yalbani"
+BUCKET = os.getenv("BUCKET_MUNDIAL", "xideralaws-curso-yalbani")
 PREFIX = "datos_limpios/"
 PREFIX_LAMBDA = "datos_limpios/lambda/"
+# Salidas opcionales de la Lambda (lambdas/procesar_mundial.py)
+KEY_CUBO = f"{PREFIX_LAMBDA}cubo_resultados.csv"
+KEY_PERFILES = f"{PREFIX_LAMBDA}perfiles_jugadores.csv"
+# Segundos entre refrescos en segundo plano: las salidas de la Lambda cambian mas seguido
+INTERVALOS_REFRESCO = {
+    PREFIX: int(os.getenv("REFRESCO_INTERVALO", "600")),
+    PREFIX_LAMBDA: int(os.getenv("REFRESCO_INTERVALO_LAMBDA", "300")),
+}
+# Columnas derivadas que se calculan una vez por version del dataset, no en cada rerun
+DERIVADOS = {
+    f"{PREFIX}df_conteo_goles.csv": mundial.preparar_goles,
+    KEY_CUBO: cubo.compactar,
+}
 
 # ==========================================
 # CARGAR DATOS
 # ==========================================
+iniciar_seccion("carga")
 with st.spinner("🔄 Cargando datos desde S3..."):
-    # Datos asistencia y estadios
-    df_asistencia = cargar_csv_desde_s3(BUCKET, f"{PREFIX}tabla_final.csv")
-    df_estadios = cargar_csv_desde_s3(BUCKET, f"{PREFIX}df_grafica_individual.csv")
-    df_resumen_paises = cargar_csv_desde_s3(BUCKET, f"{PREFIX}tabla_ordenada_max.csv")
-    df_victorias = cargar_csv_desde_s3(BUCKET, f"{PREFIX}df_analisis_victoria.csv")
-    df_goles = cargar_csv_desde_s3(BUCKET, f"{PREFIX}df_conteo_goles.csv")
-    df_proyeccion = cargar_csv_desde_s3(BUCKET, f"{PREFIX}df_proyeccion_financiera.csv")
-    
-    # Datos de jugadores
-    df_top50_paises = cargar_csv_desde_s3(BUCKET, f"{PREFIX_LAMBDA}analisis_top_50_ga_paises.csv")
-    df_goleadores_top3 = cargar_csv_desde_s3(BUCKET, f"{PREFIX_LAMBDA}analisis_goleadores_top_3.csv")
-    df_top10_paises_goleadores = cargar_csv_desde_s3(BUCKET, f"{PREFIX_LAMBDA}analisis_top_10_paises_goleadores.csv")
+    # La primera carga del proceso baja todos los datasets a la vez (pool del refrescador, utils/refresco.py)
+    (
+        # Datos asistencia y estadios
+        df_asistencia,
+        df_estadios,
+        df_resumen_paises,
+        df_victorias,
+        df_goles,
+        df_proyeccion,
+        # Datos de jugadores
+        df_top50_paises,
+        df_goleadores_top3,
+        df_top10_paises_goleadores,
+    ) = cargar_csvs_desde_s3(BUCKET, [
+        f"{PREFIX}tabla_final.csv",
+        f"{PREFIX}df_grafica_individual.csv",
+        f"{PREFIX}tabla_ordenada_max.csv",
+        f"{PREFIX}df_analisis_victoria.csv",
+        f"{PREFIX}df_conteo_goles.csv",
+        f"{PREFIX}df_proyeccion_financiera.csv",
+        f"{PREFIX_LAMBDA}analisis_top_50_ga_paises.csv",
+        f"{PREFIX_LAMBDA}analisis_goleadores_top_3.csv",
+        f"{PREFIX_LAMBDA}analisis_top_10_paises_goleadores.csv",
+    ], INTERVALOS_REFRESCO, DERIVADOS)
+    # Si la Lambda aun no las genera, la seccion de goles usa los CSV precalculados y no hay busqueda
+    opcionales = cargar_varios_csv_refrescados(BUCKET, (KEY_CUBO, KEY_PERFILES), INTERVALOS_REFRESCO, DERIVADOS)[0]
+    df_cubo = opcionales.get(KEY_CUBO)
+    df_perfiles = opcionales.get(KEY_PERFILES)
 
 # ==========================================
 # HEADER PRINCIPAL
@@ -168,10 +215,19 @@ seccion = st.sidebar.radio(
     index=0
 )
 
+# Nivel de detalle de las graficas: el servidor agrega antes de mandar los datos al navegador
+nivel_detalle = st.sidebar.select_slider(
+    "🔬 Nivel de detalle de las gráficas",
+    options=list(agregacion.NIVELES_DETALLE),
+    value=agregacion.NIVEL_DEFAULT
+)
+max_categorias = agregacion.max_categorias(nivel_detalle)
+
 st.sidebar.markdown("---")
 st.sidebar.info("💡 **Datos actualizados desde S3**\n\n Acceso concedido en S3 para explorar los análisis del Mundial 2026.")
 
 if seccion == "📋 Fuentes de Datos":
+    iniciar_seccion("fuentes")
     st.markdown('<h1 class="neon-yellow-title">⚡ FUENTES DE DATOS ⚡</h1>', unsafe_allow_html=True)
 
     datos_fuentes = pd.DataFrame({
@@ -204,7 +260,7 @@ if seccion == "📋 Fuentes de Datos":
         ]
     })
     
-    st.dataframe(
+    mostrar_tabla(
         datos_fuentes.style.set_properties(**{
             'background-color': 'rgba(255, 255, 0, 0.05)',
             'color': '#e0e0e0',
@@ -232,6 +288,7 @@ if seccion == "📋 Fuentes de Datos":
 # SECCIÓN 1: ASISTENCIA Y CAPACIDAD
 # ==========================================
 if seccion == "🏟️ Asistencia y Capacidad":
+    iniciar_seccion("asistencia")
     st.header("🏟️ Análisis de Asistencia vs Capacidad de Estadios")
     
     if not df_asistencia.empty:
@@ -288,56 +345,34 @@ if seccion == "🏟️ Asistencia y Capacidad":
             default=years_disponibles
         )
         
-        # Aplicar filtros
-        df_filtrado = df_asistencia[
-            (df_asistencia['Porcentaje_Llenado'] >= min_llenado) &
-            (df_asistencia['Year'].isin(years_seleccionados))
-        ].copy()
+        # Aplicar filtros (el resultado se comparte entre sesiones con los mismos filtros)
+        df_filtrado = resultados.consultar(
+            "asistencia:filtro", df_asistencia, {"min_llenado": min_llenado, "years": years_seleccionados},
+            lambda: mundial.filtrar_asistencia(df_asistencia, min_llenado, years_seleccionados)
+        )
         
         # Tabs para diferentes visualizaciones
         tab1, tab2, tab3 = st.tabs(["📊 Top 10", "📉 Menor sold-out", "📋 Datos Detallados"])
         
         with tab1:
             st.subheader("🏆 Top 10 Eventos con Mayor Porcentaje de SOLD-OUT")
-            top_10 = df_filtrado.head(10).copy()
-            top_10['Label'] = top_10['STADIUM'] + ' (' + top_10['Year'].astype(str) + ')'
-            
-            fig_top = px.bar(
-                top_10.sort_values('Porcentaje_Llenado', ascending=True),
-                x='Porcentaje_Llenado',
-                y='Label',
-                orientation='h',
-                color='Porcentaje_Llenado',
-                color_continuous_scale='Viridis',
-                text='Porcentaje_Llenado',
-                title='Top 10 Eventos con Mayor Porcentaje de Sold Out'
+            top_10 = resultados.consultar(
+                "asistencia:top", df_filtrado, {"n": 10}, lambda: mundial.extremos_asistencia(df_filtrado, 10, mayores=True)
             )
-            fig_top.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
-            fig_top.update_layout(height=500, showlegend=False)
-            st.plotly_chart(fig_top, use_container_width=True)
+            fig_top = mundial.figura_asistencia(top_10, 'Top 10 Eventos con Mayor Porcentaje de Sold Out', 'Viridis')
+            mostrar_grafica(fig_top, "fig_top", use_container_width=True)
         
         with tab2:
             st.subheader("📉 Top 10 Eventos con Menor Porcentaje de sold-out")
-            bottom_10 = df_filtrado.tail(10).copy()
-            bottom_10['Label'] = bottom_10['STADIUM'] + ' (' + bottom_10['Year'].astype(str) + ')'
-            
-            fig_bottom = px.bar(
-                bottom_10.sort_values('Porcentaje_Llenado', ascending=True),
-                x='Porcentaje_Llenado',
-                y='Label',
-                orientation='h',
-                color='Porcentaje_Llenado',
-                color_continuous_scale='Reds_r',
-                text='Porcentaje_Llenado',
-                title='Top 10 Eventos con Menor Porcentaje de Sold Out'
+            bottom_10 = resultados.consultar(
+                "asistencia:bottom", df_filtrado, {"n": 10}, lambda: mundial.extremos_asistencia(df_filtrado, 10, mayores=False)
             )
-            fig_bottom.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
-            fig_bottom.update_layout(height=500, showlegend=False)
-            st.plotly_chart(fig_bottom, use_container_width=True)
+            fig_bottom = mundial.figura_asistencia(bottom_10, 'Top 10 Eventos con Menor Porcentaje de Sold Out', 'Reds_r')
+            mostrar_grafica(fig_bottom, "fig_bottom", use_container_width=True)
         
         with tab3:
             st.subheader("📋 Tabla de Datos Completa")
-            st.dataframe(
+            mostrar_tabla(
                 df_filtrado.style.background_gradient(subset=['Porcentaje_Llenado'], cmap='RdYlGn'),
                 use_container_width=True,
                 height=400
@@ -347,6 +382,7 @@ if seccion == "🏟️ Asistencia y Capacidad":
 # SECCIÓN 2: ESTADIOS POR PAÍS
 # ==========================================
 elif seccion == "🌎 Estadios por País Local":
+    iniciar_seccion("estadios")
     st.header("🌎 Análisis de Estadios por País Anfitrión")
     
     if not df_estadios.empty and not df_resumen_paises.empty:
@@ -376,7 +412,10 @@ elif seccion == "🌎 Estadios por País Local":
             default=paises_disponibles
         )
         
-        df_estadios_filtrado = df_estadios[df_estadios['Country'].isin(paises_seleccionados)]
+        df_estadios_filtrado = resultados.consultar(
+            "estadios:filtro", df_estadios, {"paises": paises_seleccionados},
+            lambda: mundial.filtrar_estadios(df_estadios, paises_seleccionados)
+        )
         
         # Tabs
         tab1, tab2, tab3 = st.tabs(["📊 Por País", "🏟️ Todos los Estadios", "📈 Comparativa"])
@@ -386,63 +425,69 @@ elif seccion == "🌎 Estadios por País Local":
             col_a, col_b = st.columns(2)
             
             with col_a:
-                fig_max = px.bar(
-                    df_resumen_paises,
-                    x='Country',
-                    y='Capacidad_Maxima',
-                    color='Country',
-                    title='Capacidad Máxima por País',
-                    text='Capacidad_Maxima'
-                )
-                fig_max.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
-                fig_max.update_layout(showlegend=False)
-                st.plotly_chart(fig_max, use_container_width=True)
+                fig_max = mundial.figura_capacidad_pais(df_resumen_paises, 'Capacidad_Maxima', 'Capacidad Máxima por País')
+                mostrar_grafica(fig_max, "fig_max", use_container_width=True)
             
             with col_b:
-                fig_prom = px.bar(
-                    df_resumen_paises,
-                    x='Country',
-                    y='Capacidad_Promedio',
-                    color='Country',
-                    title='Capacidad Promedio por País',
-                    text='Capacidad_Promedio'
-                )
-                fig_prom.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
-                fig_prom.update_layout(showlegend=False)
-                st.plotly_chart(fig_prom, use_container_width=True)
+                fig_prom = mundial.figura_capacidad_pais(df_resumen_paises, 'Capacidad_Promedio', 'Capacidad Promedio por País')
+                mostrar_grafica(fig_prom, "fig_prom", use_container_width=True)
         
         with tab2:
             st.subheader("🏟️ Capacidad Individual de Cada Estadio")
-            fig_todos = px.bar(
-                df_estadios_filtrado.sort_values('Capacity', ascending=True),
-                x='Capacity',
-                y='Stadium',
-                color='Country',
-                orientation='h',
-                title='Capacidad de Estadios Individuales',
-                text='Capacity',
-                height=max(600, len(df_estadios_filtrado) * 25)
-            )
-            fig_todos.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
-            st.plotly_chart(fig_todos, use_container_width=True)
+            # Solo los estadios mas grandes van como barras; el resto se resume en un histograma
+            df_estadios_top = agregacion.top_n(df_estadios_filtrado, 'Capacity', max_categorias)
+            fig_todos = mundial.figura_estadios(df_estadios_top)
+            mostrar_grafica(fig_todos, "fig_todos", use_container_width=True)
+            
+            if len(df_estadios_top) < len(df_estadios_filtrado):
+                st.caption(f"Mostrando los {len(df_estadios_top)} estadios de mayor capacidad de {len(df_estadios_filtrado)}. Sube el nivel de detalle para ver más.")
+                df_bins = agregacion.agrupar_en_bins(df_estadios_filtrado['Capacity'], bins=min(20, max_categorias))
+                fig_bins = px.bar(
+                    df_bins,
+                    x='Rango',
+                    y='Conteo',
+                    title='Distribución de Capacidad (todos los estadios filtrados)',
+                    labels={'Rango': 'Capacidad', 'Conteo': 'Estadios'}
+                )
+                mostrar_grafica(fig_bins, "fig_bins_estadios", use_container_width=True)
         
         with tab3:
             st.subheader("📈 Comparativa General")
-            st.dataframe(df_resumen_paises, use_container_width=True)
+            mostrar_tabla(df_resumen_paises, use_container_width=True)
 
 # ==========================================
 # SECCIÓN 3: ANÁLISIS DE GOLES
 # ==========================================
 elif seccion == "⚽ Análisis de Goles":
+    iniciar_seccion("goles")
     st.header("⚽ Análisis de Goles y Victorias Locales")
     
+    min_goles_partido = cubo.MIN_GOLES_DEFAULT
+    if df_cubo is not None and not df_cubo.empty:
+        # Consultas sobre el cubo: cualquier umbral, rango de años o torneo sin volver a correr el notebook
+        st.sidebar.markdown("### 🧊 Consulta de Partidos")
+        min_goles_partido = st.sidebar.slider("Mínimo de goles por partido", 1, 15, cubo.MIN_GOLES_DEFAULT)
+        year_min, year_max = int(df_cubo['year'].min()), int(df_cubo['year'].max())
+        rango_years = st.sidebar.slider("Años", year_min, year_max, (year_min, year_max))
+        torneos_sel = st.sidebar.multiselect("Torneos", cubo.torneos(df_cubo), placeholder="Todos")
+        filtros_cubo = {"min_goles": min_goles_partido, "years": rango_years, "torneos": torneos_sel}
+        with medir("filtro"):
+            df_victorias = resultados.consultar(
+                "goles:victorias", df_cubo, filtros_cubo,
+                lambda: cubo.consultar_victorias(df_cubo, min_goles_partido, rango_years, torneos_sel)
+            )
+            df_goles = resultados.consultar(
+                "goles:distribucion", df_cubo, filtros_cubo,
+                lambda: mundial.preparar_goles(cubo.consultar_goles(df_cubo, min_goles_partido, rango_years, torneos_sel))
+            )
+    
     if not df_victorias.empty and not df_goles.empty:
         # KPIs
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             total_partidos = df_victorias['Total_Partidos'].sum()
-            st.metric("⚽ Partidos >4 Goles", f"{total_partidos:,}")
+            st.metric(f"⚽ Partidos ≥{min_goles_partido} Goles", f"{total_partidos:,}")
         
         with col2:
             prom_victoria_local = df_victorias['Porcentaje_Victoria_Local'].mean()
@@ -460,58 +505,47 @@ elif seccion == "⚽ Análisis de Goles":
         
         # Filtros
         st.sidebar.markdown("### 🔍 Filtros de Goles")
-        min_partidos = st.sidebar.slider(
-            "Mínimo de partidos por país",
-            min_value=1,
-            max_value=int(df_victorias['Total_Partidos'].max()),
-            value=5
-        )
+        # Con un minimo de goles alto puede haber menos de 5 partidos por pais
+        max_partidos = int(df_victorias['Total_Partidos'].max())
+        if max_partidos > 1:
+            min_partidos = st.sidebar.slider(
+                "Mínimo de partidos por país",
+                min_value=1,
+                max_value=max_partidos,
+                value=min(5, max_partidos)
+            )
+        else:
+            min_partidos = 1
         
-        df_victorias_filtrado = df_victorias[df_victorias['Total_Partidos'] >= min_partidos]
+        df_victorias_filtrado = resultados.consultar(
+            "goles:victorias_filtro", df_victorias, {"min_partidos": min_partidos},
+            lambda: mundial.filtrar_victorias(df_victorias, min_partidos)
+        )
         
         # Tabs
         tab1, tab2, tab3 = st.tabs(["🏠 Victorias Locales", "⚽ Distribución de Goles", "📋 Detalles"])
         
         with tab1:
             st.subheader("🏠 Porcentaje de Victoria Local por País")
-            st.markdown("*En partidos con más de 4 goles*")
-            
-            fig_victoria = px.bar(
-                df_victorias_filtrado.head(15),
-                x='country',
-                y='Porcentaje_Victoria_Local',
-                color='Total_Partidos',
-                color_continuous_scale='Teal',
-                title='Porcentaje de Victoria del Equipo Local',
-                text='Porcentaje_Victoria_Local'
-            )
-            fig_victoria.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
-            fig_victoria.update_layout(
-                xaxis_title="País Anfitrión",
-                yaxis_title="% Victoria Local",
-                yaxis_range=[0, 100],
-                height=500
-            )
-            st.plotly_chart(fig_victoria, use_container_width=True)
+            st.markdown(f"*En partidos con {min_goles_partido} goles o más*")
             
-            # Insight
-            mejor_pais = df_victorias_filtrado.loc[df_victorias_filtrado['Porcentaje_Victoria_Local'].idxmax()]
-            st.info(f"🏆 **País con mayor ventaja local:** {mejor_pais['country']} con {mejor_pais['Porcentaje_Victoria_Local']:.1f}% ({mejor_pais['Total_Partidos']} partidos)")
+            if df_victorias_filtrado.empty:
+                st.info(f"ℹ️ Ningún país tiene {min_partidos} partidos o más con {min_goles_partido} goles o más. Baja alguno de los mínimos.")
+            else:
+                fig_victoria = mundial.figura_victoria_local(df_victorias_filtrado, 15)
+                mostrar_grafica(fig_victoria, "fig_victoria", use_container_width=True)
+                
+                # Insight
+                mejor_pais = df_victorias_filtrado.loc[df_victorias_filtrado['Porcentaje_Victoria_Local'].idxmax()]
+                st.info(f"🏆 **País con mayor ventaja local:** {mejor_pais['country']} con {mejor_pais['Porcentaje_Victoria_Local']:.1f}% ({mejor_pais['Total_Partidos']} partidos)")
         
         with tab2:
             
             st.subheader("⚽ Distribución de Encuentros por Cantidad de Goles")
             
             # PREPARACIÓN DE DATOS PARA DETALLE DE LOS DATOS QUE NO SE VEN (filtrar el rango 12-31)
-            try:
-                
-                df_goles['total_goles_num'] = df_goles['total_goles_str'].astype(int)
-            except ValueError:
-                df_goles['total_goles_num'] = df_goles['total_goles_str'].str.extract('(\d+)').astype(int)
-            df_zoom = df_goles[
-                (df_goles['total_goles_num'] >= 12) & 
-                (df_goles['total_goles_num'] <= 31)
-            ].sort_values(by='Total_Encuentros', ascending=False)
+            # (total_goles_num y total_goles_sumados ya vienen calculados desde la carga)
+            df_zoom = mundial.zoom_goles(df_goles, 12, 31)
             
             col_main, col_zoom = st.columns([0.6, 0.4]) 
             
@@ -519,30 +553,11 @@ elif seccion == "⚽ Análisis de Goles":
             with col_main:
                 st.markdown("Vista General (Todos los Rangos)")
                 
-                fig_pie = go.Figure(data=[go.Pie(
-                    labels=df_goles['total_goles_str'],
-                    values=df_goles['Total_Encuentros'],
-                    hole=0.3,
-                    marker=dict(
-                        colors=px.colors.sequential.RdBu,
-                        line=dict(color='white', width=0.1)
-                    ),
-                    textposition='outside',
-                    textinfo='percent+label',
-                )])
-                
-                total_goles_altos = df_goles['Total_Encuentros'].sum()
-                fig_pie.update_layout(
-                    title='Distribución de Encuentros con Más de 4 Goles en total.',
-                    annotations=[dict(
-                        text=f'{total_goles_altos}<br>Encuentros',
-                        x=0.5, y=0.5,
-                        font_size=20,
-                        showarrow=False
-                    )],
-                    height=700 
+                fig_pie = mundial.figura_distribucion_goles(
+                    agregacion.top_n_con_otros(df_goles, 'total_goles_str', 'Total_Encuentros', max_categorias),
+                    min_goles_partido
                 )
-                st.plotly_chart(fig_pie, use_container_width=True)
+                mostrar_grafica(fig_pie, "fig_pie", use_container_width=True)
             
             
             # --- COLUMNA DERECHA: GRÁFICO DE BARRAS (ZOOM) ---
@@ -550,22 +565,13 @@ elif seccion == "⚽ Análisis de Goles":
                 st.markdown(f" 🔎 Detalle del Rango de {df_zoom['total_goles_num'].min()} a {df_zoom['total_goles_num'].max()} Goles")
             
                 if not df_zoom.empty:
-                    fig_bar = px.bar(
-                        df_zoom,
-                        x='total_goles_str',
-                        y='Total_Encuentros',
-                        color='Total_Encuentros',
-                        title='Comparación de Encuentros en Rango Alto',
-                        template='plotly_white'
-                    )
-                    fig_bar.update_layout(height=500, xaxis_title="Total de Goles por Encuentro", yaxis_title="Cantidad de Encuentros")
-                    st.plotly_chart(fig_bar, use_container_width=True)
+                    fig_bar = mundial.figura_zoom_goles(df_zoom)
+                    mostrar_grafica(fig_bar, "fig_bar", use_container_width=True)
                 else:
                     st.warning("No hay datos en el rango de 12 a 31 goles para mostrar el detalle.")
             
             col_a, col_b = st.columns(2)
             with col_a:
-                df_goles['total_goles_sumados'] = df_goles['total_goles_num'] * df_goles['Total_Encuentros']
                 total_goles_sumados = df_goles['total_goles_sumados'].sum()
                 st.metric("⚽ Total de Goles Anotados", total_goles_sumados)            
                 
@@ -576,21 +582,24 @@ elif seccion == "⚽ Análisis de Goles":
 
         with tab3:
             st.subheader("📋 Detalles por País")
-            st.dataframe(
+            mostrar_tabla(
                 df_victorias_filtrado.style.background_gradient(subset=['Porcentaje_Victoria_Local'], cmap='RdYlGn'),
                 use_container_width=True
             )
+    elif df_cubo is not None and not df_cubo.empty:
+        st.info("ℹ️ No hay partidos que cumplan los filtros seleccionados")
 
 # ==========================================
 # SECCIÓN 4: PROYECCIÓN FINANCIERA
 # ==========================================
 elif seccion == "💰 Proyección Financiera":
+    iniciar_seccion("proyeccion")
     st.header("💰 Evolución y Proyección del Fondo de Premios")
     
     if not df_proyeccion.empty:
         # Separar histórico y proyección
-        df_historico = df_proyeccion[df_proyeccion['Tipo'] == 'Histórico']
-        df_proyectado = df_proyeccion[df_proyeccion['Tipo'] == 'Proyección']
+        with medir("filtro"):
+            df_historico, df_proyectado = mundial.separar_proyeccion(df_proyeccion)
         
         # KPIs
         col1, col2, col3, col4 = st.columns(4)
@@ -633,64 +642,16 @@ elif seccion == "💰 Proyección Financiera":
         # Gráfico principal
         st.subheader("📈 Evolución del Fondo Total de Premios")
         
-        fig_proyeccion = go.Figure()
-        
-        # Línea histórica
-        fig_proyeccion.add_trace(go.Scatter(
-            x=df_historico['Year'].astype(str),
-            y=df_historico['Total_Fund_Millions'],
-            mode='lines+markers+text',
-            name='Histórico',
-            line=dict(color='#4ECDC4', width=3),
-            marker=dict(size=10, color='#4ECDC4'),
-            text=df_historico['Total_Fund_Millions'].apply(lambda x: f'${x:.0f}M'),
-            textposition='top center',
-            textfont=dict(size=11, color='#4ECDC4')
-        ))
-        
-        # Línea de proyección
-        if not df_proyectado.empty:
-            # Conectar último histórico con proyección
-            ultimo_historico_row = df_historico.iloc[[-1]]
-            df_conexion = pd.concat([ultimo_historico_row, df_proyectado])
-            
-            fig_proyeccion.add_trace(go.Scatter(
-                x=df_conexion['Year'].astype(str),
-                y=df_conexion['Total_Fund_Millions'],
-                mode='lines+markers+text',
-                name='Proyección',
-                line=dict(color='#FF6B6B', width=3, dash='dash'),
-                marker=dict(size=12, color='#FF6B6B', symbol='star'),
-                text=df_conexion['Total_Fund_Millions'].apply(lambda x: f'${x:.0f}M'),
-                textposition='top center',
-                textfont=dict(size=12, color='#FF6B6B', family='Arial Black')
-            ))
-        
-        fig_proyeccion.update_layout(
-            title='Evolución del Fondo Total de Premios (Millones USD)',
-            xaxis_title='Año del Mundial',
-            yaxis_title='Fondo Total (Millones USD)',
-            template='plotly_white',
-            height=500,
-            hovermode='x unified',
-            showlegend=True,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            )
-        )
+        fig_proyeccion = mundial.figura_proyeccion(df_historico, df_proyectado)
         
-        st.plotly_chart(fig_proyeccion, use_container_width=True)
+        mostrar_grafica(fig_proyeccion, "fig_proyeccion", use_container_width=True)
         
         st.markdown("---")
         col_a, col_b = st.columns(2)
         
         with col_a:
             st.subheader("📊 Tabla de Datos")
-            st.dataframe(
+            mostrar_tabla(
                 df_proyeccion[['Year', 'Total_Fund_Millions', 'Tipo']].rename(columns={
                     'Year': 'Año',
                     'Total_Fund_Millions': 'Fondo (Millones USD)',
@@ -720,6 +681,7 @@ elif seccion == "💰 Proyección Financiera":
 # SECCIÓN 5: ANÁLISIS DE JUGADORES (NUEVA)
 # ==========================================
 elif seccion == "👤 Análisis de Jugadores":
+    iniciar_seccion("jugadores")
     st.header("👤 Análisis de Rendimiento de Jugadores")
     st.markdown("*Datos generados por análisis Lambda - Estadísticas de jugadores destacados*")
     
@@ -744,37 +706,23 @@ elif seccion == "👤 Análisis de Jugadores":
     st.markdown("---")
     
     # Tabs para los 3 análisis
-    tab1, tab2, tab3 = st.tabs(["🌍 Top 50 G+A por País", "🎯 Goleadores Elite", "🏆 Top Países Goleadores"])
+    tab1, tab2, tab3, tab4 = st.tabs(["🌍 Top 50 G+A por País", "🎯 Goleadores Elite", "🏆 Top Países Goleadores", "🔎 Buscar Jugador"])
     
     with tab1:
         st.subheader("🌍 Distribución Geográfica del Top 50 (Goles + Asistencias)")
         
         if not df_top50_paises.empty:
-            fig_top50 = px.bar(
-                df_top50_paises,
-                x='COUNTRY',
-                y='Jugadores_Top_50',
-                title='Top 50 Jugadores por Goles + Asistencias - Distribución por País',
-                color='Jugadores_Top_50',
-                color_continuous_scale='Viridis',
-                text='Jugadores_Top_50',
-                template='plotly_white'
+            fig_top50 = mundial.figura_top50_paises(
+                agregacion.top_n_con_otros(df_top50_paises, 'COUNTRY', 'Jugadores_Top_50', max_categorias)
             )
-            fig_top50.update_traces(texttemplate='%{text}', textposition='outside')
-            fig_top50.update_layout(
-                xaxis_title="País",
-                yaxis_title="Cantidad de Jugadores",
-                height=500,
-                showlegend=False
-            )
-            st.plotly_chart(fig_top50, use_container_width=True)
+            mostrar_grafica(fig_top50, "fig_top50", use_container_width=True)
             
             # Insight
             pais_lider = df_top50_paises.loc[df_top50_paises['Jugadores_Top_50'].idxmax()]
             st.success(f"🏆 **País líder:** {pais_lider['COUNTRY']} con {pais_lider['Jugadores_Top_50']} jugadores en el Top 50")
             
             with st.expander("📋 Ver Datos Detallados"):
-                st.dataframe(df_top50_paises, use_container_width=True)
+                mostrar_tabla(df_top50_paises, use_container_width=True)
         else:
             st.warning("⚠️ No hay datos disponibles para este análisis")
     
@@ -792,27 +740,14 @@ elif seccion == "👤 Análisis de Jugadores":
                 value=int(df_goleadores_top3['Goles'].min())
             )
             
-            df_goleadores_filtrado = df_goleadores_top3[df_goleadores_top3['Goles'] >= min_goles]
+            df_goleadores_filtrado = resultados.consultar(
+                "jugadores:goleadores", df_goleadores_top3, {"min_goles": min_goles},
+                lambda: mundial.filtrar_goleadores(df_goleadores_top3, min_goles)
+            )
             
             # Gráfico de barras con color por equipo/país
-            fig_goleadores = px.bar(
-                df_goleadores_filtrado.sort_values(by='Goles', ascending=False).head(20),
-                x='Goleador',
-                y='Goles',
-                color='Equipo_Pais',
-                title='Top 20 Goleadores Elite (Más Goles)',
-                template='plotly_white',
-                text='Goles',
-                labels={'Equipo_Pais': 'Equipo/País'}
-            )
-            fig_goleadores.update_traces(texttemplate='%{text}', textposition='outside')
-            fig_goleadores.update_layout(
-                xaxis_title="Goleador",
-                yaxis_title="Cantidad de Goles",
-                height=600,
-                xaxis={'tickangle': -45}
-            )
-            st.plotly_chart(fig_goleadores, use_container_width=True)
+            fig_goleadores = mundial.figura_goleadores(df_goleadores_filtrado, 20)
+            mostrar_grafica(fig_goleadores, "fig_goleadores", use_container_width=True)
             
             # Estadísticas adicionales
             col_a, col_b, col_c = st.columns(3)
@@ -827,7 +762,7 @@ elif seccion == "👤 Análisis de Jugadores":
                 st.metric("🎯 Total Goleadores", total_goleadores_filtrados)
             
             with st.expander("📋 Ver Tabla Completa de Goleadores"):
-                st.dataframe(
+                mostrar_tabla(
                     df_goleadores_filtrado.sort_values('Goles', ascending=False).style.background_gradient(
                         subset=['Goles'], 
                         cmap='Reds'
@@ -847,41 +782,15 @@ elif seccion == "👤 Análisis de Jugadores":
             
             with col_chart1:
                 # Gráfico de pastel (donut)
-                fig_pie_paises = px.pie(
-                    df_top10_paises_goleadores,
-                    values='Numero_de_Goleadores',
-                    names='Pais_Equipo',
-                    title='Distribución de Goleadores por País/Equipo',
-                    hole=0.4,
-                    color_discrete_sequence=px.colors.qualitative.Set3
-                )
-                fig_pie_paises.update_traces(
-                    textposition='inside',
-                    textinfo='percent+label'
+                fig_pie_paises = mundial.figura_pie_paises_goleadores(
+                    agregacion.top_n_con_otros(df_top10_paises_goleadores, 'Pais_Equipo', 'Numero_de_Goleadores', max_categorias)
                 )
-                fig_pie_paises.update_layout(height=500)
-                st.plotly_chart(fig_pie_paises, use_container_width=True)
+                mostrar_grafica(fig_pie_paises, "fig_pie_paises", use_container_width=True)
             
             with col_chart2:
                 # Gráfico de barras horizontal
-                fig_bar_paises = px.bar(
-                    df_top10_paises_goleadores.sort_values('Numero_de_Goleadores', ascending=True),
-                    x='Numero_de_Goleadores',
-                    y='Pais_Equipo',
-                    orientation='h',
-                    title='Ranking de Países por Cantidad de Goleadores',
-                    color='Numero_de_Goleadores',
-                    color_continuous_scale='Blues',
-                    text='Numero_de_Goleadores'
-                )
-                fig_bar_paises.update_traces(texttemplate='%{text}', textposition='outside')
-                fig_bar_paises.update_layout(
-                    height=500,
-                    showlegend=False,
-                    yaxis_title="País/Equipo",
-                    xaxis_title="Número de Goleadores"
-                )
-                st.plotly_chart(fig_bar_paises, use_container_width=True)
+                fig_bar_paises = mundial.figura_ranking_paises_goleadores(df_top10_paises_goleadores)
+                mostrar_grafica(fig_bar_paises, "fig_bar_paises", use_container_width=True)
             
             # Insights
             st.markdown("---")
@@ -901,7 +810,7 @@ elif seccion == "👤 Análisis de Jugadores":
                 st.info(f"🔟 **Décimo lugar:** {pais_ultimo['Pais_Equipo']}\n\n{pais_ultimo['Numero_de_Goleadores']} goleadores")
             
             with st.expander("📋 Ver Tabla Detallada"):
-                st.dataframe(
+                mostrar_tabla(
                     df_top10_paises_goleadores.sort_values('Numero_de_Goleadores', ascending=False).style.background_gradient(
                         subset=['Numero_de_Goleadores'],
                         cmap='YlOrRd'
@@ -910,6 +819,42 @@ elif seccion == "👤 Análisis de Jugadores":
                 )
         else:
             st.warning("⚠️ No hay datos disponibles para este análisis")
+    
+    with tab4:
+        st.subheader("🔎 Buscar Jugador")
+        st.markdown("*Por nombre o apellido, sin importar acentos; también encuentra nombres mal escritos*")
+        
+        if df_perfiles is not None and not df_perfiles.empty:
+            # El indice se construye una vez por version de perfiles_jugadores.csv
+            with medir("busqueda:indice"):
+                indice = busqueda.indice_de(df_perfiles, 'Jugador', peso='G_A')
+            consulta = st.text_input("Nombre del jugador", placeholder="p. ej. messi, ronaldiño, müller")
+            
+            if consulta:
+                posiciones = indice.buscar(consulta, limite=10)
+                if posiciones:
+                    df_resultados = df_perfiles.iloc[posiciones]
+                    opciones = [f"{fila.Jugador} ({fila.Pais})" if pd.notna(fila.Pais) else fila.Jugador for fila in df_resultados.itertuples()]
+                    elegido = st.radio("Coincidencias", range(len(opciones)), format_func=opciones.__getitem__)
+                    perfil = df_resultados.iloc[elegido]
+                    
+                    col1, col2, col3, col4 = st.columns(4)
+                    col1.metric("⚽ Goles", f"{int(perfil['Goles']):,}")
+                    col2.metric("🅰️ Asistencias", f"{int(perfil['Asistencias']):,}")
+                    col3.metric("⭐ Goles + Asistencias", f"{int(perfil['G_A']):,}")
+                    col4.metric("🌍 Goles Internacionales", f"{int(perfil['Goles_Internacionales']):,}")
+                    if pd.notna(perfil['Equipo_Internacional']):
+                        st.caption(f"Selección con más goles internacionales: {perfil['Equipo_Internacional']}")
+                    
+                    with st.expander("📋 Ver Coincidencias"):
+                        mostrar_tabla(df_resultados, use_container_width=True, hide_index=True)
+                else:
+                    st.info(f"ℹ️ No se encontraron jugadores parecidos a \"{consulta}\"")
+        else:
+            st.warning("⚠️ Aún no hay perfiles de jugadores: la Lambda genera perfiles_jugadores.csv")
+
+# Panel de rendimiento (solo administradores, ver utils/metricas.py)
+panel_admin()
 
 # ==========================================
 # FOOTER
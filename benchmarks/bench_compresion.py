@@ -0,0 +1,147 @@
+"""Benchmark de transferencia: CSV sin comprimir contra sus variantes gzip y zstd.
+
+Publica datasets sinteticos con sus variantes (utils/compresion.py) y los lee a traves
+de una red simulada (latencia por peticion + ancho de banda limitado), igual que los
+loaders de los dashboards: HEAD para negociar la variante y parseo en streaming. Reporta
+bytes transferidos y tiempo total por formato.
+
+Uso:
+    python benchmarks/bench_compresion.py --filas 100000 --ancho-banda 20 --latencia 30
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import datos_sinteticos as sint  # noqa: E402
+from benchmarks.comun import RESULTADOS, cronometrar, entorno, guardar  # noqa: E402
+from utils import compresion  # noqa: E402
+from utils.almacenamiento import Almacenamiento, AlmacenamientoMemoria  # noqa: E402
+
+BUCKET = "benchmark-compresion"
+
+
+class _StreamLimitado:
+    """Stream que tarda lo que tardaria en llegar por la red cada bloque que se lee"""
+
+    def __init__(self, stream, red):
+        self._stream = stream
+        self._red = red
+
+    def read(self, n=-1):
+        datos = self._stream.read(n)
+        self._red.transferir(len(datos))
+        return datos
+
+    def readable(self):
+        return True
+
+
+class AlmacenamientoRed(Almacenamiento):
+    """Envuelve otro almacenamiento simulando una red: latencia por peticion y MB/s por conexion"""
+
+    remoto = True
+
+    def __init__(self, interno, ancho_banda_mb, latencia_ms):
+        self.interno = interno
+        self.bucket = interno.bucket
+        self.bytes_por_segundo = ancho_banda_mb * 1024 * 1024
+        self.latencia = latencia_ms / 1000
+        self.bytes = 0
+        self.peticiones = 0
+        self._lock = threading.Lock()
+
+    def transferir(self, n):
+        with self._lock:
+            self.bytes += n
+        time.sleep(n / self.bytes_por_segundo)
+
+    def _peticion(self):
+        with self._lock:
+            self.peticiones += 1
+        time.sleep(self.latencia)
+
+    def get(self, key):
+        self._peticion()
+        datos = self.interno.get(key)
+        self.transferir(len(datos))
+        return datos
+
+    def get_rango(self, key, inicio, fin, etag=None):
+        self._peticion()
+        datos = self.interno.get_rango(key, inicio, fin, etag)
+        self.transferir(len(datos))
+        return datos
+
+    def abrir(self, key):
+        self._peticion()
+        return _StreamLimitado(self.interno.abrir(key), self)
+
+    def head(self, key):
+        self._peticion()
+        return self.interno.head(key)
+
+    def put(self, key, datos, metadatos=None):
+        self.interno.put(key, datos, metadatos)
+
+    def listar(self, prefix=""):
+        self._peticion()
+        return self.interno.listar(prefix)
+
+
+def datasets(filas, semilla):
+    return {
+        "datos_limpios/tabla_final.csv": sint.tabla_final(filas, semilla),
+        "datos_limpios/lambda/analisis_goleadores_top_3.csv": sint.goleadores(filas, semilla),
+        "datos_limpios/lambda/perfiles_jugadores.csv": sint.perfiles_jugadores(filas, semilla),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--ancho-banda", type=float, default=20, help="MB/s simulados")
+    parser.add_argument("--latencia", type=float, default=30, help="ms por peticion")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", default=os.path.join(RESULTADOS, "compresion.json"))
+    args = parser.parse_args()
+
+    formatos = [None, *compresion.formatos_disponibles()]
+    resultados = []
+    for filas in args.filas:
+        AlmacenamientoMemoria.limpiar()
+        interno = AlmacenamientoMemoria(f"{BUCKET}-{filas}")
+        print(f"\n== {filas:,} filas ({args.ancho_banda:g} MB/s, {args.latencia:g} ms) ==")
+        for key, df in datasets(filas, args.semilla).items():
+            compresion.publicar(interno, key, sint.a_csv(df))
+            base_ms = None
+            for formato in formatos:
+                red = AlmacenamientoRed(interno, args.ancho_banda, args.latencia)
+                aceptados = [formato] if formato else []
+                mediana, minimo, _ = cronometrar(
+                    lambda: compresion.leer_csv(red, key, formatos=aceptados), args.repeticiones
+                )
+                corridas = args.repeticiones + 1
+                bytes_por_lectura = red.bytes // corridas
+                base_ms = base_ms or mediana
+                nombre = f"{key.rsplit('/', 1)[-1]}:{formato or 'sin_comprimir'}@{filas}"
+                resultados.append({
+                    "nombre": nombre,
+                    "filas": filas,
+                    "formato": formato or "sin_comprimir",
+                    "bytes": bytes_por_lectura,
+                    "peticiones": red.peticiones // corridas,
+                    "mediana_ms": round(mediana, 3),
+                    "min_ms": round(minimo, 3),
+                })
+                print(f"{nombre:<52} {bytes_por_lectura / 1024:>10,.0f} KB {mediana:>10.1f} ms  x{base_ms / mediana:.1f}")
+
+    guardar({"entorno": entorno(), "parametros": vars(args), "resultados": resultados}, args.salida)
+
+
+if __name__ == "__main__":
+    main()
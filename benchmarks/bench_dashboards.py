@@ -0,0 +1,140 @@
+"""Benchmark reproducible de carga, filtros, agregaciones y figuras de los dashboards.
+
+Genera datasets sinteticos con los esquemas reales (ver datos_sinteticos.py), los
+publica en un almacenamiento local (memoria o disco, sin AWS) y mide sin Streamlit
+las mismas funciones que usan los dashboards.
+
+Uso:
+    python benchmarks/bench_dashboards.py --tamanos 1000 10000 100000
+    python benchmarks/bench_dashboards.py --tamanos 1000 10000 --base benchmarks/resultados/dashboards.json
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import datos_sinteticos as sint  # noqa: E402
+from benchmarks.comun import RESULTADOS, comparar, cronometrar, entorno, guardar  # noqa: E402
+from utils import busqueda, mundial, netflix, servidores  # noqa: E402
+from utils.almacenamiento import AlmacenamientoLocal, AlmacenamientoMemoria, leer_csv  # noqa: E402
+
+BUCKET = "benchmark"
+
+
+def _plotly_disponible():
+    try:
+        import plotly  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def casos(almacenamiento, filas, semilla, con_figuras):
+    """Genera los datos de un tamaño y devuelve la lista de (nombre, funcion) a medir"""
+    asistencia = sint.tabla_final(filas, semilla)
+    almacenamiento.put("datos_limpios/tabla_final.csv", sint.a_csv(asistencia))
+    df_estadios = sint.estadios(filas, semilla)
+    almacenamiento.put("datos_limpios/df_grafica_individual.csv", sint.a_csv(df_estadios))
+    victorias = sint.analisis_victoria(filas, semilla)
+    goles = sint.conteo_goles(min(filas, 200), semilla)
+    df_goleadores = sint.goleadores(filas, semilla)
+    almacenamiento.put("datos_limpios/lambda/analisis_goleadores_top_3.csv", sint.a_csv(df_goleadores))
+    for key, datos in sint.snapshots_servidores(filas, semilla):
+        almacenamiento.put(key, datos)
+    titulos = sint.netflix(filas, semilla)
+    perfiles = sint.perfiles_jugadores(filas, semilla)
+
+    years = sorted(asistencia["Year"].unique())
+    paises = df_estadios["Country"].unique()
+    keys_snapshots = [obj["Key"] for obj in servidores.listar_snapshots(almacenamiento)]
+    df_servidores = servidores.construir_df(almacenamiento, keys_snapshots)
+    titulos_num = netflix.coerce_numeric_columns(titulos)
+    indice = busqueda.IndiceNombres(perfiles["Jugador"], perfiles["G_A"])
+
+    lista = [
+        # Carga (almacenamiento + parseo)
+        ("carga:tabla_final", lambda: leer_csv(almacenamiento, "datos_limpios/tabla_final.csv")),
+        ("carga:goleadores", lambda: leer_csv(almacenamiento, "datos_limpios/lambda/analisis_goleadores_top_3.csv")),
+        ("carga:snapshots_servidores", lambda: servidores.construir_df(almacenamiento, keys_snapshots)),
+        # Filtros
+        ("filtro:asistencia", lambda: mundial.filtrar_asistencia(asistencia, 50, years)),
+        ("filtro:estadios", lambda: mundial.filtrar_estadios(df_estadios, paises[: len(paises) // 2])),
+        ("filtro:victorias", lambda: mundial.filtrar_victorias(victorias, 5)),
+        ("filtro:goleadores", lambda: mundial.filtrar_goleadores(df_goleadores, 10)),
+        ("filtro:servidores", lambda: servidores.filtrar(df_servidores, ["OK", "WARN"], df_servidores["server_id"].unique())),
+        # Agregaciones
+        ("agregacion:extremos_asistencia", lambda: mundial.extremos_asistencia(asistencia, 10)),
+        ("agregacion:preparar_goles", lambda: mundial.preparar_goles(goles)),
+        ("agregacion:uso_promedio", lambda: servidores.uso_promedio(df_servidores)),
+        ("agregacion:netflix_coerce", lambda: netflix.coerce_numeric_columns(titulos)),
+        ("agregacion:netflix_por_año", lambda: netflix.count_by_year(titulos_num, "Movie")),
+        # Busqueda de jugadores (indice por version; consultas por tecla)
+        ("busqueda:indice", lambda: busqueda.IndiceNombres(perfiles["Jugador"], perfiles["G_A"])),
+        ("busqueda:prefijo", lambda: indice.buscar("hern")),
+        ("busqueda:difusa", lambda: indice.buscar("mesi lionel")),
+        ("busqueda:contains", lambda: perfiles[perfiles["Jugador"].str.contains("hern", case=False)]),
+    ]
+    if con_figuras:
+        goles_preparados = mundial.preparar_goles(goles)
+        lista += [
+            ("figura:asistencia", lambda: mundial.figura_asistencia(mundial.extremos_asistencia(asistencia, 10), "Top 10", "Viridis")),
+            ("figura:estadios", lambda: mundial.figura_estadios(df_estadios)),
+            ("figura:distribucion_goles", lambda: mundial.figura_distribucion_goles(goles_preparados)),
+            ("figura:goleadores", lambda: mundial.figura_goleadores(df_goleadores)),
+            ("figura:estados_servidores", lambda: servidores.figura_estados(df_servidores)),
+        ]
+    return lista
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="Filas por dataset (de 1000 hasta 10000000)")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--backend", choices=["memoria", "local"], default="memoria")
+    parser.add_argument("--sin-figuras", action="store_true", help="No medir la construccion de figuras")
+    parser.add_argument("--figuras-hasta", type=int, default=100_000,
+                        help="Tamaño maximo para medir figuras (una barra por fila es muy lento)")
+    parser.add_argument("--solo", help="Solo los casos cuyo nombre contiene este texto")
+    parser.add_argument("--salida", default=os.path.join(RESULTADOS, "dashboards.json"))
+    parser.add_argument("--base", help="JSON previo contra el cual comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.25)
+    args = parser.parse_args()
+
+    con_figuras = not args.sin_figuras and _plotly_disponible()
+    resultados = []
+    with tempfile.TemporaryDirectory() as carpeta:
+        for filas in args.tamanos:
+            if args.backend == "local":
+                almacenamiento = AlmacenamientoLocal(carpeta, f"{BUCKET}-{filas}")
+            else:
+                AlmacenamientoMemoria.limpiar()
+                almacenamiento = AlmacenamientoMemoria(f"{BUCKET}-{filas}")
+            print(f"\n== {filas:,} filas ({args.backend}) ==")
+            for nombre, funcion in casos(almacenamiento, filas, args.semilla, con_figuras and filas <= args.figuras_hasta):
+                if args.solo and args.solo not in nombre:
+                    continue
+                mediana, minimo, _ = cronometrar(funcion, args.repeticiones)
+                resultados.append({
+                    "nombre": f"{nombre}@{filas}",
+                    "caso": nombre,
+                    "filas": filas,
+                    "mediana_ms": round(mediana, 3),
+                    "min_ms": round(minimo, 3),
+                })
+                print(f"{nombre:<36} {mediana:>10.2f} ms")
+
+    guardar({
+        "entorno": entorno(),
+        "parametros": {**vars(args), "figuras": con_figuras},
+        "resultados": resultados,
+    }, args.salida)
+    if args.base:
+        comparar({r["nombre"]: r["mediana_ms"] for r in resultados}, args.base, args.tolerancia)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark de descarga de objetos grandes: un solo GET contra rangos en paralelo.
+
+Usa la red simulada de bench_compresion.py, donde cada conexion tiene su propio ancho
+de banda (como una conexion TCP a S3), y mide el tiempo de traer el objeto completo y
+de parsearlo con pandas por cada camino.
+
+Uso:
+    python benchmarks/bench_descarga.py --mb 64 --ancho-banda 20 --hilos 1 4 8 16
+"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import datos_sinteticos as sint  # noqa: E402
+from benchmarks.bench_compresion import AlmacenamientoRed  # noqa: E402
+from benchmarks.comun import RESULTADOS, cronometrar, entorno, guardar  # noqa: E402
+from utils import descarga  # noqa: E402
+from utils.almacenamiento import AlmacenamientoMemoria, leer_csv  # noqa: E402
+
+BUCKET = "benchmark-descarga"
+KEY = "datos_crudos/results.csv"
+
+
+def publicar(almacenamiento, mb, semilla):
+    """results.csv sintetico de al menos `mb` megabytes; devuelve su tamaño"""
+    csv = sint.a_csv(sint.resultados(100_000, semilla))
+    encabezado, _, filas = csv.partition(b"\n")
+    almacenamiento.put(KEY, encabezado + b"\n" + filas * max(1, round(mb * descarga.MB / len(filas))))
+    return almacenamiento.head(KEY)["Size"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=float, default=64)
+    parser.add_argument("--ancho-banda", type=float, default=20, help="MB/s simulados por conexion")
+    parser.add_argument("--latencia", type=float, default=30, help="ms por peticion")
+    parser.add_argument("--hilos", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--parte-mb", type=float, default=descarga.TAMANO_PARTE / descarga.MB)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", default=os.path.join(RESULTADOS, "descarga.json"))
+    args = parser.parse_args()
+
+    AlmacenamientoMemoria.limpiar()
+    interno = AlmacenamientoMemoria(BUCKET)
+    tamano = publicar(interno, args.mb, args.semilla)
+    etag = interno.head(KEY)["ETag"]
+    red = AlmacenamientoRed(interno, args.ancho_banda, args.latencia)
+    tamano_parte = int(args.parte_mb * descarga.MB)
+    print(f"== {tamano / descarga.MB:,.1f} MB ({args.ancho_banda:g} MB/s por conexion, {args.latencia:g} ms) ==")
+
+    casos = [
+        ("descarga:un_get", lambda: red.get(KEY)),
+        ("parseo:un_get", lambda: leer_csv(red, KEY)),
+    ]
+    for hilos in args.hilos:
+        casos += [
+            (f"descarga:rangos_{hilos}", lambda h=hilos: descarga.descargar(red, KEY, tamano, tamano_parte, h, etag=etag)),
+            (f"parseo:rangos_{hilos}", lambda h=hilos: pd.read_csv(descarga.descargar(red, KEY, tamano, tamano_parte, h, etag=etag))),
+        ]
+
+    resultados = []
+    base = {}
+    for nombre, funcion in casos:
+        mediana, minimo, _ = cronometrar(funcion, args.repeticiones, calentamiento=0)
+        tipo = nombre.split(":")[0]
+        base.setdefault(tipo, mediana)
+        resultados.append({"nombre": nombre, "mb": round(tamano / descarga.MB, 1),
+                           "mediana_ms": round(mediana, 3), "min_ms": round(minimo, 3)})
+        print(f"{nombre:<28} {mediana:>10.1f} ms  x{base[tipo] / mediana:.1f}")
+
+    guardar({"entorno": entorno(), "parametros": vars(args), "resultados": resultados}, args.salida)
+
+
+if __name__ == "__main__":
+    main()
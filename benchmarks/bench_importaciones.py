@@ -0,0 +1,120 @@
+"""Perfil de tiempos de importacion de los modulos pesados de los dashboards.
+
+Cada modulo se importa en un proceso nuevo con `python -X importtime` para medir
+el arranque en frio. El resultado se guarda como JSON y, si se pasa una base,
+el script termina con error cuando algun modulo empeora mas de la tolerancia.
+
+Uso:
+    python benchmarks/bench_importaciones.py
+    python benchmarks/bench_importaciones.py --base benchmarks/resultados/importaciones.json --tolerancia 0.25
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from utils.importaciones import MODULOS_PESADOS  # noqa: E402
+
+SALIDA = os.path.join(RAIZ, "benchmarks", "resultados", "importaciones.json")
+
+
+def tiempo_importacion(modulo):
+    """Importa `modulo` en un proceso nuevo y devuelve (ms totales, 5 submodulos mas lentos)."""
+    codigo = (
+        "import time; inicio = time.perf_counter(); import %s; "
+        "print((time.perf_counter() - inicio) * 1000)" % modulo
+    )
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        capture_output=True,
+        text=True,
+    )
+    if proceso.returncode != 0:
+        return None, []
+    # Formato de -X importtime: "import time:  self [us] |  cumulative | imported package"
+    propios = []
+    for linea in proceso.stderr.splitlines():
+        partes = linea.split("|")
+        if not linea.startswith("import time:") or len(partes) != 3 or "cumulative" in linea:
+            continue
+        propio = int(partes[0].split(":")[1].strip()) / 1000
+        propios.append((partes[2].strip(), propio))
+    propios.sort(key=lambda x: x[1], reverse=True)
+    return float(proceso.stdout.strip()), propios[:5]
+
+
+def tiempo_calentamiento():
+    """Mide el calentamiento completo (importaciones + primera grafica) en un proceso nuevo."""
+    codigo = (
+        "import json, sys; sys.path.insert(0, %r);"
+        "from utils.importaciones import calentar; print(json.dumps(calentar()))" % RAIZ
+    )
+    inicio = time.perf_counter()
+    proceso = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True)
+    total = (time.perf_counter() - inicio) * 1000
+    if proceso.returncode != 0:
+        return None, {}
+    return total, json.loads(proceso.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--salida", default=SALIDA)
+    parser.add_argument("--base", help="JSON previo contra el cual comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="Empeoramiento maximo permitido (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    resultados = {"python": sys.version.split()[0], "repeticiones": args.repeticiones, "modulos": {}}
+    for modulo in MODULOS_PESADOS:
+        muestras, mas_lentos = [], []
+        for _ in range(args.repeticiones):
+            ms, lentos = tiempo_importacion(modulo)
+            if ms is not None:
+                muestras.append(ms)
+                mas_lentos = lentos
+        if not muestras:
+            print(f"{modulo:<24} no instalado")
+            continue
+        mediana = statistics.median(muestras)
+        resultados["modulos"][modulo] = {
+            "mediana_ms": round(mediana, 2),
+            "min_ms": round(min(muestras), 2),
+            "submodulos_mas_lentos_ms": {nombre: round(ms, 2) for nombre, ms in mas_lentos},
+        }
+        print(f"{modulo:<24} {mediana:>8.1f} ms")
+
+    total, pasos = tiempo_calentamiento()
+    if total is not None:
+        resultados["calentamiento"] = {"total_ms": round(total, 2), "pasos_ms": {k: round(v, 2) for k, v in pasos.items()}}
+        print(f"{'calentamiento completo':<24} {total:>8.1f} ms")
+
+    os.makedirs(os.path.dirname(args.salida), exist_ok=True)
+    with open(args.salida, "w") as f:
+        json.dump(resultados, f, indent=2)
+    print(f"Resultados guardados en {args.salida}")
+
+    if args.base:
+        with open(args.base) as f:
+            base = json.load(f)
+        regresiones = []
+        for modulo, datos in resultados["modulos"].items():
+            previo = base.get("modulos", {}).get(modulo)
+            if previo and datos["mediana_ms"] > previo["mediana_ms"] * (1 + args.tolerancia):
+                regresiones.append(f"{modulo}: {previo['mediana_ms']} ms -> {datos['mediana_ms']} ms")
+        if regresiones:
+            print("❌ Regresiones en tiempo de importacion:")
+            for r in regresiones:
+                print(f"   {r}")
+            sys.exit(1)
+        print("✅ Sin regresiones contra la base")
+
+
+if __name__ == "__main__":
+    main()
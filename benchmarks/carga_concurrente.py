@@ -0,0 +1,166 @@
+"""Prueba de carga: N sesiones simultaneas del dashboard del Mundial sin navegador.
+
+Cada usuario simulado es un `AppTest` de Streamlit sobre app_proyecto.py que cambia
+de seccion y mueve los sliders al azar. Todos corren en este mismo proceso (como en
+el servidor real), compartiendo las caches. Los datos son sinteticos y se sirven
+desde el backend local, sin AWS.
+
+Reporta reruns por segundo, percentiles de latencia por rerun y el crecimiento del
+RSS del proceso.
+
+Nota: Streamlit ejecuta el contenido de todas las tabs en cada rerun, asi que abrir
+una tab no genera un rerun aparte; su costo ya esta incluido en cada medicion.
+
+Uso:
+    python benchmarks/carga_concurrente.py --usuarios 20 --duracion 60 --filas 10000
+"""
+import argparse
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from benchmarks import datos_sinteticos as sint  # noqa: E402
+from benchmarks.comun import RESULTADOS, entorno, guardar  # noqa: E402
+from utils.almacenamiento import AlmacenamientoLocal  # noqa: E402
+
+APP = os.path.join(RAIZ, "app_proyecto.py")
+BUCKET = "carga-mundial"
+
+
+def rss_mb():
+    """RSS actual del proceso (MB); si no hay /proc, el maximo historico"""
+    try:
+        with open("/proc/self/status") as f:
+            for linea in f:
+                if linea.startswith("VmRSS:"):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximo / (1024 * 1024) if sys.platform == "darwin" else maximo / 1024
+
+
+def _percentil(valores, p):
+    valores = sorted(valores)
+    if not valores:
+        return 0.0
+    return valores[min(len(valores) - 1, round(p / 100 * (len(valores) - 1)))]
+
+
+def accion_aleatoria(at, rng):
+    """Cambia de seccion o mueve un slider del sidebar; devuelve el nombre de la accion"""
+    sliders = list(at.sidebar.slider)
+    if sliders and rng.random() < 0.5:
+        slider = rng.choice(sliders)
+        pasos = int((slider.max - slider.min) / (slider.step or 1))
+        slider.set_value(slider.min + rng.randint(0, max(pasos, 0)) * (slider.step or 1))
+        return "slider"
+    radio = at.sidebar.radio[0]
+    radio.set_value(rng.choice(radio.options))
+    return "seccion"
+
+
+def usuario(indice, fin, timeout, latencias, errores, lock):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(indice)
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    try:
+        inicio = time.perf_counter()
+        at.run()
+        propias = [("inicial", (time.perf_counter() - inicio) * 1000)]
+        while time.perf_counter() < fin:
+            accion = accion_aleatoria(at, rng)
+            inicio = time.perf_counter()
+            at.run()
+            propias.append((accion, (time.perf_counter() - inicio) * 1000))
+            if at.exception:
+                with lock:
+                    errores.append(str(at.exception[0].message))
+    except Exception as e:
+        with lock:
+            errores.append(f"usuario {indice}: {e}")
+        return
+    with lock:
+        latencias.extend(propias)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usuarios", type=int, default=10)
+    parser.add_argument("--duracion", type=float, default=30, help="Segundos de prueba")
+    parser.add_argument("--filas", type=int, default=10_000, help="Filas de los datasets sinteticos")
+    parser.add_argument("--timeout", type=float, default=60, help="Timeout por rerun (s)")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", default=os.path.join(RESULTADOS, "carga_concurrente.json"))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        sint.publicar_mundial(AlmacenamientoLocal(carpeta, BUCKET), args.filas, args.semilla)
+        os.environ.update({
+            "ALMACENAMIENTO_BACKEND": "local",
+            "ALMACENAMIENTO_RUTA": carpeta,
+            "BUCKET_MUNDIAL": BUCKET,
+        })
+
+        rss_inicial = rss_mb()
+        latencias, errores, lock = [], [], threading.Lock()
+        inicio = time.perf_counter()
+        fin = inicio + args.duracion
+        hilos = [
+            threading.Thread(target=usuario, args=(i, fin, args.timeout, latencias, errores, lock), daemon=True)
+            for i in range(args.usuarios)
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        transcurrido = time.perf_counter() - inicio
+        rss_final = rss_mb()
+
+    por_accion = {}
+    for accion, ms in latencias:
+        por_accion.setdefault(accion, []).append(ms)
+    todas = [ms for _, ms in latencias]
+    reporte = {
+        "reruns": len(todas),
+        "reruns_por_segundo": round(len(todas) / transcurrido, 2),
+        "latencia_ms": {
+            "p50": round(_percentil(todas, 50), 1),
+            "p95": round(_percentil(todas, 95), 1),
+            "p99": round(_percentil(todas, 99), 1),
+            "max": round(max(todas), 1) if todas else 0.0,
+        },
+        "latencia_por_accion_ms": {
+            accion: {"n": len(v), "p50": round(statistics.median(v), 1), "p95": round(_percentil(v, 95), 1)}
+            for accion, v in por_accion.items()
+        },
+        "rss_mb": {
+            "inicial": round(rss_inicial, 1),
+            "final": round(rss_final, 1),
+            "crecimiento": round(rss_final - rss_inicial, 1),
+        },
+        "errores": errores[:20],
+        "total_errores": len(errores),
+    }
+
+    print(f"Usuarios: {args.usuarios} | duracion: {transcurrido:.1f} s | filas: {args.filas:,}")
+    print(f"Reruns: {reporte['reruns']} ({reporte['reruns_por_segundo']} /s)")
+    print("Latencia por rerun (ms): " + ", ".join(f"{k}={v}" for k, v in reporte["latencia_ms"].items()))
+    print(f"RSS: {reporte['rss_mb']['inicial']} MB -> {reporte['rss_mb']['final']} MB (+{reporte['rss_mb']['crecimiento']} MB)")
+    if errores:
+        print(f"⚠️ {len(errores)} errores, p. ej.: {errores[0]}")
+
+    guardar({"entorno": entorno(), "parametros": vars(args), "reporte": reporte}, args.salida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Utilidades compartidas por los benchmarks: repeticiones, JSON de resultados y comparacion."""
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados")
+
+
+def cronometrar(funcion, repeticiones=5, calentamiento=1):
+    """Ejecuta `funcion` varias veces y devuelve (mediana_ms, min_ms, ultimo_resultado)"""
+    resultado = None
+    for _ in range(calentamiento):
+        resultado = funcion()
+    muestras = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        muestras.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(muestras), min(muestras), resultado
+
+
+def entorno():
+    """Versiones relevantes para poder comparar corridas"""
+    info = {
+        "fecha": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+    }
+    for modulo in ("pandas", "numpy", "plotly", "pyarrow"):
+        try:
+            info[modulo] = __import__(modulo).__version__
+        except ImportError:
+            pass
+    return info
+
+
+def guardar(resultados, ruta):
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    with open(ruta, "w") as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {ruta}")
+
+
+def comparar(actuales, ruta_base, tolerancia):
+    """Compara {nombre: mediana_ms} contra un JSON base; termina con error si hay regresiones"""
+    with open(ruta_base) as f:
+        base = {r["nombre"]: r["mediana_ms"] for r in json.load(f)["resultados"]}
+    regresiones = [
+        f"{nombre}: {base[nombre]:.2f} ms -> {ms:.2f} ms"
+        for nombre, ms in actuales.items()
+        if nombre in base and ms > base[nombre] * (1 + tolerancia)
+    ]
+    if regresiones:
+        print(f"❌ {len(regresiones)} regresiones (tolerancia {tolerancia:.0%}):")
+        for r in regresiones:
+            print(f"   {r}")
+        sys.exit(1)
+    print("✅ Sin regresiones contra la base")
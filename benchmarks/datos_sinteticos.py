@@ -0,0 +1,223 @@
+"""Datasets sinteticos con los mismos esquemas que esperan los dashboards.
+
+Todas las funciones reciben el numero de filas y una semilla, asi cada corrida del
+benchmark trabaja exactamente con los mismos datos.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+PAISES = [
+    "Mexico", "Canada", "United States", "Brazil", "Argentina", "Germany", "France", "Spain",
+    "Italy", "England", "Qatar", "Japan", "South Korea", "Uruguay", "Netherlands", "Portugal",
+]
+TORNEOS = ["FIFA World Cup", "Friendly", "Copa América", "UEFA Euro", "Gold Cup"]
+
+
+def _rng(semilla):
+    return np.random.default_rng(semilla)
+
+
+def tabla_final(filas, semilla=0):
+    """Asistencia vs capacidad (datos_limpios/tabla_final.csv)"""
+    rng = _rng(semilla)
+    capacidad = rng.integers(20_000, 100_000, filas)
+    asistencia = (capacidad * rng.uniform(0.4, 1.05, filas)).astype(int)
+    estadios = np.array([f"Estadio {i}" for i in range(max(1, filas // 4))])
+    estadio = estadios[rng.integers(0, len(estadios), filas)]
+    df = pd.DataFrame({
+        "Year": rng.choice(np.arange(1930, 2023, 4), filas),
+        "COUNTRY": rng.choice(PAISES, filas),
+        "STADIUM": estadio,
+        "Stadium": estadio,
+        "HIGHEST_ATTENDANCE": asistencia,
+        "Capacity": capacidad,
+    })
+    df["Porcentaje_Llenado"] = df["HIGHEST_ATTENDANCE"] / df["Capacity"] * 100
+    df["Diferencia_Absoluta"] = df["Capacity"] - df["HIGHEST_ATTENDANCE"]
+    return df.sort_values("Porcentaje_Llenado", ascending=False).reset_index(drop=True)
+
+
+def estadios(filas, semilla=0):
+    """Capacidad por estadio (datos_limpios/df_grafica_individual.csv)"""
+    rng = _rng(semilla)
+    return pd.DataFrame({
+        "Stadium": [f"Estadio {i}" for i in range(filas)],
+        "Country": rng.choice(PAISES, filas),
+        "Capacity": rng.integers(5_000, 100_000, filas).astype(float),
+    }).sort_values("Capacity").reset_index(drop=True)
+
+
+def analisis_victoria(filas, semilla=0):
+    """Victorias locales por pais (datos_limpios/df_analisis_victoria.csv)"""
+    rng = _rng(semilla)
+    partidos = rng.integers(1, 500, filas)
+    victorias = (partidos * rng.uniform(0, 1, filas)).astype(int)
+    df = pd.DataFrame({
+        "country": [f"Pais {i}" for i in range(filas)],
+        "Total_Partidos": partidos,
+        "Total_Victorias_Local": victorias,
+    })
+    df["Porcentaje_Victoria_Local"] = df["Total_Victorias_Local"] / df["Total_Partidos"] * 100
+    return df.sort_values("Total_Partidos", ascending=False).reset_index(drop=True)
+
+
+def conteo_goles(filas, semilla=0):
+    """Encuentros por total de goles (datos_limpios/df_conteo_goles.csv)"""
+    rng = _rng(semilla)
+    total_goles = np.arange(5, 5 + filas)
+    df = pd.DataFrame({
+        "total_goles": total_goles,
+        "Total_Encuentros": np.maximum(1, (20_000 * np.exp(-0.4 * (total_goles - 5)) * rng.uniform(0.8, 1.2, filas)).astype(int)),
+    })
+    df["total_goles_str"] = df["total_goles"].astype(str) + " goles"
+    return df
+
+
+def resultados(filas, semilla=0):
+    """Partidos historicos con el esquema de Kaggle results.csv"""
+    rng = _rng(semilla)
+    local = rng.choice(PAISES, filas)
+    return pd.DataFrame({
+        "date": pd.to_datetime("1872-11-30") + pd.to_timedelta(rng.integers(0, 55_000, filas), unit="D"),
+        "home_team": local,
+        "away_team": rng.choice(PAISES, filas),
+        "home_score": rng.poisson(1.6, filas),
+        "away_score": rng.poisson(1.1, filas),
+        "tournament": rng.choice(TORNEOS, filas),
+        "city": rng.choice(["Ciudad A", "Ciudad B", "Ciudad C"], filas),
+        "country": local,
+        "neutral": rng.random(filas) < 0.2,
+    })
+
+
+def goleadores(filas, semilla=0):
+    """Goleadores elite (datos_limpios/lambda/analisis_goleadores_top_3.csv)"""
+    rng = _rng(semilla)
+    return pd.DataFrame({
+        "Goleador": [f"Jugador {i}" for i in range(filas)],
+        "Goles": rng.integers(4, 120, filas),
+        "Equipo_Pais": rng.choice(PAISES, filas),
+    })
+
+
+def snapshots_servidores(filas, semilla=0, filas_por_snapshot=1_000):
+    """Snapshots JSON del monitor de servidores: lista de (key, bytes)"""
+    rng = _rng(semilla)
+    inicio = pd.Timestamp("2025-10-01")
+    snapshots = []
+    for n, desde in enumerate(range(0, filas, filas_por_snapshot)):
+        k = min(filas_por_snapshot, filas - desde)
+        registros = pd.DataFrame({
+            "timestamp": (inicio + pd.to_timedelta(np.arange(desde, desde + k), unit="s")).astype(str),
+            "server_id": rng.choice([f"srv-{i:02d}" for i in range(20)], k),
+            "status": rng.choice(["OK", "WARN", "ERROR"], k, p=[0.85, 0.1, 0.05]),
+            "cpu_usage": rng.uniform(0, 100, k).round(2),
+            "memory_usage": rng.uniform(0, 100, k).round(2),
+            "disk_usage": rng.uniform(0, 100, k).round(2),
+            "region": rng.choice(["us-west-1", "us-east-1", "eu-west-1"], k),
+        }).to_dict(orient="records")
+        snapshots.append((f"raw/snapshot_{n:06d}.json", json.dumps(registros).encode("utf-8")))
+    return snapshots
+
+
+def netflix(filas, semilla=0):
+    """Titulos con el esquema de netflix_titles.csv (type, release_year, duration...)"""
+    rng = _rng(semilla)
+    tipo = rng.choice(["Movie", "TV Show"], filas, p=[0.7, 0.3])
+    minutos = rng.integers(60, 180, filas)
+    temporadas = rng.integers(1, 10, filas)
+    duracion = np.where(tipo == "Movie", [f"{m} min" for m in minutos], [f"{t} Seasons" for t in temporadas])
+    return pd.DataFrame({
+        "show_id": [f"s{i}" for i in range(filas)],
+        "type": tipo,
+        "title": [f"Titulo {i}" for i in range(filas)],
+        "director": rng.choice([f"Director {i}" for i in range(200)], filas),
+        "release_year": rng.integers(1940, 2022, filas),
+        "duration": duracion,
+    })
+
+
+def a_csv(df):
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def resumen_paises(filas, semilla=0):
+    """Capacidad por pais anfitrion (datos_limpios/tabla_ordenada_max.csv)"""
+    df = estadios(filas, semilla)
+    return df.groupby("Country").agg(
+        Estadios_Unicos=("Stadium", "nunique"),
+        Capacidad_Promedio=("Capacity", "mean"),
+        Capacidad_Maxima=("Capacity", "max"),
+        Capacidad_Total_Asientos=("Capacity", "sum"),
+    ).reset_index().sort_values("Capacidad_Maxima", ascending=False)
+
+
+def proyeccion_financiera(semilla=0):
+    """Fondo de premios historico + proyeccion 2026 (datos_limpios/df_proyeccion_financiera.csv)"""
+    rng = _rng(semilla)
+    years = np.arange(1982, 2023, 4)
+    fondo = np.cumprod(np.full(len(years), 1.12)) * 20 * rng.uniform(0.95, 1.05, len(years))
+    df = pd.DataFrame({"Year": years, "Total_Fund_Millions": fondo, "Tipo": "Histórico"})
+    proyeccion = pd.DataFrame({"Year": [2026], "Total_Fund_Millions": [fondo[-1] * 1.119], "Tipo": ["Proyección"]})
+    return pd.concat([df, proyeccion], ignore_index=True)
+
+
+def top50_paises(semilla=0):
+    """Jugadores del top 50 G+A por pais (datos_limpios/lambda/analisis_top_50_ga_paises.csv)"""
+    rng = _rng(semilla)
+    conteo = rng.multinomial(50, np.full(len(PAISES), 1 / len(PAISES)))
+    df = pd.DataFrame({"COUNTRY": PAISES, "Jugadores_Top_50": conteo})
+    return df[df["Jugadores_Top_50"] > 0].sort_values("Jugadores_Top_50", ascending=False)
+
+
+def top10_paises_goleadores(semilla=0):
+    """Paises con mas goleadores (datos_limpios/lambda/analisis_top_10_paises_goleadores.csv)"""
+    rng = _rng(semilla)
+    return pd.DataFrame({
+        "Pais_Equipo": PAISES[:10],
+        "Numero_de_Goleadores": np.sort(rng.integers(20, 300, 10))[::-1],
+    })
+
+
+NOMBRES = ["José", "Luis", "Müller", "Ángel", "Thomas", "Lionel", "Cristiano", "Zoë", "Kylian", "Raúl", "Hugo", "Iker"]
+APELLIDOS = ["Hernández", "Messi", "Ronaldo", "Mbappé", "Núñez", "Gómez", "Kane", "Suárez", "Müller", "Pérez", "Lewandowski", "Son"]
+
+
+def perfiles_jugadores(filas, semilla=0):
+    """Perfiles de jugadores con nombres acentuados (datos_limpios/lambda/perfiles_jugadores.csv)"""
+    rng = _rng(semilla)
+    goles = rng.integers(0, 400, filas)
+    asistencias = rng.integers(0, 200, filas)
+    pais = rng.choice(PAISES, filas)
+    return pd.DataFrame({
+        "Jugador": [
+            f"{NOMBRES[a]} {APELLIDOS[b]} {i}"
+            for i, (a, b) in enumerate(zip(rng.integers(0, len(NOMBRES), filas), rng.integers(0, len(APELLIDOS), filas)))
+        ],
+        "Pais": pais,
+        "Goles": goles,
+        "Asistencias": asistencias,
+        "Goles_Internacionales": rng.integers(0, 80, filas),
+        "Equipo_Internacional": pais,
+        "G_A": goles + asistencias,
+    })
+
+
+def publicar_mundial(almacenamiento, filas, semilla=0):
+    """Publica los nueve datasets que carga app_proyecto.py"""
+    datasets = {
+        "datos_limpios/tabla_final.csv": tabla_final(filas, semilla),
+        "datos_limpios/df_grafica_individual.csv": estadios(filas, semilla),
+        "datos_limpios/tabla_ordenada_max.csv": resumen_paises(filas, semilla),
+        "datos_limpios/df_analisis_victoria.csv": analisis_victoria(filas, semilla),
+        "datos_limpios/df_conteo_goles.csv": conteo_goles(min(filas, 30), semilla),
+        "datos_limpios/df_proyeccion_financiera.csv": proyeccion_financiera(semilla),
+        "datos_limpios/lambda/analisis_top_50_ga_paises.csv": top50_paises(semilla),
+        "datos_limpios/lambda/analisis_goleadores_top_3.csv": goleadores(filas, semilla),
+        "datos_limpios/lambda/analisis_top_10_paises_goleadores.csv": top10_paises_goleadores(semilla),
+    }
+    for key, df in datasets.items():
+        almacenamiento.put(key, a_csv(df))
+    return list(datasets)
@@ -0,0 +1 @@
+"""Funciones Lambda del proyecto; tambien se pueden correr localmente con `python -m lambdas.<modulo>`."""
@@ -0,0 +1,570 @@
+"""Lambda MySQL -> S3: exporta la tabla en streaming a Parquet particionado por fecha y ciudad.
+
+Las filas se leen con un cursor del lado del servidor (pymysql SSCursor) en lotes de
+`TAMANO_LOTE`, asi la Lambda nunca tiene la tabla completa en memoria. Se escribe:
+
+    db_export/parquet/fecha=<AAAA-MM-DD>/ciudad=<ciudad>/part-<id>-<n>.parquet
+    db_export/agregados/fecha=<AAAA-MM-DD>/conteo_ciudad.csv   (ciudad, Total Personas)
+    db_export/agregados/fecha=<AAAA-MM-DD>/muestra.csv         (5 primeras + 5 ultimas filas)
+    db_export/agregados/fecha=<AAAA-MM-DD>/resumen.json        (filas, columnas, archivos)
+
+El dashboard (Semana 2/app_lambda_mysql.py) solo lee los agregados y la muestra.
+
+Modo incremental (CDC, `exportar_incremental`): solo se exportan las filas con
+`updated_at` posterior a la marca de agua de db_export/cdc/estado.json, como deltas en
+db_export/cdc/deltas/. `compactar` une el snapshot vigente con los deltas (ultima
+version de cada id) en un snapshot nuevo con el mismo layout que la exportacion completa
+(db_export/cdc/snapshot/fecha=.../ciudad=.../), una parte a la vez. El manifiesto
+versionado de db_export/cdc/ (utils/manifiesto.py) apunta al snapshot y a los deltas
+pendientes; las exportaciones completas publican otro en db_export/agregados/.
+
+Cada compactacion borra los archivos de CDC que ya no apunta ningun manifiesto vigente
+en los ultimos `CDC_GRACIA_S` segundos (una exportacion incremental en curso todavia
+puede publicar sobre el manifiesto anterior). Las versiones del manifiesto mas viejas que
+eso quedan como historial, sin sus archivos.
+
+Para que el dashboard cargue en tiempo proporcional a los cambios, el manifiesto de CDC
+tambien apunta a archivos chicos que se mantienen en cada corrida:
+
+    db_export/cdc/conteos/snapshot-<id>.csv   conteo por ciudad del snapshot
+    db_export/cdc/conteos/delta-<id>.csv      cambio neto por ciudad de cada delta
+    db_export/cdc/muestras/<id>.csv           5 primeras + 5 ultimas filas (por id)
+
+El dashboard suma los cambios de los deltas pendientes al conteo del snapshot y nunca
+lee los Parquet.
+
+Cualquier conexion DB-API sirve (`exportar(conexion, almacenamiento)`), por ejemplo
+sqlite3 para probar localmente:
+    python -m lambdas.exportar_mysql --sqlite personas.db --backend local --ruta datos_locales
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import sys
+import uuid
+from collections import Counter, defaultdict, deque
+from urllib.parse import quote, unquote
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.almacenamiento import ObjetoNoEncontrado, crear_almacenamiento  # noqa: E402
+from utils.importaciones import importar_diferido  # noqa: E402
+from utils import compresion, manifiesto  # noqa: E402
+
+pa = importar_diferido("pyarrow")
+pq = importar_diferido("pyarrow.parquet")
+
+BUCKET = os.getenv("BUCKET_LAMBDA", "xideralaws-curso-yalbani")
+TABLA = os.getenv("MYSQL_TABLA", "personas")
+COL_CIUDAD = "ciudad"
+PREFIX = "db_export/"
+PREFIX_PARQUET = f"{PREFIX}parquet/"
+PREFIX_AGREGADOS = f"{PREFIX}agregados/"
+TAMANO_LOTE = int(os.getenv("EXPORT_LOTE", "5000"))
+# Filas acumuladas (todas las ciudades) antes de escribir archivos Parquet
+FILAS_POR_ARCHIVO = int(os.getenv("EXPORT_FILAS_ARCHIVO", "100000"))
+FILAS_MUESTRA = 5
+
+# Exportacion incremental (CDC)
+COL_ID = "id"
+COL_CAMBIO = "updated_at"
+PREFIX_CDC = f"{PREFIX}cdc/"
+CDC_ESTADO = f"{PREFIX_CDC}estado.json"
+CDC_DELTAS = f"{PREFIX_CDC}deltas/delta-"
+CDC_SNAPSHOT = f"{PREFIX_CDC}snapshot/"
+CDC_CONTEOS = f"{PREFIX_CDC}conteos/"
+CDC_MUESTRAS = f"{PREFIX_CDC}muestras/"
+# Carpetas de CDC cuyos archivos se borran cuando ningun manifiesto reciente los usa
+CDC_CARPETAS_DATOS = (f"{PREFIX_CDC}snapshot", f"{PREFIX_CDC}deltas/", CDC_CONTEOS, CDC_MUESTRAS)
+# Duracion maxima de una Lambda (15 min) con margen
+CDC_GRACIA_S = int(os.getenv("CDC_GRACIA_S", "1800"))
+
+
+# ==========================================
+# CONEXION
+# ==========================================
+def conectar_mysql():
+    """Conexion pymysql con los datos de MYSQL_HOST / MYSQL_USER / MYSQL_PASSWORD / MYSQL_DB"""
+    pymysql = importar_diferido("pymysql")
+    return pymysql.connect(
+        host=os.getenv("MYSQL_HOST", "localhost"),
+        port=int(os.getenv("MYSQL_PORT", "3306")),
+        user=os.getenv("MYSQL_USER", "root"),
+        password=os.getenv("MYSQL_PASSWORD", ""),
+        database=os.getenv("MYSQL_DB", "proyecto"),
+        charset="utf8mb4",
+    )
+
+
+def cursor_streaming(conexion):
+    """Cursor sin buffer del lado del cliente: SSCursor en pymysql, el cursor normal en otros drivers"""
+    try:
+        from pymysql.connections import Connection
+        from pymysql.cursors import SSCursor
+    except ImportError:
+        return conexion.cursor()
+    if isinstance(conexion, Connection):
+        return conexion.cursor(SSCursor)
+    return conexion.cursor()
+
+
+def leer_lotes(conexion, consulta, parametros=(), tamano_lote=TAMANO_LOTE):
+    """Devuelve (columnas, iterador de lotes de filas) para `consulta`"""
+    cursor = cursor_streaming(conexion)
+    cursor.execute(consulta, parametros)
+    columnas = [d[0] for d in cursor.description]
+
+    def lotes():
+        try:
+            while True:
+                filas = cursor.fetchmany(tamano_lote)
+                if not filas:
+                    break
+                yield filas
+        finally:
+            cursor.close()
+
+    return columnas, lotes()
+
+
+# ==========================================
+# ESCRITURA
+# ==========================================
+def _subir_parquet(almacenamiento, key, df):
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), buffer)
+    buffer.seek(0)
+    almacenamiento.subir(key, buffer)
+
+
+def _subir_csv(almacenamiento, key, df):
+    # Los CSV de agregados se publican tambien comprimidos (el Parquet ya lo esta)
+    datos = df.to_csv(index=False).encode("utf-8")
+    compresion.publicar(almacenamiento, key, datos)
+    return datos
+
+
+class EscritorParticionado:
+    """Acumula filas por ciudad y las escribe como Parquet estilo Hive (fecha=/ciudad=)"""
+
+    def __init__(self, almacenamiento, columnas, fecha, id_exportacion, prefix=PREFIX_PARQUET, col_rango=None):
+        self.almacenamiento = almacenamiento
+        self.columnas = columnas
+        self.fecha = fecha
+        self.id_exportacion = id_exportacion
+        self.prefix = prefix
+        self.indice_ciudad = columnas.index(COL_CIUDAD)
+        # Con `col_rango`, `rangos` guarda el [minimo, maximo] de esa columna en cada archivo
+        self.col_rango = col_rango
+        self._pendientes = defaultdict(list)
+        self._filas_pendientes = 0
+        self._partes = Counter()
+        self.archivos = []
+        self.rangos = []
+
+    def agregar(self, filas):
+        for fila in filas:
+            self._pendientes[fila[self.indice_ciudad]].append(fila)
+        self._filas_pendientes += len(filas)
+        if self._filas_pendientes >= FILAS_POR_ARCHIVO:
+            self.vaciar()
+
+    def vaciar(self):
+        for ciudad, filas in self._pendientes.items():
+            df = pd.DataFrame.from_records(filas, columns=self.columnas).drop(columns=[COL_CIUDAD])
+            parte = self._partes[ciudad]
+            self._partes[ciudad] += 1
+            key = (
+                f"{self.prefix}fecha={self.fecha}/ciudad={quote(str(ciudad), safe='')}/"
+                f"part-{self.id_exportacion}-{parte:05d}.parquet"
+            )
+            _subir_parquet(self.almacenamiento, key, df)
+            self.archivos.append(key)
+            if self.col_rango is not None:
+                self.rangos.append([int(df[self.col_rango].min()), int(df[self.col_rango].max())])
+        self._pendientes.clear()
+        self._filas_pendientes = 0
+
+
+def exportar(conexion, almacenamiento, tabla=TABLA, fecha=None, tamano_lote=TAMANO_LOTE, consulta=None, parametros=()):
+    """Exporta `tabla` (o el resultado de `consulta`) y escribe los agregados; devuelve el resumen"""
+    fecha = fecha or datetime.date.today().isoformat()
+    id_exportacion = _id_exportacion()
+    columnas, lotes = leer_lotes(conexion, consulta or f"SELECT * FROM {tabla}", parametros, tamano_lote)
+
+    escritor = EscritorParticionado(almacenamiento, columnas, fecha, id_exportacion)
+    conteo = Counter()
+    primeras, ultimas = [], deque(maxlen=FILAS_MUESTRA)
+    total = 0
+    for filas in lotes:
+        escritor.agregar(filas)
+        conteo.update(fila[escritor.indice_ciudad] for fila in filas)
+        if len(primeras) < FILAS_MUESTRA:
+            primeras.extend(filas[:FILAS_MUESTRA - len(primeras)])
+        ultimas.extend(filas)
+        total += len(filas)
+    escritor.vaciar()
+
+    # La muestra no repite filas cuando la tabla tiene menos de 2 * FILAS_MUESTRA
+    muestra = primeras + list(ultimas)[max(0, FILAS_MUESTRA - (total - FILAS_MUESTRA)):] if total > FILAS_MUESTRA else primeras
+    prefix_agregados = f"{PREFIX_AGREGADOS}fecha={fecha}/"
+    df_conteo = pd.DataFrame(conteo.most_common(), columns=[COL_CIUDAD, "Total Personas"])
+    datos_conteo = _subir_csv(almacenamiento, f"{prefix_agregados}conteo_ciudad.csv", df_conteo)
+    df_muestra = pd.DataFrame.from_records(muestra, columns=columnas)
+    _subir_csv(almacenamiento, f"{prefix_agregados}muestra.csv", df_muestra)
+
+    resumen = {
+        "id_exportacion": id_exportacion,
+        "fecha": fecha,
+        "filas": total,
+        "columnas": columnas,
+        "ciudades": len(conteo),
+        "archivos": escritor.archivos,
+    }
+    almacenamiento.put(f"{prefix_agregados}resumen.json", json.dumps(resumen, ensure_ascii=False, indent=2))
+    # El dashboard encuentra la ultima exportacion con un solo GET
+    manifiesto.publicar(
+        almacenamiento, PREFIX_AGREGADOS,
+        key=f"{prefix_agregados}conteo_ciudad.csv", datos=datos_conteo, filas=total,
+        esquema=manifiesto.esquema_de(df_muestra), muestra=f"{prefix_agregados}muestra.csv",
+        fecha=fecha, id_exportacion=id_exportacion, ciudades=len(conteo),
+    )
+    return resumen
+
+
+# ==========================================
+# CDC: EXPORTACION INCREMENTAL
+# ==========================================
+def _marcador(conexion):
+    """Placeholder de parametros del driver (%s en pymysql, ? en sqlite3)"""
+    modulo = sys.modules.get(type(conexion).__module__.split(".")[0])
+    return "?" if getattr(modulo, "paramstyle", "pyformat") == "qmark" else "%s"
+
+
+def _leer_json(almacenamiento, key, default=None):
+    try:
+        return json.loads(almacenamiento.get(key))
+    except ObjetoNoEncontrado:
+        return default
+
+
+def _guardar_json(almacenamiento, key, datos):
+    almacenamiento.put(key, json.dumps(datos, ensure_ascii=False, indent=2, default=str))
+
+
+def _id_exportacion():
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
+
+
+def _escribir_partes(almacenamiento, prefix, id_exportacion, columnas, lotes):
+    """Escribe los lotes como archivos Parquet de hasta FILAS_POR_ARCHIVO filas; devuelve (keys, filas, ultima fila)"""
+    archivos, pendientes, total, ultima = [], [], 0, None
+
+    def vaciar():
+        key = f"{prefix}{id_exportacion}-{len(archivos):05d}.parquet"
+        _subir_parquet(almacenamiento, key, pd.DataFrame.from_records(pendientes, columns=columnas))
+        archivos.append(key)
+        pendientes.clear()
+
+    for filas in lotes:
+        pendientes.extend(filas)
+        total += len(filas)
+        ultima = filas[-1]
+        if len(pendientes) >= FILAS_POR_ARCHIVO:
+            vaciar()
+    if pendientes:
+        vaciar()
+    return archivos, total, ultima
+
+
+def _cdc_vigente(almacenamiento):
+    return manifiesto.actual(almacenamiento, PREFIX_CDC) or {
+        "snapshot": [], "rangos": [], "deltas": [], "cambios": [], "filas": 0, "max_id": None,
+        "conteo": None, "muestra": None,
+    }
+
+
+def _leer_parquet(almacenamiento, key, columnas=None):
+    # Parquet necesita un archivo con seek: el stream de S3 no sirve
+    return pd.read_parquet(io.BytesIO(almacenamiento.get(key)), columns=columnas)
+
+
+def _muestra_por_id(df):
+    """Las FILAS_MUESTRA filas con menor id y las FILAS_MUESTRA con mayor id"""
+    df = df.sort_values(COL_ID, ignore_index=True)
+    if len(df) <= 2 * FILAS_MUESTRA:
+        return df
+    return pd.concat([df.head(FILAS_MUESTRA), df.tail(FILAS_MUESTRA)], ignore_index=True)
+
+
+def _ciudad_de_key(key):
+    """Ciudad de un archivo con layout ciudad=<ciudad>/ (None si no la lleva en la ruta)"""
+    for segmento in key.split("/"):
+        if segmento.startswith("ciudad="):
+            return unquote(segmento[len("ciudad="):])
+    return None
+
+
+def _leer_parte_snapshot(almacenamiento, key, columnas=None, filtros=None):
+    """Parte del snapshot con su columna ciudad (en el layout ciudad=/ va en la ruta, no en el archivo)"""
+    ciudad = _ciudad_de_key(key)
+    leer = columnas if columnas is None or ciudad is None else [c for c in columnas if c != COL_CIUDAD]
+    df = pd.read_parquet(io.BytesIO(almacenamiento.get(key)), columns=leer, filters=filtros)
+    if ciudad is not None:
+        df[COL_CIUDAD] = ciudad
+    return df
+
+
+def _ciudades_anteriores(almacenamiento, vigente, ids):
+    """Ciudad vigente de los `ids` que ya se habian exportado ({id: ciudad}).
+
+    Solo se leen las partes del snapshot cuyo rango de ids los contiene (solo la columna
+    id, y solo los row groups que pueden tenerlos) y los deltas pendientes.
+    """
+    max_id = vigente.get("max_id")
+    ids = [i for i in ids if max_id is not None and i <= max_id]
+    if not ids:
+        return {}
+    buscados = set(ids)
+    filtros = [(COL_ID, "in", sorted(buscados))]
+    anteriores = {}
+    for key, (minimo, maximo) in zip(vigente["snapshot"], vigente.get("rangos", [])):
+        if any(minimo <= i <= maximo for i in ids):
+            df = _leer_parte_snapshot(almacenamiento, key, [COL_ID, COL_CIUDAD], filtros)
+            anteriores.update(zip(df[COL_ID], df[COL_CIUDAD]))
+    # Los deltas van al final y en orden: la ultima aparicion de cada id gana
+    for key in vigente["deltas"]:
+        df = _leer_parquet(almacenamiento, key, [COL_ID, COL_CIUDAD])
+        df = df[df[COL_ID].isin(buscados)]
+        anteriores.update(zip(df[COL_ID], df[COL_CIUDAD]))
+    return anteriores
+
+
+def exportar_incremental(conexion, almacenamiento, tabla=TABLA, tamano_lote=TAMANO_LOTE):
+    """Exporta solo las filas con (updated_at, id) mayor a la marca de agua guardada en estado.json.
+
+    Las filas cambiadas se escriben como un delta nuevo y se agregan al manifiesto junto
+    con su cambio neto por ciudad y la muestra actualizada; la marca de agua avanza hasta
+    la ultima fila exportada. Las filas borradas en la base no se detectan (para eso
+    haria falta un borrado logico o leer el binlog).
+    """
+    estado = _leer_json(almacenamiento, CDC_ESTADO, {})
+    marca = estado.get("marca_agua")
+    p = _marcador(conexion)
+    consulta = f"SELECT * FROM {tabla}"
+    parametros = ()
+    if marca is not None:
+        consulta += f" WHERE {COL_CAMBIO} > {p} OR ({COL_CAMBIO} = {p} AND {COL_ID} > {p})"
+        parametros = (marca["valor"], marca["valor"], marca["id"])
+    consulta += f" ORDER BY {COL_CAMBIO}, {COL_ID}"
+
+    columnas, lotes = leer_lotes(conexion, consulta, parametros, tamano_lote)
+    id_exportacion = _id_exportacion()
+    archivos, total, ultima = _escribir_partes(almacenamiento, CDC_DELTAS, id_exportacion, columnas, lotes)
+
+    if total:
+        marca = {"valor": str(ultima[columnas.index(COL_CAMBIO)]), "id": ultima[columnas.index(COL_ID)]}
+        vigente = _cdc_vigente(almacenamiento)
+        # El delta es chico: se vuelve a leer completo para sus agregados
+        delta = pd.concat([_leer_parquet(almacenamiento, key) for key in archivos], ignore_index=True)
+        delta = delta.drop_duplicates(subset=[COL_ID], keep="last")
+        anteriores = _ciudades_anteriores(almacenamiento, vigente, delta[COL_ID].tolist())
+
+        # Cambio neto por ciudad: +1 en la ciudad nueva y -1 en la anterior si el id ya existia
+        cambios = Counter(delta[COL_CIUDAD])
+        cambios.subtract(anteriores.values())
+        df_cambios = pd.DataFrame([(c, n) for c, n in cambios.items() if n], columns=[COL_CIUDAD, "cambio"])
+        key_cambios = f"{CDC_CONTEOS}delta-{id_exportacion}.csv"
+        _subir_csv(almacenamiento, key_cambios, df_cambios)
+
+        muestra_anterior = compresion.leer_csv(almacenamiento, vigente["muestra"]) if vigente.get("muestra") else None
+        df_muestra = _muestra_por_id(
+            pd.concat([muestra_anterior, delta], ignore_index=True).drop_duplicates(subset=[COL_ID], keep="last")
+            if muestra_anterior is not None else delta
+        )
+        key_muestra = f"{CDC_MUESTRAS}{id_exportacion}.csv"
+        _subir_csv(almacenamiento, key_muestra, df_muestra)
+
+        max_id = max(int(delta[COL_ID].max()), vigente["max_id"] if vigente.get("max_id") is not None else 0)
+        manifiesto.publicar(
+            almacenamiento, PREFIX_CDC, filas=vigente["filas"] + len(delta) - len(anteriores),
+            esquema=vigente.get("esquema") or manifiesto.esquema_de(delta),
+            snapshot=vigente["snapshot"], rangos=vigente.get("rangos", []), conteo=vigente.get("conteo"),
+            deltas=vigente["deltas"] + archivos,
+            cambios=vigente.get("cambios", []) + [{"archivos": archivos, "conteo": key_cambios}],
+            muestra=key_muestra, max_id=max_id, columnas=columnas,
+        )
+        # El estado se guarda al final: si algo falla antes, la siguiente corrida repite el delta
+        _guardar_json(almacenamiento, CDC_ESTADO, {"marca_agua": marca, "id_exportacion": id_exportacion})
+    return {"id_exportacion": id_exportacion, "filas": total, "archivos": archivos, "marca_agua": marca}
+
+
+def compactar(almacenamiento, fecha=None):
+    """Une snapshot + deltas en un snapshot nuevo (la ultima version de cada id) y vacia los deltas.
+
+    El snapshot se recorre una parte a la vez y cada parte pasa por el mismo
+    EscritorParticionado de la exportacion completa: en memoria solo estan esa parte, las
+    filas por escribir y la ultima version de las filas de los deltas (que crecen con los
+    cambios, no con la tabla). Tambien escribe el conteo por ciudad y la muestra del
+    snapshot nuevo y, ya publicado el manifiesto, borra los archivos reemplazados.
+    """
+    inicio = datetime.datetime.now(datetime.timezone.utc)
+    anterior = manifiesto.actual(almacenamiento, PREFIX_CDC)
+    if not anterior or not anterior["deltas"]:
+        borrados = _borrar_reemplazados(almacenamiento, inicio)
+        return {"filas": anterior["filas"] if anterior else 0, "deltas_compactados": 0, "borrados": borrados}
+
+    compactados = list(anterior["deltas"])
+    cambiadas = pd.concat([_leer_parquet(almacenamiento, key) for key in compactados], ignore_index=True)
+    # Los deltas van en orden: la ultima aparicion de cada id es la version vigente
+    cambiadas = cambiadas.drop_duplicates(subset=[COL_ID], keep="last")
+    columnas = anterior.get("columnas") or list(cambiadas.columns)
+    ids_cambiados = set(cambiadas[COL_ID])
+
+    id_exportacion = _id_exportacion()
+    escritor = EscritorParticionado(
+        almacenamiento, columnas, fecha or datetime.date.today().isoformat(), id_exportacion,
+        prefix=CDC_SNAPSHOT, col_rango=COL_ID,
+    )
+    conteo = Counter()
+    muestra = None
+    filas = 0
+    max_id = None
+
+    def agregar(df):
+        nonlocal muestra, filas, max_id
+        if df.empty:
+            return
+        # En tandas de FILAS_POR_ARCHIVO: el escritor nunca junta mas de 2 * FILAS_POR_ARCHIVO filas
+        for inicio_tanda in range(0, len(df), FILAS_POR_ARCHIVO):
+            tanda = df.iloc[inicio_tanda:inicio_tanda + FILAS_POR_ARCHIVO]
+            escritor.agregar(list(tanda[columnas].itertuples(index=False, name=None)))
+        conteo.update(df[COL_CIUDAD])
+        filas += len(df)
+        max_id = max(int(df[COL_ID].max()), max_id if max_id is not None else 0)
+        muestra = _muestra_por_id(pd.concat([muestra, df[columnas]], ignore_index=True) if muestra is not None else df[columnas])
+
+    for key in anterior["snapshot"]:
+        parte = _leer_parte_snapshot(almacenamiento, key)
+        agregar(parte[~parte[COL_ID].isin(ids_cambiados)])
+    agregar(cambiadas)
+    escritor.vaciar()
+
+    key_conteo = f"{CDC_CONTEOS}snapshot-{id_exportacion}.csv"
+    df_conteo = pd.DataFrame(sorted(conteo.items()), columns=[COL_CIUDAD, "Total Personas"])
+    _subir_csv(almacenamiento, key_conteo, df_conteo)
+
+    # Otra exportacion pudo agregar deltas mientras se compactaba: esos se conservan,
+    # con sus cambios por ciudad, y sus filas entran a la muestra
+    vigente = manifiesto.actual(almacenamiento, PREFIX_CDC)
+    pendientes = [c for c in vigente.get("cambios", []) if not set(c["archivos"]) & set(compactados)]
+    deltas = [key for key in vigente["deltas"] if key not in compactados]
+    if deltas:
+        muestra = pd.concat(
+            [muestra, *[_leer_parquet(almacenamiento, key) for key in deltas]], ignore_index=True
+        ).drop_duplicates(subset=[COL_ID], keep="last")
+    key_muestra = f"{CDC_MUESTRAS}{id_exportacion}.csv"
+    _subir_csv(almacenamiento, key_muestra, _muestra_por_id(muestra) if muestra is not None else pd.DataFrame(columns=columnas))
+
+    # Compactar no cambia la tabla: con deltas pendientes el total ya los incluye
+    manifiesto.publicar(
+        almacenamiento, PREFIX_CDC, filas=vigente["filas"] if deltas else filas,
+        esquema=vigente.get("esquema") or manifiesto.esquema_de(cambiadas),
+        snapshot=escritor.archivos, rangos=escritor.rangos, conteo=key_conteo, deltas=deltas, cambios=pendientes,
+        muestra=key_muestra, max_id=max(max_id or 0, vigente.get("max_id") or 0),
+        columnas=columnas,
+    )
+    borrados = _borrar_reemplazados(almacenamiento, inicio)
+    return {"filas": filas, "deltas_compactados": len(compactados), "archivos": escritor.archivos, "borrados": borrados}
+
+
+def _referenciados(manifiesto_cdc):
+    keys = set(manifiesto_cdc.get("snapshot", [])) | set(manifiesto_cdc.get("deltas", []))
+    keys |= {c["conteo"] for c in manifiesto_cdc.get("cambios", [])}
+    keys |= {manifiesto_cdc.get("conteo"), manifiesto_cdc.get("muestra")}
+    return keys - {None}
+
+
+def _borrar_reemplazados(almacenamiento, ahora, gracia=None):
+    """Borra los archivos de CDC que no usa ningun manifiesto vigente en los ultimos `gracia` segundos.
+
+    Tampoco se borra nada escrito en ese lapso: puede ser un delta que aun no se publica.
+    Devuelve cuantos objetos se borraron (contando las variantes comprimidas).
+    """
+    limite = ahora - datetime.timedelta(seconds=CDC_GRACIA_S if gracia is None else gracia)
+    conservar = set()
+    for numero in manifiesto.versiones(almacenamiento, PREFIX_CDC):
+        version = manifiesto.version(almacenamiento, PREFIX_CDC, numero)
+        conservar |= _referenciados(version)
+        # La primera version creada antes del limite era la vigente en ese momento
+        if datetime.datetime.fromisoformat(version["creado"]) < limite:
+            break
+    borrados = 0
+    for carpeta in CDC_CARPETAS_DATOS:
+        for obj in almacenamiento.listar(carpeta):
+            if compresion.sin_extension(obj["Key"]) in conservar or obj["LastModified"] >= limite:
+                continue
+            almacenamiento.borrar(obj["Key"])
+            borrados += 1
+    return borrados
+
+
+def lambda_handler(event, context):
+    """`modo`: completo (default), incremental o compactar"""
+    event = event or {}
+    almacenamiento = crear_almacenamiento(event.get("bucket", BUCKET))
+    modo = event.get("modo", "completo")
+    if modo == "compactar":
+        resumen = compactar(almacenamiento)
+    else:
+        conexion = conectar_mysql()
+        try:
+            if modo == "incremental":
+                resumen = exportar_incremental(conexion, almacenamiento, tabla=event.get("tabla", TABLA))
+            else:
+                resumen = exportar(conexion, almacenamiento, tabla=event.get("tabla", TABLA))
+        finally:
+            conexion.close()
+    return {"statusCode": 200, "body": {k: v for k, v in resumen.items() if k != "archivos"}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta la tabla de MySQL (o SQLite) a Parquet particionado")
+    parser.add_argument("--sqlite", help="Ruta de una base SQLite en lugar de MySQL")
+    parser.add_argument("--tabla", default=TABLA)
+    parser.add_argument("--modo", choices=["completo", "incremental", "compactar"], default="completo")
+    parser.add_argument("--backend", choices=["s3", "local", "memoria"], default=None)
+    parser.add_argument("--ruta", help="Carpeta raiz del backend local (ALMACENAMIENTO_RUTA)")
+    parser.add_argument("--bucket", default=BUCKET)
+    args = parser.parse_args()
+
+    if args.ruta:
+        os.environ["ALMACENAMIENTO_RUTA"] = args.ruta
+    almacenamiento = crear_almacenamiento(args.bucket, backend=args.backend)
+    if args.modo == "compactar":
+        resumen = compactar(almacenamiento)
+        print(f"Snapshot con {resumen['filas']:,} filas ({resumen['deltas_compactados']} deltas compactados, "
+              f"{resumen['borrados']} archivos reemplazados borrados)")
+        return
+
+    if args.sqlite:
+        import sqlite3
+        conexion = sqlite3.connect(args.sqlite)
+    else:
+        conexion = conectar_mysql()
+    try:
+        if args.modo == "incremental":
+            resumen = exportar_incremental(conexion, almacenamiento, tabla=args.tabla)
+            print(f"Delta con {resumen['filas']:,} filas cambiadas (marca de agua: {resumen['marca_agua']})")
+        else:
+            resumen = exportar(conexion, almacenamiento, tabla=args.tabla)
+            print(f"Exportadas {resumen['filas']:,} filas de {resumen['ciudades']} ciudades en {len(resumen['archivos'])} archivos Parquet")
+    finally:
+        conexion.close()
+
+
+if __name__ == "__main__":
+    main()
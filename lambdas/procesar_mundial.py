@@ -0,0 +1,290 @@
+"""Lambda que genera los analisis de jugadores de datos_limpios/lambda/ leyendo en streaming.
+
+Los CSV crudos de Kaggle (merged_players.csv, goalscorers.csv) se leen por bloques de
+`TAMANO_CHUNK` filas y de cada bloque solo se conservan agregados combinables:
+
+    - TopK: heap con los mejores k jugadores por goles + asistencias, sobre los totales
+      por (jugador, pais) de PerfilesJugadores (un jugador con varias filas ocupa un lugar)
+    - ConteoGoleadores: goles por (goleador, equipo); crece con el numero de goleadores
+      distintos, no con el numero de goles
+    - PerfilesJugadores: goles y asistencias por (jugador, pais); crece con el numero de
+      jugadores distintos. Junto con los goles internacionales forma perfiles_jugadores.csv,
+      la tabla sobre la que busca el dashboard (utils/busqueda.py)
+    - cubo de resultados (utils/cubo.py): conteo de partidos por pais, torneo, año,
+      goles y resultado, sumado bloque a bloque
+
+Asi la memoria y la duracion de la Lambda no dependen del tamaño de los archivos. Los
+resultados se escriben con `Almacenamiento.subir` (multipart upload en S3), junto con sus
+variantes .zst/.gz (utils/compresion.py).
+
+Uso local, contra el backend de disco:
+    python -m lambdas.procesar_mundial --backend local --ruta datos_locales
+"""
+import argparse
+import heapq
+import io
+import os
+import sys
+import tempfile
+from collections import Counter, defaultdict
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.almacenamiento import ObjetoNoEncontrado, crear_almacenamiento  # noqa: E402
+from utils import compresion, cubo, descarga  # noqa: E402
+from utils.busqueda import normalizar  # noqa: E402
+
+BUCKET = os.getenv("BUCKET_MUNDIAL", "xideralaws-curso-yalbani")
+ENTRADA_JUGADORES = "datos_crudos/merged_players.csv"
+ENTRADA_GOLES = "datos_crudos/goalscorers.csv"
+ENTRADA_RESULTADOS = "datos_crudos/results.csv"
+SALIDA_PREFIX = "datos_limpios/lambda/"
+SALIDA_CUBO = f"{SALIDA_PREFIX}cubo_resultados.csv"
+SALIDA_PERFILES = "perfiles_jugadores.csv"
+TAMANO_CHUNK = int(os.getenv("LAMBDA_CHUNK", "20000"))
+
+TOP_JUGADORES = 50
+MIN_GOLES_ELITE = 4  # "+ de 3 goles internacionales"
+TOP_PAISES = 10
+
+# Columnas de los CSV de Kaggle
+COL_JUGADOR = "PLAYER"
+COL_PAIS = "COUNTRY"
+COL_GOLES = "GOALS"
+COL_ASISTENCIAS = "ASSISTS"
+COL_GOLEADOR = "scorer"
+COL_EQUIPO = "team"
+COL_AUTOGOL = "own_goal"
+COLUMNAS_RESULTADOS = {"date", "home_score", "away_score", "tournament", "country"}
+
+
+# ==========================================
+# AGREGADOS COMBINABLES
+# ==========================================
+class TopK:
+    """Los `k` elementos con mayor puntaje vistos hasta ahora (heap minimo de tamaño k)"""
+
+    def __init__(self, k):
+        self.k = k
+        self._heap = []
+
+    def agregar(self, puntaje, *datos):
+        elemento = (puntaje, *datos)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, elemento)
+        elif elemento > self._heap[0]:
+            heapq.heapreplace(self._heap, elemento)
+
+    def combinar(self, otro):
+        for elemento in otro._heap:
+            self.agregar(*elemento)
+        return self
+
+    def ordenados(self):
+        return sorted(self._heap, reverse=True)
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class TopJugadores(TopK):
+    """Top de jugadores por goles + asistencias totales (todas sus filas de merged_players.csv)"""
+
+    def agregar_perfiles(self, perfiles):
+        # Los totales ya estan en memoria: un jugador con varias filas entra una vez con su G+A sumado
+        for (jugador, pais), goles in perfiles.goles.items():
+            self.agregar(float(goles + perfiles.asistencias[(jugador, pais)]), str(jugador), str(pais))
+
+    def por_pais(self):
+        """DataFrame COUNTRY / Jugadores_Top_50"""
+        conteo = Counter(pais for _, _, pais in self.ordenados())
+        return pd.DataFrame(conteo.most_common(), columns=["COUNTRY", "Jugadores_Top_50"])
+
+
+class ConteoGoleadores:
+    """Goles por (goleador, equipo), alimentado por bloques de goalscorers.csv (sin autogoles)"""
+
+    def __init__(self):
+        self.goles = Counter()
+
+    def agregar_chunk(self, chunk):
+        if COL_AUTOGOL in chunk.columns:
+            chunk = chunk[~chunk[COL_AUTOGOL].astype(str).str.upper().eq("TRUE")]
+        conteo = chunk.dropna(subset=[COL_GOLEADOR]).groupby([COL_GOLEADOR, COL_EQUIPO]).size()
+        self.goles.update(conteo.to_dict())
+
+    def combinar(self, otro):
+        self.goles.update(otro.goles)
+        return self
+
+    def totales(self):
+        """{goleador: (goles, equipo con mas goles)}"""
+        por_goleador = defaultdict(Counter)
+        for (goleador, equipo), goles in self.goles.items():
+            por_goleador[goleador][equipo] += goles
+        # Empates por nombre de equipo: el resultado no depende del orden de los bloques
+        return {
+            goleador: (sum(equipos.values()), min(equipos.items(), key=lambda par: (-par[1], par[0]))[0])
+            for goleador, equipos in por_goleador.items()
+        }
+
+    def elite(self, min_goles=MIN_GOLES_ELITE):
+        """DataFrame Goleador / Goles / Equipo_Pais con los goleadores de al menos `min_goles`"""
+        filas = [(g, goles, equipo) for g, (goles, equipo) in self.totales().items() if goles >= min_goles]
+        df = pd.DataFrame(filas, columns=["Goleador", "Goles", "Equipo_Pais"])
+        return df.sort_values(["Goles", "Goleador"], ascending=[False, True], ignore_index=True)
+
+    def paises(self, n=TOP_PAISES):
+        """DataFrame Pais_Equipo / Numero_de_Goleadores (goleadores distintos por equipo)"""
+        conteo = Counter(equipo for (_, equipo) in self.goles)
+        filas = sorted(conteo.items(), key=lambda par: (-par[1], par[0]))[:n]
+        return pd.DataFrame(filas, columns=["Pais_Equipo", "Numero_de_Goleadores"])
+
+
+class PerfilesJugadores:
+    """Goles y asistencias por (jugador, pais), alimentado por bloques de merged_players.csv"""
+
+    def __init__(self):
+        self.goles = Counter()
+        self.asistencias = Counter()
+
+    def agregar_chunk(self, chunk):
+        chunk = chunk.dropna(subset=[COL_JUGADOR]).fillna({COL_PAIS: "", COL_GOLES: 0, COL_ASISTENCIAS: 0})
+        sumas = chunk.groupby([COL_JUGADOR, COL_PAIS])[[COL_GOLES, COL_ASISTENCIAS]].sum()
+        self.goles.update(sumas[COL_GOLES].to_dict())
+        self.asistencias.update(sumas[COL_ASISTENCIAS].to_dict())
+
+    def combinar(self, otro):
+        self.goles.update(otro.goles)
+        self.asistencias.update(otro.asistencias)
+        return self
+
+    def tabla(self, goleadores):
+        """DataFrame Jugador / Pais / Goles / Asistencias / G_A / Goles_Internacionales / Equipo_Internacional.
+
+        Los goles internacionales se unen por nombre normalizado; los goleadores que no
+        aparecen en merged_players.csv tambien se incluyen (sin goles de club).
+        """
+        internacionales = {normalizar(g): (g, goles, equipo) for g, (goles, equipo) in goleadores.totales().items()}
+        filas = []
+        for (jugador, pais), goles in self.goles.items():
+            _, goles_int, equipo = internacionales.pop(normalizar(jugador), (None, 0, ""))
+            filas.append((jugador, pais, goles, self.asistencias[(jugador, pais)], goles_int, equipo))
+        filas.extend((g, equipo, 0, 0, goles_int, equipo) for g, goles_int, equipo in internacionales.values())
+        df = pd.DataFrame(filas, columns=["Jugador", "Pais", "Goles", "Asistencias", "Goles_Internacionales", "Equipo_Internacional"])
+        df = df.astype({"Goles": "int64", "Asistencias": "int64"})
+        df["G_A"] = df["Goles"] + df["Asistencias"]
+        return df.sort_values(["G_A", "Goles_Internacionales", "Jugador", "Pais"],
+                              ascending=[False, False, True, True], ignore_index=True)
+
+
+# ==========================================
+# LECTURA Y ESCRITURA
+# ==========================================
+def leer_en_chunks(almacenamiento, key, columnas, tamano_chunk=TAMANO_CHUNK):
+    """Itera el CSV por bloques: del mmap (local) o, en S3, descargado por rangos en paralelo a /tmp si es grande"""
+    return pd.read_csv(
+        descarga.abrir(almacenamiento, key, en_disco=True),
+        usecols=lambda c: c in columnas,
+        chunksize=tamano_chunk,
+    )
+
+
+def subir_csv(almacenamiento, key, df):
+    """Escribe `df` a un archivo temporal (en memoria si es chico) y lo sube por partes, con sus variantes comprimidas"""
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as archivo:
+        texto = io.TextIOWrapper(archivo, encoding="utf-8", newline="")
+        df.to_csv(texto, index=False)
+        texto.flush()
+        texto.detach()
+        archivo.seek(0)
+        compresion.subir(almacenamiento, key, archivo)
+
+
+# ==========================================
+# HANDLER
+# ==========================================
+def procesar(almacenamiento, entrada_jugadores=ENTRADA_JUGADORES, entrada_goles=ENTRADA_GOLES,
+             entrada_resultados=ENTRADA_RESULTADOS, salida_prefix=SALIDA_PREFIX, salida_cubo=SALIDA_CUBO,
+             tamano_chunk=TAMANO_CHUNK):
+    """Genera los analisis (y el cubo, si existe results.csv); devuelve cuantas filas se leyeron y escribieron"""
+    perfiles = PerfilesJugadores()
+    filas_jugadores = 0
+    for chunk in leer_en_chunks(almacenamiento, entrada_jugadores,
+                                {COL_JUGADOR, COL_PAIS, COL_GOLES, COL_ASISTENCIAS}, tamano_chunk):
+        perfiles.agregar_chunk(chunk)
+        filas_jugadores += len(chunk)
+    top = TopJugadores(TOP_JUGADORES)
+    top.agregar_perfiles(perfiles)
+
+    goleadores = ConteoGoleadores()
+    filas_goles = 0
+    for chunk in leer_en_chunks(almacenamiento, entrada_goles,
+                                {COL_GOLEADOR, COL_EQUIPO, COL_AUTOGOL}, tamano_chunk):
+        goleadores.agregar_chunk(chunk)
+        filas_goles += len(chunk)
+
+    salidas = {
+        f"{salida_prefix}analisis_top_50_ga_paises.csv": top.por_pais(),
+        f"{salida_prefix}analisis_goleadores_top_3.csv": goleadores.elite(),
+        f"{salida_prefix}analisis_top_10_paises_goleadores.csv": goleadores.paises(),
+        f"{salida_prefix}{SALIDA_PERFILES}": perfiles.tabla(goleadores),
+    }
+    filas_leidas = {entrada_jugadores: filas_jugadores, entrada_goles: filas_goles}
+
+    # Cubo de resultados: un cubo parcial por bloque, sumados al final
+    try:
+        parciales, filas_resultados = [], 0
+        for chunk in leer_en_chunks(almacenamiento, entrada_resultados, COLUMNAS_RESULTADOS, tamano_chunk):
+            parciales.append(cubo.cubo_de_partidos(chunk))
+            # Combinar seguido mantiene acotada la memoria: el cubo no crece con las filas
+            if len(parciales) >= 8:
+                parciales = [cubo.combinar(parciales)]
+            filas_resultados += len(chunk)
+        if parciales:
+            salidas[salida_cubo] = cubo.combinar(parciales)
+            filas_leidas[entrada_resultados] = filas_resultados
+    except ObjetoNoEncontrado:
+        pass
+
+    for key, df in salidas.items():
+        subir_csv(almacenamiento, key, df)
+
+    return {
+        "filas_leidas": filas_leidas,
+        "salidas": {key: len(df) for key, df in salidas.items()},
+    }
+
+
+def lambda_handler(event, context):
+    event = event or {}
+    almacenamiento = crear_almacenamiento(event.get("bucket", BUCKET))
+    opciones = {
+        k: event[k] for k in (
+            "entrada_jugadores", "entrada_goles", "entrada_resultados", "salida_prefix", "salida_cubo", "tamano_chunk"
+        ) if k in event
+    }
+    return {"statusCode": 200, "body": procesar(almacenamiento, **opciones)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Procesa merged_players.csv y goalscorers.csv en streaming")
+    parser.add_argument("--backend", choices=["s3", "local", "memoria"], default=None)
+    parser.add_argument("--ruta", help="Carpeta raiz del backend local (ALMACENAMIENTO_RUTA)")
+    parser.add_argument("--bucket", default=BUCKET)
+    parser.add_argument("--chunk", type=int, default=TAMANO_CHUNK)
+    args = parser.parse_args()
+
+    if args.ruta:
+        os.environ["ALMACENAMIENTO_RUTA"] = args.ruta
+    almacenamiento = crear_almacenamiento(args.bucket, backend=args.backend)
+    resultado = procesar(almacenamiento, tamano_chunk=args.chunk)
+    for key, filas in resultado["filas_leidas"].items():
+        print(f"Leidas {filas:,} filas de {key}")
+    for key, filas in resultado["salidas"].items():
+        print(f"Escritas {filas:,} filas en {key}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Las pruebas corren contra los backends local y en memoria, nunca contra S3
+os.environ.setdefault("ALMACENAMIENTO_BACKEND", "memoria")
+os.environ.pop("ARROW_DIR", None)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
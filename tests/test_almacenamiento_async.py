@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from utils.almacenamiento import AlmacenamientoLocal, AlmacenamientoMemoria, ObjetoNoEncontrado
+from utils.almacenamiento_async import AlmacenamientoAsync, ejecutar
+
+
+class MemoriaLenta(AlmacenamientoMemoria):
+    """Bucket en memoria donde algunas keys tardan en responder"""
+
+    def __init__(self, bucket, demoras):
+        super().__init__(bucket)
+        self.demoras = demoras
+        self.simultaneas = 0
+        self.max_simultaneas = 0
+        self._contador = threading.Lock()
+
+    def get(self, key):
+        with self._contador:
+            self.simultaneas += 1
+            self.max_simultaneas = max(self.max_simultaneas, self.simultaneas)
+        try:
+            time.sleep(self.demoras.get(key, 0.01))
+            return super().get(key)
+        finally:
+            with self._contador:
+                self.simultaneas -= 1
+
+
+@pytest.fixture
+def memoria(request):
+    AlmacenamientoMemoria.limpiar()
+    almacenamiento = MemoriaLenta(f"prueba-async-{request.node.name}", {"lento.csv": 2.0})
+    for key in ("a.csv", "b.csv", "c.csv", "lento.csv"):
+        almacenamiento.put(key, f"x\n{key}\n")
+    return almacenamiento
+
+
+def test_get_varios_con_timeout_no_espera_al_lento(memoria):
+    s3 = AlmacenamientoAsync(memoria, max_concurrencia=4, timeout=0.5)
+    inicio = time.perf_counter()
+    resultados = ejecutar(s3.get_varios(["a.csv", "lento.csv", "b.csv", "falta.csv"], procesar=bytes.decode))
+
+    assert time.perf_counter() - inicio < 1.5
+    assert resultados["a.csv"] == "x\na.csv\n"
+    assert resultados["b.csv"] == "x\nb.csv\n"
+    assert isinstance(resultados["lento.csv"], asyncio.TimeoutError)
+    assert isinstance(resultados["falta.csv"], ObjetoNoEncontrado)
+
+
+def test_get_varios_respeta_el_limite_de_concurrencia(memoria):
+    s3 = AlmacenamientoAsync(memoria, max_concurrencia=2)
+    keys = ["a.csv", "b.csv", "c.csv"] * 3
+    resultados = ejecutar(s3.mapear(keys, memoria.get))
+    assert set(resultados) == {"a.csv", "b.csv", "c.csv"}
+    assert memoria.max_simultaneas <= 2
+
+
+def test_cancelar_get_varios_cancela_al_llamador(memoria):
+    s3 = AlmacenamientoAsync(memoria, max_concurrencia=4)
+
+    async def cancelar_pronto():
+        tarea = asyncio.create_task(s3.get_varios(["a.csv", "lento.csv"]))
+        await asyncio.sleep(0.1)
+        tarea.cancel()
+        await tarea
+
+    inicio = time.perf_counter()
+    with pytest.raises(asyncio.CancelledError):
+        ejecutar(cancelar_pronto())
+    # No se queda esperando al hilo del GET lento
+    assert time.perf_counter() - inicio < 1.5
+
+
+def test_operaciones_contra_disco_local(tmp_path):
+    s3 = AlmacenamientoAsync(AlmacenamientoLocal(tmp_path, "bucket"))
+
+    async def flujo():
+        await s3.put("raw/uno.json", b"[1]")
+        await s3.put("raw/dos.json", "[2]")
+        listado = await s3.listar("raw/")
+        meta = await s3.head("raw/uno.json")
+        return listado, meta, await s3.get_varios([o["Key"] for o in listado])
+
+    listado, meta, contenidos = ejecutar(flujo())
+    assert [o["Key"] for o in listado] == ["raw/dos.json", "raw/uno.json"]
+    assert meta["Size"] == 3
+    assert contenidos == {"raw/dos.json": b"[2]", "raw/uno.json": b"[1]"}
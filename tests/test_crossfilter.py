@@ -0,0 +1,112 @@
+import math
+import random
+
+import numpy as np
+import pandas as pd
+
+from utils.crossfilter import Crossfilter, TODAS
+
+DIMENSIONES = {"genero": "Gender", "ocupacion": "Occupation", "estres": "Stress Level", "seleccion": "Occupation"}
+OCUPACIONES = ["Doctor", "Engineer", "Nurse", "Teacher", "Lawyer", None]
+
+
+def _datos(n=400, semilla=0):
+    rng = np.random.default_rng(semilla)
+    ritmo = rng.normal(70, 8, n)
+    ritmo[rng.random(n) < 0.1] = np.nan
+    return pd.DataFrame({
+        "Gender": rng.choice(["Female", "Male"], n).tolist(),
+        "Occupation": [OCUPACIONES[i] for i in rng.integers(0, len(OCUPACIONES), n)],
+        "Stress Level": rng.integers(3, 9, n),
+        "Heart Rate": ritmo,
+    })
+
+
+def _clave(valor):
+    return None if pd.isna(valor) else valor
+
+
+def _esperado(df, filtros, dimension, ignorar_propio):
+    """Reduccion de referencia: filtrar con isin y agrupar con groupby"""
+    pasa = np.ones(len(df), dtype=bool)
+    for nombre, valores in filtros.items():
+        if valores is None or (ignorar_propio and nombre == dimension):
+            continue
+        columna = df[DIMENSIONES[nombre]]
+        elegidas = columna.isin([v for v in valores if v is not None]).to_numpy()
+        if None in valores:
+            elegidas = elegidas | columna.isna().to_numpy()
+        pasa &= elegidas
+    visibles = df[pasa]
+    if dimension == TODAS:
+        return {0: (len(visibles), visibles["Heart Rate"].mean())} if len(visibles) else {}
+    agrupado = visibles.groupby(DIMENSIONES[dimension], dropna=False)["Heart Rate"].agg(["size", "mean"])
+    return {_clave(c): (n, m) for c, (n, m) in zip(agrupado.index, agrupado.itertuples(index=False))}
+
+
+def _obtenido(cf, grupo):
+    reduccion = cf.reduccion(grupo)
+    return {_clave(c): (n, m) for c, n, m in reduccion[["categoria", "conteo", "promedio"]].itertuples(index=False)}
+
+
+def _iguales(obtenido, esperado):
+    if obtenido.keys() != esperado.keys():
+        return False
+    for clave, (n, m) in esperado.items():
+        n_cf, m_cf = obtenido[clave]
+        if n_cf != n or not (math.isclose(m_cf, m, rel_tol=1e-9) if not pd.isna(m) else pd.isna(m_cf)):
+            return False
+    return True
+
+
+def test_filtrar_solo_nulos():
+    df = _datos()
+    cf = Crossfilter(df, DIMENSIONES, ["Heart Rate"])
+    cf.grupo("genero", medida="Heart Rate")
+    nulos = df["Occupation"].isna()
+    cf.filtrar("ocupacion", [None])
+    assert len(cf.filas()) == int(nulos.sum()) > 0
+    assert [_clave(c) for c in cf.filtro("ocupacion")] == [None]
+    assert _iguales(_obtenido(cf, "genero"), _esperado(df, {"ocupacion": [None]}, "genero", True))
+    # NaN tambien es el nulo; los valores desconocidos no agregan nada
+    assert cf.filtrar("ocupacion", [float("nan"), "Desconocida"]) == 0
+
+
+def test_reducciones_coinciden_con_groupby():
+    df = _datos()
+    base = Crossfilter(df, DIMENSIONES, ["Heart Rate"])
+    grupos = {
+        "genero": ("genero", True),
+        "ocupacion": ("ocupacion", True),
+        "estres": ("estres", True),
+        "ocupacion_filtrada": ("ocupacion", False),
+        "total": (TODAS, False),
+    }
+    for nombre, (dimension, ignorar_propio) in grupos.items():
+        base.grupo(nombre, dimension, medida="Heart Rate", ignorar_propio=ignorar_propio)
+    cf = base.clonar()
+
+    opciones = {
+        "genero": ["Female", "Male", "Otro"],
+        "ocupacion": OCUPACIONES,
+        "estres": list(range(2, 10)),
+        "seleccion": OCUPACIONES,
+    }
+    filtros = {nombre: None for nombre in DIMENSIONES}
+    azar = random.Random(7)
+    diferencias = []
+    for paso in range(500):
+        dimension = azar.choice(list(DIMENSIONES))
+        valores = None if azar.random() < 0.2 else azar.sample(opciones[dimension], azar.randint(0, 3))
+        cf.filtrar(dimension, valores)
+        filtros[dimension] = valores
+        for nombre, (agrupada, ignorar_propio) in grupos.items():
+            esperado = _esperado(df, filtros, agrupada, ignorar_propio)
+            if not _iguales(_obtenido(cf, nombre), esperado):
+                diferencias.append((paso, nombre, dict(filtros)))
+        assert len(cf.filas()) == len(cf.filtrado())
+    assert diferencias == []
+
+    # El clon no toca el estado de la base
+    assert base.filtro("ocupacion") is None
+    assert base.total("total")[0] == len(df)
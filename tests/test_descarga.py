@@ -0,0 +1,103 @@
+import pytest
+
+from utils import descarga
+from utils.almacenamiento import AlmacenamientoMemoria, AlmacenamientoS3, VersionCambiada
+
+KEY = "datos_crudos/results.csv"
+VIEJO = bytes(range(256)) * 40
+NUEVO = bytes(reversed(range(256))) * 52
+
+
+class MemoriaRemota(AlmacenamientoMemoria):
+    """Bucket en memoria que se comporta como remoto y puede reescribir la key a media descarga"""
+
+    remoto = True
+
+    def __init__(self, bucket, reescrituras=()):
+        super().__init__(bucket)
+        self.reescrituras = list(reescrituras)
+        self.rangos = 0
+        self.fallas = 0
+
+    def get_rango(self, key, inicio, fin, etag=None):
+        self.rangos += 1
+        if self.reescrituras and self.rangos == self.reescrituras[0][0]:
+            self.put(key, self.reescrituras.pop(0)[1])
+        if self.fallas:
+            self.fallas -= 1
+            raise ConnectionError("red")
+        return super().get_rango(key, inicio, fin, etag)
+
+
+@pytest.fixture
+def bucket(request):
+    AlmacenamientoMemoria.limpiar()
+    return f"prueba-descarga-{request.node.name}"
+
+
+def test_descarga_por_rangos_reconstruye_el_objeto(bucket):
+    almacenamiento = MemoriaRemota(bucket)
+    almacenamiento.put(KEY, VIEJO)
+    buffer = descarga.descargar(almacenamiento, KEY, len(VIEJO), tamano_parte=1000, max_hilos=4)
+    assert buffer.read() == VIEJO
+    assert almacenamiento.rangos == len(descarga.partes(len(VIEJO), 1000))
+
+
+def test_objeto_reescrito_a_media_descarga_reinicia_con_la_version_nueva(bucket):
+    almacenamiento = MemoriaRemota(bucket, reescrituras=[(3, NUEVO)])
+    almacenamiento.put(KEY, VIEJO)
+    meta = almacenamiento.head(KEY)
+
+    buffer = descarga.descargar(almacenamiento, KEY, meta["Size"], tamano_parte=1000, max_hilos=1, etag=meta["ETag"])
+
+    # Ni mezcla de versiones ni la version nueva cortada al tamaño viejo
+    assert buffer.read() == NUEVO
+
+
+def test_objeto_que_no_deja_de_cambiar_falla(bucket):
+    reescrituras = [(n, (VIEJO if n % 2 else NUEVO)) for n in range(2, 200, 3)]
+    almacenamiento = MemoriaRemota(bucket, reescrituras=reescrituras)
+    almacenamiento.put(KEY, VIEJO)
+    meta = almacenamiento.head(KEY)
+    with pytest.raises(VersionCambiada):
+        descarga.descargar(almacenamiento, KEY, meta["Size"], tamano_parte=1000, max_hilos=1, etag=meta["ETag"])
+
+
+def test_parte_que_falla_se_reintenta_sola(bucket, monkeypatch):
+    monkeypatch.setattr(descarga, "ESPERA_REINTENTO", 0)
+    almacenamiento = MemoriaRemota(bucket)
+    almacenamiento.put(KEY, VIEJO)
+    almacenamiento.fallas = 2
+    assert descarga.descargar(almacenamiento, KEY, len(VIEJO), tamano_parte=1000, max_hilos=1).read() == VIEJO
+
+
+def test_abrir_chico_usa_un_solo_get(bucket):
+    almacenamiento = MemoriaRemota(bucket)
+    almacenamiento.put(KEY, VIEJO)
+    assert descarga.abrir(almacenamiento, KEY, umbral=len(VIEJO) + 1).read() == VIEJO
+    assert almacenamiento.rangos == 0
+
+
+class _ErrorS3(Exception):
+    def __init__(self, codigo):
+        super().__init__(codigo)
+        self.response = {"Error": {"Code": codigo}}
+
+
+class _ClienteS3:
+    def __init__(self, etag):
+        self.etag = etag
+        self.llamadas = []
+
+    def get_object(self, **kwargs):
+        self.llamadas.append(kwargs)
+        if kwargs.get("IfMatch") not in (None, self.etag):
+            raise _ErrorS3("PreconditionFailed")
+        raise AssertionError("no se esperaba la descarga")
+
+
+def test_s3_condiciona_los_rangos_al_etag():
+    cliente = _ClienteS3('"nuevo"')
+    with pytest.raises(VersionCambiada):
+        AlmacenamientoS3("bucket", cliente).get_rango(KEY, 0, 10, '"viejo"')
+    assert cliente.llamadas == [{"Bucket": "bucket", "Key": KEY, "Range": "bytes=0-9", "IfMatch": '"viejo"'}]
@@ -0,0 +1,196 @@
+import io
+import random
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from lambdas import exportar_mysql as ex
+from utils import compresion, manifiesto
+from utils.almacenamiento import AlmacenamientoMemoria
+
+CIUDADES = ["Guadalajara", "Monterrey", "CDMX", "Puebla", "San José"]
+
+
+class Tabla:
+    """Tabla `personas` en SQLite con updated_at creciente"""
+
+    def __init__(self, semilla=0):
+        self.conexion = sqlite3.connect(":memory:")
+        self.conexion.execute(
+            "CREATE TABLE personas (id INTEGER PRIMARY KEY, nombre TEXT, ciudad TEXT, updated_at TEXT)"
+        )
+        self.reloj = 0
+        self.azar = random.Random(semilla)
+
+    def _marca(self):
+        self.reloj += 1
+        # Varios cambios comparten updated_at: la marca de agua desempata por id
+        return f"2024-01-01 00:{self.reloj // 7:05d}"
+
+    def _nueva_tanda(self):
+        # Entre una exportacion y la siguiente el reloj avanza (updated_at nunca regresa)
+        self.reloj += 7 - self.reloj % 7
+
+    def insertar(self, n, ciudades=CIUDADES):
+        self._nueva_tanda()
+        for _ in range(n):
+            self.conexion.execute(
+                "INSERT INTO personas (nombre, ciudad, updated_at) VALUES (?, ?, ?)",
+                (f"persona {self.reloj}", self.azar.choice(ciudades), self._marca()),
+            )
+
+    def actualizar(self, n, ciudades=CIUDADES + ["Mérida"]):
+        self._nueva_tanda()
+        ids = [fila[0] for fila in self.conexion.execute("SELECT id FROM personas")]
+        for id_ in self.azar.sample(ids, n):
+            self.conexion.execute(
+                "UPDATE personas SET ciudad = ?, updated_at = ? WHERE id = ?",
+                (self.azar.choice(ciudades), self._marca(), id_),
+            )
+
+    def df(self):
+        return pd.read_sql("SELECT * FROM personas ORDER BY id", self.conexion)
+
+    def conteo(self):
+        return self.df().groupby("ciudad").size().to_dict()
+
+
+@pytest.fixture
+def almacenamiento(request):
+    AlmacenamientoMemoria.limpiar()
+    return AlmacenamientoMemoria(f"prueba-cdc-{request.node.name}")
+
+
+@pytest.fixture
+def tabla():
+    return Tabla()
+
+
+def _vista_dashboard(almacenamiento):
+    """Lo que lee Semana 2/app_lambda_mysql.py: conteo del snapshot + cambios de los deltas y la muestra"""
+    vigente = manifiesto.actual(almacenamiento, ex.PREFIX_CDC)
+    conteo = {}
+    if vigente.get("conteo"):
+        df = compresion.leer_csv(almacenamiento, vigente["conteo"])
+        conteo.update(zip(df["ciudad"], df["Total Personas"]))
+    for cambio in vigente["cambios"]:
+        df = compresion.leer_csv(almacenamiento, cambio["conteo"])
+        for ciudad, n in zip(df["ciudad"], df["cambio"]):
+            conteo[ciudad] = conteo.get(ciudad, 0) + n
+    muestra = compresion.leer_csv(almacenamiento, vigente["muestra"])
+    return vigente["filas"], {c: n for c, n in conteo.items() if n > 0}, muestra["id"].tolist()
+
+
+def _tabla_del_manifiesto(almacenamiento):
+    """Reconstruye la tabla con el snapshot y los deltas del manifiesto (la ultima version de cada id)"""
+    vigente = manifiesto.actual(almacenamiento, ex.PREFIX_CDC)
+    partes = [ex._leer_parte_snapshot(almacenamiento, key) for key in vigente["snapshot"]]
+    partes += [ex._leer_parquet(almacenamiento, key) for key in vigente["deltas"]]
+    df = pd.concat(partes, ignore_index=True).drop_duplicates(subset=["id"], keep="last")
+    return df[vigente["columnas"]].sort_values("id", ignore_index=True)
+
+
+def _comparar(almacenamiento, tabla):
+    esperado = tabla.df()
+    filas, conteo, muestra = _vista_dashboard(almacenamiento)
+    ids = esperado["id"].tolist()
+    assert filas == len(esperado)
+    assert conteo == tabla.conteo()
+    assert muestra == (ids if len(ids) <= 10 else ids[:5] + ids[-5:])
+    pd.testing.assert_frame_equal(_tabla_del_manifiesto(almacenamiento), esperado, check_dtype=False)
+
+
+def test_exportacion_completa(almacenamiento, tabla, monkeypatch):
+    monkeypatch.setattr(ex, "FILAS_POR_ARCHIVO", 40)
+    tabla.insertar(300)
+    resumen = ex.exportar(tabla.conexion, almacenamiento, fecha="2024-05-01", tamano_lote=17)
+
+    assert resumen["filas"] == 300
+    vigente = manifiesto.actual(almacenamiento, ex.PREFIX_AGREGADOS)
+    conteo = compresion.leer_csv(almacenamiento, vigente["key"])
+    assert dict(zip(conteo["ciudad"], conteo["Total Personas"])) == tabla.conteo()
+    partes = [ex._leer_parte_snapshot(almacenamiento, key) for key in resumen["archivos"]]
+    assert all("/fecha=2024-05-01/ciudad=" in key for key in resumen["archivos"])
+    leidas = pd.concat(partes).sort_values("id", ignore_index=True)
+    pd.testing.assert_frame_equal(leidas[tabla.df().columns], tabla.df(), check_dtype=False)
+
+
+def test_incremental_y_compactacion_siguen_a_la_tabla(almacenamiento, tabla, monkeypatch):
+    monkeypatch.setattr(ex, "FILAS_POR_ARCHIVO", 64)
+    tabla.insertar(400)
+    ex.exportar_incremental(tabla.conexion, almacenamiento, tamano_lote=50)
+    _comparar(almacenamiento, tabla)
+
+    for paso in range(6):
+        tabla.actualizar(30)
+        tabla.insertar(20)
+        ex.exportar_incremental(tabla.conexion, almacenamiento, tamano_lote=50)
+        _comparar(almacenamiento, tabla)
+        if paso % 2:
+            ex.compactar(almacenamiento)
+            _comparar(almacenamiento, tabla)
+            assert manifiesto.actual(almacenamiento, ex.PREFIX_CDC)["deltas"] == []
+
+
+def test_marca_de_agua_no_repite_ni_pierde_filas(almacenamiento, tabla):
+    tabla.insertar(50)
+    assert ex.exportar_incremental(tabla.conexion, almacenamiento, tamano_lote=3)["filas"] == 50
+    assert ex.exportar_incremental(tabla.conexion, almacenamiento)["filas"] == 0
+    tabla.actualizar(5)
+    assert ex.exportar_incremental(tabla.conexion, almacenamiento)["filas"] == 5
+    _comparar(almacenamiento, tabla)
+
+
+def test_compactar_procesa_una_parte_a_la_vez(almacenamiento, tabla, monkeypatch):
+    monkeypatch.setattr(ex, "FILAS_POR_ARCHIVO", 50)
+    tabla.insertar(600)
+    ex.exportar_incremental(tabla.conexion, almacenamiento)
+    ex.compactar(almacenamiento)
+    tabla.actualizar(10)
+    ex.exportar_incremental(tabla.conexion, almacenamiento)
+
+    leidas = []
+    original = ex._leer_parte_snapshot
+
+    def espiar(*args, **kwargs):
+        df = original(*args, **kwargs)
+        leidas.append(len(df))
+        return df
+
+    monkeypatch.setattr(ex, "_leer_parte_snapshot", espiar)
+    resumen = ex.compactar(almacenamiento, fecha="2024-06-01")
+
+    assert len(leidas) == len(manifiesto.version(almacenamiento, ex.PREFIX_CDC, 3)["snapshot"])
+    # Ni las partes leidas ni las escritas pasan de 2 * FILAS_POR_ARCHIVO filas
+    assert max(leidas) <= 100
+    assert all(key.startswith(f"{ex.CDC_SNAPSHOT}fecha=2024-06-01/ciudad=") for key in resumen["archivos"])
+    _comparar(almacenamiento, tabla)
+
+
+def test_compactar_borra_lo_reemplazado(almacenamiento, tabla, monkeypatch):
+    monkeypatch.setattr(ex, "CDC_GRACIA_S", 0)
+    tabla.insertar(200)
+    ex.exportar_incremental(tabla.conexion, almacenamiento)
+    ex.compactar(almacenamiento)
+    primera = manifiesto.actual(almacenamiento, ex.PREFIX_CDC)
+    for _ in range(2):
+        tabla.actualizar(20)
+        ex.exportar_incremental(tabla.conexion, almacenamiento)
+    al_empezar = manifiesto.actual(almacenamiento, ex.PREFIX_CDC)
+    ex.compactar(almacenamiento)
+
+    def existentes():
+        return {
+            compresion.sin_extension(obj["Key"])
+            for carpeta in ex.CDC_CARPETAS_DATOS for obj in almacenamiento.listar(carpeta)
+        }
+
+    vigente = manifiesto.actual(almacenamiento, ex.PREFIX_CDC)
+    # Solo quedan los archivos del manifiesto vigente y del que lo era al empezar la compactacion
+    # (una exportacion incremental en curso aun puede publicar sobre ese)
+    assert existentes() == ex._referenciados(vigente) | ex._referenciados(al_empezar)
+    assert not (ex._referenciados(primera) - ex._referenciados(al_empezar)) & existentes()
+    assert ex.compactar(almacenamiento)["borrados"] > 0
+    assert existentes() == ex._referenciados(vigente)
+    _comparar(almacenamiento, tabla)
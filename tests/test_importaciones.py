@@ -0,0 +1,72 @@
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+from utils.importaciones import ModuloDiferido, calentar, importar_diferido
+
+RAIZ = Path(__file__).resolve().parents[1]
+
+
+def _modulo_contado(tmp_path, monkeypatch, nombre):
+    """Modulo de prueba que anota en `cargas.txt` cada vez que se importa"""
+    (tmp_path / f"{nombre}.py").write_text(
+        "from pathlib import Path\n"
+        f"_cargas = Path({str(tmp_path / 'cargas.txt')!r})\n"
+        "_cargas.write_text(_cargas.read_text() + 'x' if _cargas.exists() else 'x')\n"
+        "VALOR = 7\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, nombre, raising=False)
+    return tmp_path / "cargas.txt"
+
+
+def test_el_proxy_importa_al_primer_uso(tmp_path, monkeypatch):
+    cargas = _modulo_contado(tmp_path, monkeypatch, "modulo_pesado_prueba")
+    modulo = importar_diferido("modulo_pesado_prueba")
+    assert isinstance(modulo, ModuloDiferido)
+    assert "pendiente" in repr(modulo)
+    assert not cargas.exists()
+
+    assert modulo.VALOR == 7
+    assert "cargado" in repr(modulo)
+    assert cargas.read_text() == "x"
+    # Ya importado: se devuelve el modulo real, sin proxy
+    assert importar_diferido("modulo_pesado_prueba") is sys.modules["modulo_pesado_prueba"]
+
+
+def test_el_proxy_importa_una_sola_vez_con_hilos(tmp_path, monkeypatch):
+    cargas = _modulo_contado(tmp_path, monkeypatch, "modulo_concurrente_prueba")
+    modulo = ModuloDiferido("modulo_concurrente_prueba")
+    listos = threading.Barrier(8)
+    valores = []
+
+    def usar():
+        listos.wait()
+        valores.append(modulo.VALOR)
+
+    hilos = [threading.Thread(target=usar) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join(5)
+    assert valores == [7] * 8
+    assert cargas.read_text() == "x"
+
+
+def test_importar_diferido_no_carga_plotly():
+    # Proceso nuevo: en este ya pueden estar importados por otras pruebas
+    codigo = (
+        "import sys\n"
+        "from utils.importaciones import importar_diferido\n"
+        "px = importar_diferido('plotly.express')\n"
+        "assert not any(m == 'plotly' or m.startswith('plotly.') for m in sys.modules), 'plotly cargado'\n"
+    )
+    resultado = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True)
+    assert resultado.returncode == 0, resultado.stderr
+
+
+def test_calentar_ignora_modulos_que_faltan():
+    tiempos = calentar(modulos=("json", "modulo_que_no_existe"), graficas=False)
+    assert "json" in tiempos
+    assert "modulo_que_no_existe" not in tiempos
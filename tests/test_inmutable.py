@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+from utils import resultados
+from utils.almacenamiento import AlmacenamientoMemoria
+from utils.datos import cargar_varios_csv_refrescados
+from utils.inmutable import congelar
+from utils.resultados import CacheResultados, marcar_version
+
+MUTACIONES = {
+    "reemplazar columna": lambda df: df.__setitem__("a", df["a"] + 1),
+    "columna nueva": lambda df: df.__setitem__("n", 1),
+    "loc sobre texto": lambda df: df.loc.__setitem__((0, "s"), "q"),
+    "loc numerico": lambda df: df.loc.__setitem__((0, "a"), 9),
+    "iloc": lambda df: df.iloc.__setitem__((1, 0), 7),
+    "at": lambda df: df.at.__setitem__((1, "s"), "r"),
+}
+
+
+def _fuente():
+    df = pd.DataFrame({"a": [1, 2, 3], "s": ["x", "y", "z"]})
+    return marcar_version(congelar(df), "v1")
+
+
+@pytest.mark.parametrize("mutar", MUTACIONES.values(), ids=MUTACIONES.keys())
+def test_consultar_entrega_manijas_independientes(mutar):
+    cache = CacheResultados(nombre="prueba-inmutable")
+    fuente = _fuente()
+    esperado = fuente.copy(deep=True)
+
+    primera = resultados.consultar("vista", fuente, {}, lambda: fuente[fuente["a"] > 0], cache=cache)
+    mutar(primera)
+    segunda = resultados.consultar("vista", fuente, {}, lambda: pytest.fail("no debia recalcular"), cache=cache)
+
+    pd.testing.assert_frame_equal(segunda, esperado)
+    pd.testing.assert_frame_equal(fuente, esperado)
+
+
+@pytest.mark.parametrize("mutar", MUTACIONES.values(), ids=MUTACIONES.keys())
+def test_consultar_que_devuelve_la_fuente_no_la_comparte(mutar):
+    cache = CacheResultados(nombre="prueba-inmutable")
+    fuente = _fuente()
+    esperado = fuente.copy(deep=True)
+
+    manija = resultados.consultar("todo", fuente, {}, lambda: fuente, cache=cache)
+    assert resultados.version_de(manija) == "v1"
+    mutar(manija)
+
+    pd.testing.assert_frame_equal(resultados.consultar("todo", fuente, {}, lambda: fuente, cache=cache), esperado)
+    pd.testing.assert_frame_equal(fuente, esperado)
+
+
+@pytest.mark.parametrize("mutar", MUTACIONES.values(), ids=MUTACIONES.keys())
+def test_refrescador_entrega_manijas_independientes(mutar):
+    bucket = f"prueba-inmutable-{len(mutar.__qualname__)}-{id(mutar)}"
+    AlmacenamientoMemoria(bucket).put("datos.csv", "a,s\n1,x\n2,y\n3,z\n")
+
+    datasets, errores = cargar_varios_csv_refrescados(bucket, ("datos.csv",))
+    assert not errores
+    esperado = datasets["datos.csv"].copy(deep=True)
+    mutar(datasets["datos.csv"])
+
+    otra_sesion = cargar_varios_csv_refrescados(bucket, ("datos.csv",))[0]["datos.csv"]
+    pd.testing.assert_frame_equal(otra_sesion, esperado)
+    # Las manijas conservan la version del dataset, asi la cache de resultados las reconoce
+    assert resultados.version_de(otra_sesion) is not None
+
+
+def test_congelar_protege_el_dataframe_compartido():
+    fuente = _fuente()
+    with pytest.raises(ValueError):
+        fuente.loc[0, "a"] = 9
@@ -0,0 +1,74 @@
+import json
+import threading
+
+import pytest
+
+from utils import manifiesto
+from utils.almacenamiento import AlmacenamientoLocal, AlmacenamientoMemoria, ObjetoExistente, VersionCambiada
+
+
+@pytest.fixture(params=["memoria", "local"])
+def almacenamiento(request, tmp_path):
+    if request.param == "memoria":
+        AlmacenamientoMemoria.limpiar()
+        return AlmacenamientoMemoria("prueba-manifiesto")
+    return AlmacenamientoLocal(tmp_path, "prueba-manifiesto")
+
+
+def test_put_si_coincide(almacenamiento):
+    almacenamiento.put_si_coincide("a.json", "1", None)
+    with pytest.raises(ObjetoExistente):
+        almacenamiento.put_si_coincide("a.json", "2", None)
+    etag = almacenamiento.head("a.json")["ETag"]
+    almacenamiento.put_si_coincide("a.json", "2", etag)
+    with pytest.raises(VersionCambiada):
+        almacenamiento.put_si_coincide("a.json", "3", etag)
+    assert almacenamiento.get("a.json") == b"2"
+
+
+def test_productores_simultaneos_no_pierden_versiones_ni_regresan_el_apuntador(almacenamiento):
+    def producir(productor):
+        for n in range(5):
+            manifiesto.publicar(almacenamiento, "p/", productor=productor, n=n)
+
+    hilos = [threading.Thread(target=producir, args=(i,)) for i in range(6)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    numeros = manifiesto.versiones(almacenamiento, "p/")
+    assert numeros == list(range(30, 0, -1))
+    publicados = {(m["productor"], m["n"]) for m in (manifiesto.version(almacenamiento, "p/", v) for v in numeros)}
+    assert len(publicados) == 30
+    assert manifiesto.actual(almacenamiento, "p/")["version"] == 30
+
+
+def test_productor_lento_no_regresa_el_apuntador(almacenamiento, monkeypatch):
+    for key in ("uno.csv", "dos.csv", "tres.csv"):
+        almacenamiento.put(key, key)
+    manifiesto.publicar(almacenamiento, "p/", key="uno.csv")
+    put_original = almacenamiento.put_si_coincide
+
+    def otro_productor_se_adelanta(key, datos, etag):
+        # Mientras el productor lento va a mover el apuntador, otro publica la version 3
+        monkeypatch.setattr(almacenamiento, "put_si_coincide", put_original)
+        manifiesto.publicar(almacenamiento, "p/", key="tres.csv")
+        put_original(key, datos, etag)
+
+    monkeypatch.setattr(almacenamiento, "put_si_coincide", otro_productor_se_adelanta)
+    lento = manifiesto.publicar(almacenamiento, "p/", key="dos.csv")
+
+    assert lento["version"] == 2
+    vigente = manifiesto.actual(almacenamiento, "p/")
+    assert (vigente["version"], vigente["key"]) == (3, "tres.csv")
+
+
+def test_time_travel(almacenamiento):
+    for key in ("a.csv", "b.csv"):
+        almacenamiento.put(key, key)
+        manifiesto.publicar(almacenamiento, "p/", key=key, datos=almacenamiento.get(key), filas=1)
+    anterior = manifiesto.version(almacenamiento, "p/", 1)
+    assert anterior["key"] == "a.csv"
+    assert manifiesto.verificar(almacenamiento.get("a.csv"), anterior)
+    assert json.loads(almacenamiento.get(manifiesto.key_actual("p/")))["key"] == "b.csv"
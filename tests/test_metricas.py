@@ -0,0 +1,53 @@
+import re
+
+import pytest
+
+from utils import metricas
+
+
+@pytest.fixture(autouse=True)
+def limpio(monkeypatch):
+    metricas.limpiar()
+    yield
+    metricas.limpiar()
+
+
+def _valor(texto, serie):
+    return float(re.search(rf"^{re.escape(serie)} (\S+)$", texto, re.MULTILINE).group(1))
+
+
+def test_sum_y_count_no_bajan_cuando_el_buffer_desaloja(monkeypatch):
+    monkeypatch.setattr(metricas, "_mediciones", metricas.deque(maxlen=3))
+    for ms in (100, 100, 100):
+        metricas.registrar("carga", ms)
+    antes = metricas.exportar_prometheus()
+    for ms in (1, 1, 1):
+        metricas.registrar("carga", ms)
+    despues = metricas.exportar_prometheus()
+
+    assert _valor(antes, 'dashboard_etapa_ms_count{etapa="carga"}') == 3
+    assert _valor(despues, 'dashboard_etapa_ms_count{etapa="carga"}') == 6
+    assert _valor(despues, 'dashboard_etapa_ms_sum{etapa="carga"}') == pytest.approx(303)
+    # Los cuantiles si son de la ventana
+    assert _valor(despues, 'dashboard_etapa_ms{etapa="carga",quantile="0.95"}') == pytest.approx(1)
+
+
+def test_etapa_que_ya_salio_del_buffer_conserva_sus_totales(monkeypatch):
+    monkeypatch.setattr(metricas, "_mediciones", metricas.deque(maxlen=2))
+    metricas.registrar("vieja", 5)
+    metricas.registrar("nueva", 1)
+    metricas.registrar("nueva", 1)
+    texto = metricas.exportar_prometheus()
+    assert _valor(texto, 'dashboard_etapa_ms_count{etapa="vieja"}') == 1
+    assert 'dashboard_etapa_ms{etapa="vieja",quantile' not in texto
+
+
+def test_limpiar_borra_mediciones_contadores_e_indicadores():
+    metricas.registrar("etapa", 1)
+    metricas.incrementar("evento")
+    metricas.fijar("memoria:bytes", 10)
+    metricas.limpiar()
+    assert metricas.mediciones() == []
+    assert metricas.acumulados() == {}
+    assert metricas.contadores() == {}
+    assert metricas.indicadores() == {}
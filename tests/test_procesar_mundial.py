@@ -0,0 +1,113 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lambdas import procesar_mundial as pm
+from utils import cubo
+from utils.almacenamiento import AlmacenamientoLocal
+
+PAISES = ["ARG", "BRA", "FRA", "ESP", "MEX", "GER"]
+
+
+def _jugadores(semilla=0, n=300):
+    rng = np.random.default_rng(semilla)
+    # G+A distintos por jugador: el top no depende de como se rompen empates
+    ga = rng.permutation(np.arange(n)) * 3
+    goles = ga // 2
+    df = pd.DataFrame({
+        "PLAYER": [f"Jugador {i}" for i in range(n)],
+        "COUNTRY": rng.choice(PAISES, n),
+        "GOALS": goles,
+        "ASSISTS": ga - goles,
+    })
+    # Un jugador con dos filas: por separado no entra al top 50, sumado es el primero
+    messi = pd.DataFrame({"PLAYER": ["Messi", "Messi"], "COUNTRY": ["ARG", "ARG"],
+                          "GOALS": [ga.max() // 2 + 1] * 2, "ASSISTS": [0, 1]})
+    return pd.concat([df, messi], ignore_index=True).sample(frac=1, random_state=semilla, ignore_index=True)
+
+
+def _goles(semilla=0, n=2000):
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        "date": pd.date_range("1990-01-01", periods=n, freq="D").astype(str),
+        "team": rng.choice(PAISES, n),
+        "scorer": [f"Goleador {i}" for i in rng.integers(0, 150, n)],
+        "own_goal": rng.random(n) < 0.05,
+    })
+
+
+def _resultados(semilla=0, n=500):
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        "date": pd.date_range("1950-01-01", periods=n, freq="7D").astype(str),
+        "home_team": rng.choice(PAISES, n),
+        "away_team": rng.choice(PAISES, n),
+        "home_score": rng.integers(0, 6, n),
+        "away_score": rng.integers(0, 6, n),
+        "tournament": rng.choice(["Friendly", "FIFA World Cup"], n),
+        "country": rng.choice(PAISES, n),
+    })
+
+
+def _publicar(almacenamiento, semilla=0):
+    almacenamiento.put(pm.ENTRADA_JUGADORES, _jugadores(semilla).to_csv(index=False))
+    almacenamiento.put(pm.ENTRADA_GOLES, _goles(semilla).to_csv(index=False))
+    almacenamiento.put(pm.ENTRADA_RESULTADOS, _resultados(semilla).to_csv(index=False))
+
+
+def _leer(almacenamiento, key):
+    return pd.read_csv(io.BytesIO(almacenamiento.get(key)))
+
+
+@pytest.fixture
+def almacenamiento(tmp_path):
+    almacenamiento = AlmacenamientoLocal(tmp_path, "prueba-lambda")
+    _publicar(almacenamiento)
+    return almacenamiento
+
+
+def test_top_50_usa_los_totales_por_jugador(almacenamiento):
+    pm.procesar(almacenamiento, tamano_chunk=37)
+    jugadores = _jugadores()
+    totales = jugadores.groupby(["PLAYER", "COUNTRY"])[["GOALS", "ASSISTS"]].sum().sum(axis=1)
+    esperado = totales.nlargest(pm.TOP_JUGADORES).index.get_level_values("COUNTRY").value_counts()
+
+    obtenido = _leer(almacenamiento, f"{pm.SALIDA_PREFIX}analisis_top_50_ga_paises.csv")
+    assert obtenido["Jugadores_Top_50"].sum() == pm.TOP_JUGADORES
+    assert obtenido.set_index("COUNTRY")["Jugadores_Top_50"].to_dict() == esperado.to_dict()
+
+
+def test_goleadores_igual_que_con_pandas_completo(almacenamiento):
+    pm.procesar(almacenamiento, tamano_chunk=101)
+    goles = _goles()
+    goles = goles[~goles["own_goal"]]
+    por_goleador = goles.groupby("scorer").size()
+    esperado = por_goleador[por_goleador >= pm.MIN_GOLES_ELITE]
+
+    elite = _leer(almacenamiento, f"{pm.SALIDA_PREFIX}analisis_goleadores_top_3.csv")
+    assert elite.set_index("Goleador")["Goles"].to_dict() == esperado.to_dict()
+    paises = _leer(almacenamiento, f"{pm.SALIDA_PREFIX}analisis_top_10_paises_goleadores.csv")
+    esperado_paises = goles.groupby("team")["scorer"].nunique()
+    assert paises.set_index("Pais_Equipo")["Numero_de_Goleadores"].to_dict() == esperado_paises.to_dict()
+
+
+def test_salidas_no_dependen_del_tamano_del_bloque(tmp_path):
+    salidas = []
+    for chunk in (13, 100_000):
+        almacenamiento = AlmacenamientoLocal(tmp_path / str(chunk), "prueba-lambda")
+        _publicar(almacenamiento)
+        resultado = pm.procesar(almacenamiento, tamano_chunk=chunk)
+        salidas.append({key: almacenamiento.get(key) for key in resultado["salidas"]})
+    assert salidas[0] == salidas[1]
+
+
+def test_cubo_igual_al_de_results_completo(almacenamiento):
+    pm.procesar(almacenamiento, tamano_chunk=29)
+    esperado = cubo.combinar([cubo.cubo_de_partidos(_resultados())])
+    obtenido = _leer(almacenamiento, pm.SALIDA_CUBO)
+    pd.testing.assert_frame_equal(
+        obtenido.sort_values(list(obtenido.columns), ignore_index=True),
+        pd.read_csv(io.StringIO(esperado.to_csv(index=False))).sort_values(list(obtenido.columns), ignore_index=True),
+    )
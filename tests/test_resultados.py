@@ -0,0 +1,128 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import metricas, resultados
+from utils.resultados import CacheResultados, canonico, marcar_version
+
+
+@pytest.fixture(autouse=True)
+def _metricas_limpias():
+    metricas.limpiar()
+    yield
+    metricas.limpiar()
+
+
+def _fuente(version="v1"):
+    return marcar_version(pd.DataFrame({"year": [2014, 2018, 2022], "goles": [171, 169, 172]}), version)
+
+
+def test_calculo_unico_con_hilos_concurrentes():
+    cache = CacheResultados(nombre="prueba-concurrencia")
+    fuente = _fuente()
+    hilos_listos = threading.Barrier(8)
+    puede_terminar = threading.Event()
+    calculos = []
+
+    def calcular():
+        calculos.append(threading.get_ident())
+        # Quien calcula espera a que los demas ya esten esperando su resultado
+        assert puede_terminar.wait(5)
+        return fuente[fuente["year"] > 2014]
+
+    recibidos = [None] * 8
+
+    def sesion(i):
+        hilos_listos.wait()
+        recibidos[i] = resultados.consultar("goles:filtro", fuente, {"years": [2018, 2022]}, calcular, cache=cache)
+
+    hilos = [threading.Thread(target=sesion, args=(i,)) for i in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    while metricas.contadores().get("resultados:espera", 0) < 7:
+        time.sleep(0.01)
+    puede_terminar.set()
+    for hilo in hilos:
+        hilo.join(5)
+
+    assert len(calculos) == 1
+    contadores = metricas.contadores()
+    assert contadores["resultados:fallo"] == 1
+    assert contadores["resultados:espera"] == 7
+    for recibido in recibidos:
+        assert recibido["year"].tolist() == [2018, 2022]
+    # Cada sesion recibe su propia manija
+    assert len({id(r) for r in recibidos}) == 8
+
+
+def test_si_el_calculo_falla_otro_hilo_lo_reintenta():
+    cache = CacheResultados(nombre="prueba-falla")
+    intentos = []
+
+    def calcular():
+        intentos.append(1)
+        if len(intentos) == 1:
+            raise RuntimeError("fallo")
+        return 42
+
+    with pytest.raises(RuntimeError):
+        cache.obtener("clave", calcular)
+    assert cache.obtener("clave", calcular) == 42
+    assert cache.obtener("clave", calcular) == 42
+    assert len(intentos) == 2
+
+
+def test_lru_por_entradas():
+    cache = CacheResultados(max_entradas=2, nombre="prueba-entradas")
+    cache.obtener("a", lambda: 1)
+    cache.obtener("b", lambda: 2)
+    # Usar "a" la vuelve la mas reciente: al entrar "c" sale "b"
+    cache.obtener("a", lambda: pytest.fail("a seguia en la cache"))
+    cache.obtener("c", lambda: 3)
+    assert len(cache) == 2
+    assert cache.obtener("a", lambda: -1) == 1
+    assert cache.obtener("b", lambda: -2) == -2
+    assert metricas.contadores()["resultados:desalojo"] >= 1
+
+
+def test_lru_por_bytes():
+    fila = np.zeros(1000)
+    tamano = resultados.memoria.tamano_profundo(fila)
+    cache = CacheResultados(max_bytes=int(tamano * 2.5), nombre="prueba-bytes")
+    for clave in "abc":
+        cache.obtener(clave, lambda: np.zeros(1000))
+    assert len(cache) == 2
+    assert cache.bytes <= cache.max_bytes
+    # Un valor mas grande que toda la cache no se guarda
+    cache.obtener("enorme", lambda: np.zeros(10000))
+    assert len(cache) == 2
+    cache.limpiar()
+    assert len(cache) == 0 and cache.bytes == 0
+
+
+def test_claves_canonicas():
+    assert canonico({"years": [2018, 2014], "min": 0}) == canonico({"min": 0.0, "years": np.array([2014, 2018])})
+    assert canonico({"years": (np.int64(2014),)}) == canonico({"years": [2014]})
+    assert canonico({"years": [2014]}) != canonico({"years": [2018]})
+
+    cache = CacheResultados(nombre="prueba-canonico")
+    fuente = _fuente()
+    primera = resultados.consultar("vista", fuente, {"years": [2022, 2018]}, lambda: fuente.head(2), cache=cache)
+    segunda = resultados.consultar(
+        "vista", fuente, {"years": pd.Index([2018, 2022])}, lambda: pytest.fail("debia ser acierto"), cache=cache
+    )
+    pd.testing.assert_frame_equal(primera, segunda)
+
+
+def test_la_version_de_las_fuentes_es_parte_de_la_clave():
+    cache = CacheResultados(nombre="prueba-version")
+    resultados.consultar("vista", _fuente("v1"), {}, lambda: 1, cache=cache)
+    assert resultados.consultar("vista", _fuente("v2"), {}, lambda: 2, cache=cache) == 2
+    # Sin version no hay cache
+    sin_version = pd.DataFrame({"a": [1]})
+    assert resultados.consultar("vista", sin_version, {}, lambda: 3, cache=cache) == 3
+    assert resultados.consultar("vista", sin_version, {}, lambda: 4, cache=cache) == 4
+    assert len(cache) == 2
@@ -0,0 +1 @@
+"""Utilidades compartidas por los dashboards del repositorio."""
@@ -0,0 +1,90 @@
+"""Agregaciones del lado del servidor antes de construir las figuras.
+
+Las graficas no reciben el DataFrame crudo: se limitan las categorias ("top N + Otros"),
+se agrupan valores en bins y las series de tiempo se resumen en intervalos. Asi el
+payload que viaja al navegador (y el tiempo de render de Plotly) queda acotado aunque
+los datasets crezcan.
+
+El servidor no conoce el tamaño del viewport, por eso el nivel de detalle lo elige el
+usuario en el sidebar (`NIVELES_DETALLE`) y se traduce a un maximo de categorias/puntos.
+"""
+import pandas as pd
+
+from utils.metricas import cronometrar
+
+# Nivel de detalle -> (maximo de categorias, maximo de puntos por serie)
+NIVELES_DETALLE = {
+    "Bajo": (10, 200),
+    "Medio": (25, 600),
+    "Alto": (60, 2000),
+}
+NIVEL_DEFAULT = "Medio"
+ETIQUETA_OTROS = "Otros"
+
+
+def max_categorias(nivel):
+    return NIVELES_DETALLE.get(nivel, NIVELES_DETALLE[NIVEL_DEFAULT])[0]
+
+
+def max_puntos(nivel):
+    return NIVELES_DETALLE.get(nivel, NIVELES_DETALLE[NIVEL_DEFAULT])[1]
+
+
+@cronometrar("agregacion:top_n")
+def top_n_con_otros(df, categoria, valor, n, etiqueta=ETIQUETA_OTROS):
+    """Las `n` categorias con mayor `valor` y una fila extra que suma el resto.
+
+    La fila "Otros" lleva en la etiqueta cuantas categorias agrupa, p. ej. "Otros (14)".
+    """
+    if len(df) <= n:
+        return df
+    ordenado = df.sort_values(valor, ascending=False)
+    top, resto = ordenado.head(n), ordenado.iloc[n:]
+    otros = {columna: None for columna in df.columns}
+    otros[categoria] = f"{etiqueta} ({len(resto)})"
+    otros[valor] = resto[valor].sum()
+    return pd.concat([top, pd.DataFrame([otros])], ignore_index=True)
+
+
+@cronometrar("agregacion:top_n")
+def top_n(df, valor, n, ascendente=False):
+    """Las `n` filas con mayor (o menor) `valor`; para graficas donde sumar el resto no tiene sentido"""
+    if len(df) <= n:
+        return df
+    return df.nlargest(n, valor) if not ascendente else df.nsmallest(n, valor)
+
+
+@cronometrar("agregacion:bins")
+def agrupar_en_bins(serie, bins):
+    """Histograma calculado en el servidor: DataFrame con Rango, Desde, Hasta y Conteo"""
+    serie = serie.dropna()
+    if serie.empty:
+        return pd.DataFrame(columns=["Rango", "Desde", "Hasta", "Conteo"])
+    intervalos = pd.cut(serie, bins=bins)
+    conteo = intervalos.value_counts(sort=False)
+    return pd.DataFrame({
+        "Rango": [f"{i.left:,.0f} – {i.right:,.0f}" for i in conteo.index],
+        "Desde": [i.left for i in conteo.index],
+        "Hasta": [i.right for i in conteo.index],
+        "Conteo": conteo.values,
+    })
+
+
+@cronometrar("agregacion:tiempo")
+def agregar_por_tiempo(df, columna_tiempo, columnas, max_puntos, funcion="mean"):
+    """Resume `columnas` en a lo mas `max_puntos` intervalos de tiempo del mismo ancho"""
+    if df.empty or len(df) <= max_puntos:
+        return df[[columna_tiempo, *columnas]].sort_values(columna_tiempo)
+    tiempos = df[columna_tiempo]
+    rango = tiempos.max() - tiempos.min()
+    if rango == pd.Timedelta(0):
+        return df[[columna_tiempo, *columnas]].head(max_puntos)
+    # Ancho de intervalo redondeado a segundos para que las etiquetas sean legibles
+    ancho = max(pd.Timedelta(seconds=1), (rango / max_puntos).ceil("s"))
+    return (
+        df.set_index(columna_tiempo)[columnas]
+        .resample(ancho)
+        .agg(funcion)
+        .dropna(how="all")
+        .reset_index()
+    )
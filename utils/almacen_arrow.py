@@ -0,0 +1,109 @@
+"""Datasets persistidos como archivos Arrow IPC en disco local y leidos con mmap.
+
+Cada version de un dataset se escribe una sola vez (`<nombre>--<version>.arrow`) y
+todas las sesiones y procesos la abren con `pa.memory_map`: comparten las mismas
+paginas fisicas (cache del sistema operativo) y las columnas numericas de pandas se
+construyen sin copiar. Las columnas de texto quedan respaldadas por Arrow (pd.ArrowDtype).
+
+Se activa con la variable de entorno ARROW_DIR (por ejemplo /dev/shm/datasets).
+"""
+import hashlib
+import os
+import re
+import threading
+
+import pandas as pd
+
+from utils.importaciones import importar_diferido
+
+pa = importar_diferido("pyarrow")
+
+_locks = {}
+_lock_global = threading.Lock()
+
+
+def directorio():
+    """Carpeta de los archivos Arrow; vacio si el almacen esta desactivado"""
+    return os.getenv("ARROW_DIR", "")
+
+
+def activo():
+    return bool(directorio())
+
+
+def version_de(*partes):
+    """Version corta a partir de ETag, tamaño, fecha... de los objetos de origen"""
+    return hashlib.sha1("|".join(str(p) for p in partes).encode("utf-8")).hexdigest()[:16]
+
+
+def _nombre_archivo(nombre):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", nombre)
+
+
+def _ruta(nombre, version):
+    return os.path.join(directorio(), f"{_nombre_archivo(nombre)}--{version}.arrow")
+
+
+def _tabla_desde_pandas(df):
+    columnas = []
+    for columna in df.columns:
+        serie = df[columna]
+        if pd.api.types.is_float_dtype(serie.dtype):
+            # Los NaN se guardan como valores (no como nulos) para que la lectura sea sin copia
+            columnas.append(pa.array(serie.to_numpy(), from_pandas=False))
+        else:
+            columnas.append(pa.array(serie, from_pandas=True))
+    return pa.Table.from_arrays(columnas, names=[str(c) for c in df.columns])
+
+
+def _mapear_tipo(tipo):
+    if pa.types.is_string(tipo) or pa.types.is_large_string(tipo):
+        return pd.ArrowDtype(tipo)
+    return None
+
+
+def guardar(df, nombre, version):
+    """Escribe `df` como Arrow IPC (sin compresion, para poder mapearlo) y borra versiones viejas"""
+    os.makedirs(directorio(), exist_ok=True)
+    ruta = _ruta(nombre, version)
+    temporal = f"{ruta}.tmp-{os.getpid()}-{threading.get_ident()}"
+    tabla = _tabla_desde_pandas(df)
+    with pa.OSFile(temporal, "wb") as sink:
+        with pa.ipc.new_file(sink, tabla.schema) as writer:
+            writer.write_table(tabla)
+    os.replace(temporal, ruta)
+
+    # Los procesos que aun tengan mapeada una version vieja la siguen leyendo sin problema
+    prefijo = f"{_nombre_archivo(nombre)}--"
+    for archivo in os.listdir(directorio()):
+        if archivo.startswith(prefijo) and archivo.endswith(".arrow") and archivo != os.path.basename(ruta):
+            try:
+                os.remove(os.path.join(directorio(), archivo))
+            except OSError:
+                pass
+    return ruta
+
+
+def abrir(nombre, version):
+    """DataFrame respaldado por el archivo mapeado en memoria, o None si esa version no existe"""
+    ruta = _ruta(nombre, version)
+    if not os.path.exists(ruta):
+        return None
+    tabla = pa.ipc.open_file(pa.memory_map(ruta, "r")).read_all()
+    return tabla.to_pandas(split_blocks=True, types_mapper=_mapear_tipo)
+
+
+def obtener_o_construir(nombre, version, construir):
+    """Abre la version mapeada del dataset o la construye con `construir()` y la persiste"""
+    df = abrir(nombre, version)
+    if df is not None:
+        return df
+    with _lock_global:
+        lock = _locks.setdefault(nombre, threading.Lock())
+    with lock:
+        df = abrir(nombre, version)
+        if df is None:
+            guardar(construir(), nombre, version)
+            # Se devuelve la copia mapeada, no la que se acaba de construir
+            df = abrir(nombre, version)
+    return df
@@ -0,0 +1,518 @@
+"""Almacenamiento de objetos: interfaz comun con implementaciones para S3, disco local y memoria.
+
+Todas las implementaciones exponen las mismas operaciones (get/get_rango/put/subir/listar/head/abrir/borrar,
+mas las escrituras condicionales put_si_no_existe/put_si_coincide) y
+devuelven los metadatos con las mismas llaves que boto3 (Key, Size, LastModified, ETag),
+asi los loaders no dependen de donde viven los datos.
+
+El backend se elige por configuracion (ver `crear_almacenamiento`):
+    ALMACENAMIENTO_BACKEND = s3 (default) | local | memoria
+    ALMACENAMIENTO_RUTA    = carpeta raiz del backend local (default ./datos_locales)
+"""
+import datetime
+import hashlib
+import io
+import json
+import mmap
+import os
+import shutil
+import threading
+import time
+
+from utils.importaciones import importar_diferido
+
+boto3 = importar_diferido("boto3")
+pd = importar_diferido("pandas")
+
+
+class ObjetoNoEncontrado(KeyError):
+    """El objeto pedido no existe en el almacenamiento"""
+
+
+class ObjetoExistente(Exception):
+    """Escritura condicional: el objeto ya existia"""
+
+
+class VersionCambiada(Exception):
+    """Lectura condicional: el objeto ya no tiene el ETag pedido (alguien lo reescribio)"""
+
+
+class Almacenamiento:
+    """Interfaz comun para un bucket de objetos"""
+
+    bucket = None
+    # Los objetos viajan por la red (vale la pena comprimir y descargar por rangos)
+    remoto = False
+
+    def get(self, key):
+        """Devuelve el contenido completo del objeto como bytes"""
+        raise NotImplementedError
+
+    def get_rango(self, key, inicio, fin, etag=None):
+        """Bytes [inicio, fin) del objeto.
+
+        Con `etag`, solo si el objeto sigue siendo esa version; si no, lanza VersionCambiada.
+        Los backends lo comprueban en la misma lectura; esta version (HEAD + GET) no.
+        """
+        if etag is not None and self.head(key).get("ETag") != etag:
+            raise VersionCambiada(key)
+        return self.get(key)[inicio:fin]
+
+    def put(self, key, datos, metadatos=None):
+        """Guarda `datos` (bytes o str) en `key`, con `metadatos` ({str: str}) opcionales"""
+        raise NotImplementedError
+
+    def put_si_no_existe(self, key, datos):
+        """Como put, pero solo si `key` no existe; si ya existe lanza ObjetoExistente.
+
+        Los backends la hacen atomica; esta version (HEAD + PUT) no lo es.
+        """
+        try:
+            self.head(key)
+        except ObjetoNoEncontrado:
+            self.put(key, datos)
+            return
+        raise ObjetoExistente(key)
+
+    def put_si_coincide(self, key, datos, etag):
+        """Como put, pero solo si `key` sigue teniendo `etag` (con `etag=None`, solo si no existe).
+
+        Si otro escritor cambio el objeto lanza VersionCambiada (u ObjetoExistente).
+        Los backends la hacen atomica; esta version (HEAD + PUT) no lo es.
+        """
+        if etag is None:
+            return self.put_si_no_existe(key, datos)
+        try:
+            actual = self.head(key).get("ETag")
+        except ObjetoNoEncontrado:
+            actual = None
+        if actual != etag:
+            raise VersionCambiada(key)
+        self.put(key, datos)
+
+    def listar(self, prefix=""):
+        """Lista los objetos bajo `prefix` como dicts con Key, Size y LastModified"""
+        raise NotImplementedError
+
+    def head(self, key):
+        """Metadatos de un objeto (Key, Size, LastModified, ETag y Metadata)"""
+        raise NotImplementedError
+
+    def abrir(self, key):
+        """Objeto tipo archivo binario para leer `key` sin pasar por un bytes intermedio"""
+        return io.BytesIO(self.get(key))
+
+    def borrar(self, key):
+        """Borra `key`; borrar un objeto que no existe no es error (como en S3)"""
+        raise NotImplementedError
+
+    def subir(self, key, archivo, metadatos=None):
+        """Guarda el contenido de un archivo binario abierto (en S3, como multipart upload)"""
+        self.put(key, archivo.read(), metadatos)
+
+
+# ==========================================
+# S3
+# ==========================================
+class AlmacenamientoS3(Almacenamiento):
+    """Bucket de S3 a traves de un cliente de boto3"""
+
+    remoto = True
+
+    def __init__(self, bucket, cliente=None):
+        self.bucket = bucket
+        self.cliente = cliente if cliente is not None else boto3.client("s3")
+
+    def _no_encontrado(self, error, key):
+        codigo = getattr(error, "response", {}).get("Error", {}).get("Code")
+        if codigo in ("NoSuchKey", "404", "NotFound"):
+            return ObjetoNoEncontrado(f"s3://{self.bucket}/{key}")
+        return None
+
+    def get(self, key):
+        try:
+            obj = self.cliente.get_object(Bucket=self.bucket, Key=key)
+        except Exception as e:
+            no_encontrado = self._no_encontrado(e, key)
+            if no_encontrado:
+                raise no_encontrado from e
+            raise
+        return obj["Body"].read()
+
+    def get_rango(self, key, inicio, fin, etag=None):
+        condicion = {"IfMatch": etag} if etag is not None else {}
+        try:
+            obj = self.cliente.get_object(Bucket=self.bucket, Key=key, Range=f"bytes={inicio}-{fin - 1}", **condicion)
+        except Exception as e:
+            no_encontrado = self._no_encontrado(e, key)
+            if no_encontrado:
+                raise no_encontrado from e
+            if getattr(e, "response", {}).get("Error", {}).get("Code") in ("PreconditionFailed", "412"):
+                raise VersionCambiada(f"s3://{self.bucket}/{key}") from e
+            raise
+        return obj["Body"].read()
+
+    def abrir(self, key):
+        # El StreamingBody va directo al parser, sin copiar todo el objeto a memoria antes
+        try:
+            return self.cliente.get_object(Bucket=self.bucket, Key=key)["Body"]
+        except Exception as e:
+            no_encontrado = self._no_encontrado(e, key)
+            if no_encontrado:
+                raise no_encontrado from e
+            raise
+
+    def put(self, key, datos, metadatos=None):
+        if isinstance(datos, str):
+            datos = datos.encode("utf-8")
+        self.cliente.put_object(Bucket=self.bucket, Key=key, Body=datos, Metadata=metadatos or {})
+
+    def put_si_no_existe(self, key, datos):
+        if isinstance(datos, str):
+            datos = datos.encode("utf-8")
+        try:
+            # Escritura condicional de S3: falla si otro productor ya creo la key
+            self.cliente.put_object(Bucket=self.bucket, Key=key, Body=datos, IfNoneMatch="*")
+        except Exception as e:
+            codigo = getattr(e, "response", {}).get("Error", {}).get("Code")
+            if codigo in ("PreconditionFailed", "412", "ConditionalRequestConflict", "409"):
+                raise ObjetoExistente(f"s3://{self.bucket}/{key}") from e
+            raise
+
+    def put_si_coincide(self, key, datos, etag):
+        if etag is None:
+            return self.put_si_no_existe(key, datos)
+        if isinstance(datos, str):
+            datos = datos.encode("utf-8")
+        try:
+            # Escritura condicional de S3: falla si alguien reescribio (o borro) la key
+            self.cliente.put_object(Bucket=self.bucket, Key=key, Body=datos, IfMatch=etag)
+        except Exception as e:
+            codigo = getattr(e, "response", {}).get("Error", {}).get("Code")
+            if codigo in ("PreconditionFailed", "412", "ConditionalRequestConflict", "409", "NoSuchKey", "404"):
+                raise VersionCambiada(f"s3://{self.bucket}/{key}") from e
+            raise
+
+    def subir(self, key, archivo, metadatos=None):
+        # upload_fileobj parte el archivo en partes de 8 MB y las sube en paralelo;
+        # nunca se tiene el objeto completo en memoria
+        self.cliente.upload_fileobj(archivo, self.bucket, key, ExtraArgs={"Metadata": metadatos or {}})
+
+    def listar(self, prefix=""):
+        paginador = self.cliente.get_paginator("list_objects_v2")
+        objetos = []
+        for pagina in paginador.paginate(Bucket=self.bucket, Prefix=prefix):
+            objetos.extend(pagina.get("Contents", []))
+        return objetos
+
+    def head(self, key):
+        try:
+            respuesta = self.cliente.head_object(Bucket=self.bucket, Key=key)
+        except Exception as e:
+            no_encontrado = self._no_encontrado(e, key)
+            if no_encontrado:
+                raise no_encontrado from e
+            raise
+        return {
+            "Key": key,
+            "Size": respuesta["ContentLength"],
+            "LastModified": respuesta["LastModified"],
+            "ETag": respuesta.get("ETag"),
+            "Metadata": respuesta.get("Metadata", {}),
+        }
+
+    def borrar(self, key):
+        self.cliente.delete_object(Bucket=self.bucket, Key=key)
+
+
+# ==========================================
+# DISCO LOCAL
+# ==========================================
+class AlmacenamientoLocal(Almacenamiento):
+    """Bucket en disco: los objetos viven en `raiz/bucket/key` y se leen con mmap.
+
+    Los metadatos de usuario de un objeto van en `<key>.metadatos.json` (no se listan).
+    """
+
+    SUFIJO_METADATOS = ".metadatos.json"
+
+    def __init__(self, raiz, bucket):
+        self.bucket = bucket
+        self.directorio = os.path.join(os.path.abspath(raiz), bucket)
+
+    def _ruta(self, key):
+        ruta = os.path.abspath(os.path.join(self.directorio, key))
+        if not ruta.startswith(self.directorio + os.sep):
+            raise ValueError(f"Key fuera del bucket: {key}")
+        return ruta
+
+    @staticmethod
+    def _etag(info):
+        # Cada put escribe un archivo nuevo (otro inodo): dos versiones seguidas del mismo
+        # tamaño no comparten ETag aunque caigan en el mismo tick del reloj del sistema
+        return f'"{info.st_mtime_ns:x}-{info.st_size:x}-{info.st_ino:x}"'
+
+    def _metadatos(self, key, ruta):
+        info = os.stat(ruta)
+        return {
+            "Key": key,
+            "Size": info.st_size,
+            "LastModified": datetime.datetime.fromtimestamp(info.st_mtime, tz=datetime.timezone.utc),
+            "ETag": self._etag(info),
+        }
+
+    def get(self, key):
+        try:
+            with open(self._ruta(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError as e:
+            raise ObjetoNoEncontrado(key) from e
+
+    def get_rango(self, key, inicio, fin, etag=None):
+        try:
+            with open(self._ruta(key), "rb") as f:
+                # put reemplaza el archivo completo: lo abierto sigue siendo la version comprobada
+                if etag is not None and self._etag(os.fstat(f.fileno())) != etag:
+                    raise VersionCambiada(key)
+                f.seek(inicio)
+                return f.read(fin - inicio)
+        except FileNotFoundError as e:
+            raise ObjetoNoEncontrado(key) from e
+
+    def abrir(self, key):
+        # mmap: el parser lee directo de las paginas del archivo (cache del sistema operativo)
+        try:
+            with open(self._ruta(key), "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return io.BytesIO(b"")
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError as e:
+            raise ObjetoNoEncontrado(key) from e
+
+    def _guardar_metadatos(self, ruta, metadatos):
+        # Como en S3, reescribir un objeto sin metadatos le quita los anteriores
+        if metadatos:
+            temporal = f"{ruta}{self.SUFIJO_METADATOS}.tmp-{os.getpid()}-{threading.get_ident()}"
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(metadatos, f)
+            os.replace(temporal, ruta + self.SUFIJO_METADATOS)
+        elif os.path.exists(ruta + self.SUFIJO_METADATOS):
+            os.remove(ruta + self.SUFIJO_METADATOS)
+
+    def put(self, key, datos, metadatos=None):
+        if isinstance(datos, str):
+            datos = datos.encode("utf-8")
+        ruta = self._ruta(key)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        # Escritura atomica: nadie lee un archivo a medias
+        temporal = f"{ruta}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(temporal, "wb") as f:
+            f.write(datos)
+        os.replace(temporal, ruta)
+        self._guardar_metadatos(ruta, metadatos)
+
+    def put_si_no_existe(self, key, datos):
+        if isinstance(datos, str):
+            datos = datos.encode("utf-8")
+        ruta = self._ruta(key)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = f"{ruta}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(temporal, "wb") as f:
+            f.write(datos)
+        # link falla si el destino ya existe (a diferencia de replace)
+        try:
+            os.link(temporal, ruta)
+        except FileExistsError as e:
+            raise ObjetoExistente(key) from e
+        finally:
+            os.remove(temporal)
+
+    def put_si_coincide(self, key, datos, etag):
+        if etag is None:
+            return self.put_si_no_existe(key, datos)
+        if isinstance(datos, str):
+            datos = datos.encode("utf-8")
+        ruta = self._ruta(key)
+        candado = f"{ruta}.tmp-candado"
+        # El candado (O_EXCL) hace la comparacion y el reemplazo atomicos entre procesos
+        try:
+            descriptor = os.open(candado, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError as e:
+            # Otro escritor lo tiene; uno que murio con el candado tomado lo pierde a los 30 s
+            try:
+                if time.time() - os.stat(candado).st_mtime > 30:
+                    os.remove(candado)
+            except FileNotFoundError:
+                pass
+            raise VersionCambiada(key) from e
+        try:
+            os.close(descriptor)
+            try:
+                actual = self._etag(os.stat(ruta))
+            except FileNotFoundError:
+                actual = None
+            if actual != etag:
+                raise VersionCambiada(key)
+            temporal = f"{ruta}.tmp-{os.getpid()}-{threading.get_ident()}"
+            with open(temporal, "wb") as f:
+                f.write(datos)
+            os.replace(temporal, ruta)
+        finally:
+            os.remove(candado)
+
+    def subir(self, key, archivo, metadatos=None):
+        ruta = self._ruta(key)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = f"{ruta}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(temporal, "wb") as f:
+            shutil.copyfileobj(archivo, f)
+        os.replace(temporal, ruta)
+        self._guardar_metadatos(ruta, metadatos)
+
+    def listar(self, prefix=""):
+        objetos = []
+        for carpeta, _, archivos in os.walk(self.directorio):
+            for nombre in archivos:
+                if ".tmp-" in nombre or nombre.endswith(self.SUFIJO_METADATOS):
+                    continue
+                ruta = os.path.join(carpeta, nombre)
+                key = os.path.relpath(ruta, self.directorio).replace(os.sep, "/")
+                if key.startswith(prefix):
+                    objetos.append(self._metadatos(key, ruta))
+        return sorted(objetos, key=lambda x: x["Key"])
+
+    def head(self, key):
+        ruta = self._ruta(key)
+        if not os.path.isfile(ruta):
+            raise ObjetoNoEncontrado(key)
+        metadatos = self._metadatos(key, ruta)
+        try:
+            with open(ruta + self.SUFIJO_METADATOS, encoding="utf-8") as f:
+                metadatos["Metadata"] = json.load(f)
+        except FileNotFoundError:
+            metadatos["Metadata"] = {}
+        return metadatos
+
+    def borrar(self, key):
+        ruta = self._ruta(key)
+        for archivo in (ruta, ruta + self.SUFIJO_METADATOS):
+            try:
+                os.remove(archivo)
+            except FileNotFoundError:
+                pass
+
+
+# ==========================================
+# MEMORIA
+# ==========================================
+class AlmacenamientoMemoria(Almacenamiento):
+    """Bucket en memoria del proceso; todas las instancias con el mismo bucket comparten datos"""
+
+    _buckets = {}
+    _lock = threading.Lock()
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        with self._lock:
+            self._objetos = self._buckets.setdefault(bucket, {})
+
+    def get(self, key):
+        try:
+            return self._objetos[key]["datos"]
+        except KeyError as e:
+            raise ObjetoNoEncontrado(key) from e
+
+    def get_rango(self, key, inicio, fin, etag=None):
+        try:
+            objeto = self._objetos[key]
+        except KeyError as e:
+            raise ObjetoNoEncontrado(key) from e
+        if etag is not None and objeto["ETag"] != etag:
+            raise VersionCambiada(key)
+        return objeto["datos"][inicio:fin]
+
+    def put(self, key, datos, metadatos=None):
+        if isinstance(datos, str):
+            datos = datos.encode("utf-8")
+        datos = bytes(datos)
+        self._objetos[key] = {
+            "datos": datos,
+            "LastModified": datetime.datetime.now(tz=datetime.timezone.utc),
+            "ETag": f'"{hashlib.md5(datos).hexdigest()}"',
+            "Metadata": dict(metadatos or {}),
+        }
+
+    def put_si_no_existe(self, key, datos):
+        with self._lock:
+            if key in self._objetos:
+                raise ObjetoExistente(key)
+            self.put(key, datos)
+
+    def put_si_coincide(self, key, datos, etag):
+        with self._lock:
+            objeto = self._objetos.get(key)
+            if etag is None and objeto is not None:
+                raise ObjetoExistente(key)
+            if etag is not None and (objeto is None or objeto["ETag"] != etag):
+                raise VersionCambiada(key)
+            self.put(key, datos)
+
+    def _metadatos(self, key, objeto):
+        return {"Key": key, "Size": len(objeto["datos"]), "LastModified": objeto["LastModified"], "ETag": objeto["ETag"]}
+
+    def listar(self, prefix=""):
+        return [self._metadatos(k, v) for k, v in sorted(self._objetos.items()) if k.startswith(prefix)]
+
+    def head(self, key):
+        try:
+            objeto = self._objetos[key]
+            return {**self._metadatos(key, objeto), "Metadata": dict(objeto["Metadata"])}
+        except KeyError as e:
+            raise ObjetoNoEncontrado(key) from e
+
+    def borrar(self, key):
+        self._objetos.pop(key, None)
+
+    @classmethod
+    def limpiar(cls):
+        """Borra todos los buckets en memoria (util entre corridas de benchmark)"""
+        with cls._lock:
+            cls._buckets.clear()
+
+
+# ==========================================
+# CONFIGURACION
+# ==========================================
+BACKENDS = ("s3", "local", "memoria")
+
+
+def backend_configurado():
+    """Backend elegido en ALMACENAMIENTO_BACKEND (s3 por default)"""
+    backend = os.getenv("ALMACENAMIENTO_BACKEND", "s3").strip().lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"ALMACENAMIENTO_BACKEND invalido: {backend} (opciones: {', '.join(BACKENDS)})")
+    return backend
+
+
+def crear_almacenamiento(bucket, backend=None, cliente=None):
+    """Crea el almacenamiento de `bucket` con el backend configurado"""
+    backend = backend or backend_configurado()
+    if backend == "local":
+        return AlmacenamientoLocal(os.getenv("ALMACENAMIENTO_RUTA", "datos_locales"), bucket)
+    if backend == "memoria":
+        return AlmacenamientoMemoria(bucket)
+    return AlmacenamientoS3(bucket, cliente)
+
+
+def leer_csv(almacenamiento, key, **kwargs):
+    """Parsea un CSV directo desde el almacenamiento (stream de S3 o mmap local)"""
+    return pd.read_csv(almacenamiento.abrir(key), **kwargs)
+
+
+def copiar_prefijo(origen, destino, prefix=""):
+    """Copia todos los objetos bajo `prefix` de un almacenamiento a otro (p. ej. S3 -> local)"""
+    copiados = 0
+    for obj in origen.listar(prefix):
+        destino.put(obj["Key"], origen.get(obj["Key"]))
+        copiados += 1
+    return copiados
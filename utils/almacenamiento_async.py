@@ -0,0 +1,98 @@
+"""Capa asyncio sobre cualquier Almacenamiento (S3, disco local o memoria).
+
+Las llamadas bloqueantes de boto3 se ejecutan en hilos (`asyncio.to_thread`) con un
+semaforo que limita la concurrencia. Cada operacion puede tener un timeout y se puede
+cancelar; una descarga lenta no detiene a las demas.
+
+La usa el monitor de servidores (utils/servidores.py) para bajar los snapshots de raw/.
+El dashboard del Mundial ya baja sus datasets en paralelo en el pool del refrescador
+(utils/refresco.py), y los dashboards de Lambda leen un solo objeto por carga.
+"""
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AlmacenamientoAsync:
+    """Version asincrona de get/put/listar/head con limite de concurrencia"""
+
+    def __init__(self, almacenamiento, max_concurrencia=8, timeout=None):
+        self.almacenamiento = almacenamiento
+        self.max_concurrencia = max_concurrencia
+        self.timeout = timeout
+        # Un semaforo por event loop (cada asyncio.run crea un loop nuevo)
+        self._semaforos = weakref.WeakKeyDictionary()
+
+    async def _ejecutar(self, funcion, *args):
+        loop = asyncio.get_running_loop()
+        semaforo = self._semaforos.get(loop)
+        if semaforo is None:
+            semaforo = self._semaforos[loop] = asyncio.Semaphore(self.max_concurrencia)
+        async with semaforo:
+            tarea = asyncio.to_thread(funcion, *args)
+            if self.timeout is None:
+                return await tarea
+            return await asyncio.wait_for(tarea, self.timeout)
+
+    async def get(self, key):
+        return await self._ejecutar(self.almacenamiento.get, key)
+
+    async def put(self, key, datos):
+        return await self._ejecutar(self.almacenamiento.put, key, datos)
+
+    async def listar(self, prefix=""):
+        return await self._ejecutar(self.almacenamiento.listar, prefix)
+
+    async def head(self, key):
+        return await self._ejecutar(self.almacenamiento.head, key)
+
+    async def mapear(self, keys, funcion):
+        """Ejecuta `funcion(key)` para cada key en hilos, respetando el limite de concurrencia.
+
+        Devuelve un dict key -> resultado; los errores se devuelven como la excepcion.
+        """
+        resultados = await asyncio.gather(*(self._ejecutar(funcion, key) for key in keys), return_exceptions=True)
+        for resultado in resultados:
+            # La cancelacion del llamador no se convierte en resultado
+            if isinstance(resultado, asyncio.CancelledError):
+                raise resultado
+        return dict(zip(keys, resultados))
+
+    async def get_varios(self, keys, procesar=None):
+        """Descarga varias keys a la vez.
+
+        Si se pasa `procesar`, se aplica a los bytes de cada objeto en el mismo hilo
+        (por ejemplo `pd.read_csv`), asi el parseo tambien se traslapa con las descargas.
+        """
+        def uno(key):
+            datos = self.almacenamiento.get(key)
+            return datos if procesar is None else procesar(datos)
+
+        return await self.mapear(keys, uno)
+
+
+async def _cancelar_pendientes():
+    actual = asyncio.current_task()
+    pendientes = [t for t in asyncio.all_tasks() if t is not actual]
+    for tarea in pendientes:
+        tarea.cancel()
+    await asyncio.gather(*pendientes, return_exceptions=True)
+
+
+def ejecutar(corrutina):
+    """Corre una corrutina desde codigo sincrono (por ejemplo un script de Streamlit).
+
+    A diferencia de asyncio.run, al terminar no espera a los hilos de las operaciones que
+    vencieron su timeout o se cancelaron: siguen hasta que boto3 regrese, pero sin
+    detener a quien llamo.
+    """
+    loop = asyncio.new_event_loop()
+    ejecutor = ThreadPoolExecutor(thread_name_prefix="almacenamiento-async")
+    loop.set_default_executor(ejecutor)
+    try:
+        return loop.run_until_complete(corrutina)
+    finally:
+        loop.run_until_complete(_cancelar_pendientes())
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        ejecutor.shutdown(wait=False, cancel_futures=True)
+        loop.close()
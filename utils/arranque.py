@@ -0,0 +1,28 @@
+"""Arranque del contenedor: calienta los modulos pesados y lanza Streamlit en el mismo proceso.
+
+Uso:
+    python -m utils.arranque app_proyecto.py --server.port=8501 --server.address=0.0.0.0
+
+Como Streamlit corre en este mismo proceso, la primera sesion despues de un deploy
+encuentra pandas, plotly y boto3 ya importados y la primera grafica ya construida.
+"""
+import sys
+
+from utils.importaciones import calentar
+
+
+def main():
+    tiempos = calentar()
+    total = sum(tiempos.values())
+    print(f"🔥 Calentamiento listo en {total:.0f} ms")
+    for nombre, ms in sorted(tiempos.items(), key=lambda x: x[1], reverse=True):
+        print(f"   {nombre:<28} {ms:>8.1f} ms")
+
+    from streamlit.web import cli as stcli
+
+    sys.argv = ["streamlit", "run", *sys.argv[1:]]
+    sys.exit(stcli.main())
+
+
+if __name__ == "__main__":
+    main()
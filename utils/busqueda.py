@@ -0,0 +1,165 @@
+"""Busqueda de jugadores por nombre: prefijo y difusa, sin recorrer el DataFrame.
+
+Los nombres se normalizan una vez (minusculas, sin acentos ni signos) y se construyen
+dos indices por version del dataset:
+
+    - Prefijo: lista ordenada de claves (nombre completo y cada apellido/nombre a partir
+      del segundo) que se recorre con `bisect`; "mes" encuentra "Lionel Messi".
+    - Difusa: indice invertido de trigramas. Los candidatos se cuentan con un solo
+      `np.bincount` y se ordenan por la parte de los trigramas de la consulta que tiene
+      cada nombre; "ronaldiño" o "mesi" tambien encuentran al jugador.
+
+Construir el indice cuesta lo mismo que un recorrido completo, pero se hace una sola vez:
+`indice_de(df, ...)` lo guarda mientras exista ese DataFrame (el refrescador sirve un
+solo objeto por version), asi que cada consulta cuesta milisegundos.
+"""
+import bisect
+import functools
+import re
+import threading
+import time
+import unicodedata
+import weakref
+from collections import defaultdict
+
+import numpy as np
+
+from utils import memoria
+from utils.metricas import cronometrar
+
+# Consultas mas cortas que esto solo buscan por prefijo (los trigramas no discriminan)
+MIN_DIFUSA = 3
+# Fraccion minima de los trigramas de la consulta que debe tener un nombre
+COBERTURA_MIN = 0.5
+_NO_ALFANUMERICO = re.compile(r"[^a-z0-9]+")
+
+
+def normalizar(texto):
+    """Minusculas, sin acentos y con un solo espacio entre palabras ("Ñúñez-Díaz" -> "nunez diaz")"""
+    if not isinstance(texto, str):
+        return ""
+    sin_acentos = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    return _NO_ALFANUMERICO.sub(" ", sin_acentos.lower()).strip()
+
+
+def trigramas(normalizado):
+    """Trigramas de cada palabra de un nombre ya normalizado, con relleno para que cuenten los inicios"""
+    grams = set()
+    for palabra in normalizado.split():
+        texto = f"  {palabra} "
+        grams.update(texto[i:i + 3] for i in range(len(texto) - 2))
+    return grams
+
+
+class IndiceNombres:
+    """Indice de prefijos y trigramas sobre una secuencia de nombres.
+
+    Los resultados son posiciones (0..n-1) de la secuencia original; con `pesos`, los
+    empates de relevancia se ordenan de mayor a menor peso (p. ej. goles).
+    """
+
+    def __init__(self, nombres, pesos=None):
+        normalizados = [normalizar(n) for n in nombres]
+        self.tamano = len(normalizados)
+        self._pesos = np.zeros(self.tamano) if pesos is None else np.nan_to_num(np.asarray(pesos, dtype=float))
+
+        claves = []
+        postings = defaultdict(list)
+        self._n_trigramas = np.zeros(self.tamano, dtype=np.int32)
+        for posicion, nombre in enumerate(normalizados):
+            if not nombre:
+                continue
+            palabras = nombre.split(" ")
+            claves.append((nombre, posicion, True))
+            claves.extend((" ".join(palabras[i:]), posicion, False) for i in range(1, len(palabras)))
+            grams = trigramas(nombre)
+            self._n_trigramas[posicion] = len(grams)
+            for gram in grams:
+                postings[gram].append(posicion)
+        claves.sort()
+        self._claves = [clave for clave, _, _ in claves]
+        self._posiciones = np.fromiter((p for _, p, _ in claves), dtype=np.int64, count=len(claves))
+        self._completo = np.fromiter((c for _, _, c in claves), dtype=float, count=len(claves))
+        self._postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def _mejores(self, posiciones, limite, puntajes=None):
+        """Las `limite` posiciones con mayor (puntaje, peso)"""
+        if puntajes is None:
+            puntajes = np.zeros(len(posiciones))
+        if len(posiciones) > limite:
+            # Corte grueso por puntaje + peso antes del orden exacto
+            seleccion = np.argpartition(-(puntajes * 1e9 + self._pesos[posiciones]), limite - 1)[:limite]
+            posiciones, puntajes = posiciones[seleccion], puntajes[seleccion]
+        orden = np.lexsort((-self._pesos[posiciones], -puntajes))
+        return posiciones[orden].tolist()
+
+    def prefijo(self, consulta, limite=10):
+        """Nombres en los que alguna palabra (o el nombre completo) empieza con `consulta`"""
+        consulta = normalizar(consulta)
+        if not consulta:
+            return []
+        inicio = bisect.bisect_left(self._claves, consulta)
+        fin = bisect.bisect_left(self._claves, consulta + "\x7f", lo=inicio)
+        if inicio == fin:
+            return []
+        posiciones, inversa = np.unique(self._posiciones[inicio:fin], return_inverse=True)
+        # Coincidencia al inicio del nombre completo antes que en un apellido
+        puntajes = np.zeros(len(posiciones))
+        np.maximum.at(puntajes, inversa, self._completo[inicio:fin])
+        return self._mejores(posiciones, limite, puntajes)
+
+    def difusa(self, consulta, limite=10, minimo=COBERTURA_MIN):
+        """Nombres que comparten al menos `minimo` de los trigramas de `consulta`"""
+        consulta = normalizar(consulta)
+        if len(consulta) < MIN_DIFUSA:
+            return []
+        grams = trigramas(consulta)
+        listas = [self._postings[g] for g in grams if g in self._postings]
+        if not listas:
+            return []
+        comunes = np.bincount(np.concatenate(listas), minlength=self.tamano)
+        candidatos = np.flatnonzero(comunes)
+        compartidos = comunes[candidatos]
+        cobertura = compartidos / len(grams)
+        # Entre coberturas iguales gana el nombre con menos trigramas de sobra (Jaccard)
+        jaccard = compartidos / (len(grams) + self._n_trigramas[candidatos] - compartidos)
+        validos = cobertura >= minimo
+        return self._mejores(candidatos[validos], limite, cobertura[validos] + jaccard[validos] / 10)
+
+    @cronometrar("busqueda:jugadores")
+    def buscar(self, consulta, limite=10):
+        """Primero las coincidencias por prefijo y, si faltan, las difusas"""
+        resultados = self.prefijo(consulta, limite)
+        if len(resultados) < limite:
+            vistos = set(resultados)
+            resultados += [p for p in self.difusa(consulta, 2 * limite) if p not in vistos][:limite - len(resultados)]
+        return resultados
+
+
+_indices = {}
+_lock = threading.Lock()
+
+
+def indice_de(df, columna, peso=None):
+    """IndiceNombres de `df[columna]`, construido una vez por objeto DataFrame"""
+    clave = (id(df), columna, peso)
+    with _lock:
+        entrada = _indices.get(clave)
+        if entrada is not None and entrada[0]() is df:
+            memoria.usar("busqueda", clave)
+            return entrada[1]
+        inicio = time.perf_counter()
+        indice = IndiceNombres(df[columna].tolist(), df[peso].to_numpy() if peso else None)
+        costo_ms = (time.perf_counter() - inicio) * 1000
+        _indices[clave] = (weakref.ref(df), indice)
+        # Cuando el refrescador cambia de version el DataFrame viejo se libera y su indice tambien
+        weakref.finalize(df, _olvidar, clave)
+    # Fuera del lock; si el presupuesto lo saca, la siguiente busqueda lo reconstruye
+    memoria.registrar("busqueda", clave, memoria.tamano_profundo(indice), costo_ms,
+                      functools.partial(_indices.pop, clave, None))
+    return indice
+
+
+def _olvidar(clave):
+    _indices.pop(clave, None)
+    memoria.quitar("busqueda", clave)
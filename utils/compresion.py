@@ -0,0 +1,215 @@
+"""Variantes comprimidas de los objetos (zstd / gzip) y lectura con descompresion en streaming.
+
+Los productores publican junto a cada objeto sus variantes `<key>.zst` (si esta instalado
+`zstandard`) y `<key>.gz`. El original sin comprimir se conserva para quien no negocia
+(notebooks, portafolio, versiones viejas de los dashboards).
+
+Cada variante guarda en sus metadatos el ETag del original del que salio
+(`etag-original`). Si alguien reescribe solo el original (un notebook, una subida a
+mano), sus variantes dejan de coincidir y se ignoran: nunca se sirve una variante vieja.
+
+Los lectores negocian la variante: prueban en orden de preferencia las que aceptan y
+descomprimen el stream mientras el parser lo consume, sin tener nunca el objeto
+descomprimido completo en memoria. Los CSV se transfieren con 3 a 5 veces menos bytes,
+que es lo que domina el arranque en frio contra S3 (ver benchmarks/bench_compresion.py).
+
+Formatos aceptados al leer (en orden de preferencia):
+    COMPRESION_ACEPTADA = zstd,gzip (default en S3) | vacio (siempre el original)
+En los backends local y memoria no hay red que ahorrar: por default se lee el original
+(y el local conserva su lectura con mmap).
+"""
+import gzip
+import importlib.util
+import os
+import shutil
+import tempfile
+
+from utils import descarga
+from utils.almacenamiento import ObjetoNoEncontrado
+from utils.importaciones import importar_diferido
+from utils.metricas import incrementar
+
+pd = importar_diferido("pandas")
+zstandard = importar_diferido("zstandard")
+
+EXTENSIONES = {"zstd": ".zst", "gzip": ".gz"}
+# zstd comprime al menos como gzip y descomprime varias veces mas rapido
+NIVELES = {"zstd": 10, "gzip": 6}
+# Metadato de cada variante con el ETag del original (S3 guarda las llaves en minusculas)
+META_ORIGINAL = "etag-original"
+
+
+def zstd_disponible():
+    return importlib.util.find_spec("zstandard") is not None
+
+
+def formatos_disponibles():
+    """Formatos que este proceso puede escribir y leer, del preferido al menos preferido"""
+    return [f for f in EXTENSIONES if f != "zstd" or zstd_disponible()]
+
+
+def formatos_aceptados(almacenamiento):
+    """Formatos que se piden al leer de `almacenamiento` (ver COMPRESION_ACEPTADA)"""
+    configurados = os.getenv("COMPRESION_ACEPTADA")
+    if configurados is None:
+        return formatos_disponibles() if almacenamiento.remoto else []
+    pedidos = [f.strip().lower() for f in configurados.split(",") if f.strip()]
+    return [f for f in pedidos if f in formatos_disponibles()]
+
+
+def formato_de(key):
+    """Formato de compresion segun la extension de `key` (None si no esta comprimido)"""
+    for formato, extension in EXTENSIONES.items():
+        if key.endswith(extension):
+            return formato
+    return None
+
+
+def sin_extension(key):
+    formato = formato_de(key)
+    return key[:-len(EXTENSIONES[formato])] if formato else key
+
+
+# ==========================================
+# ESCRITURA
+# ==========================================
+def comprimir(datos, formato):
+    if isinstance(datos, str):
+        datos = datos.encode("utf-8")
+    if formato == "zstd":
+        return zstandard.ZstdCompressor(level=NIVELES["zstd"]).compress(datos)
+    return gzip.compress(datos, compresslevel=NIVELES["gzip"])
+
+
+def _etag(metadatos):
+    return (metadatos.get("ETag") or "").strip('"')
+
+
+def metadatos_variante(almacenamiento, key):
+    """Metadatos para las variantes de `key`: el ETag del original recien escrito"""
+    return {META_ORIGINAL: _etag(almacenamiento.head(key))}
+
+
+def publicar(almacenamiento, key, datos, formatos=None):
+    """Guarda `datos` en `key` y sus variantes comprimidas; devuelve {key: bytes escritos}"""
+    if isinstance(datos, str):
+        datos = datos.encode("utf-8")
+    almacenamiento.put(key, datos)
+    tamanos = {key: len(datos)}
+    metadatos = metadatos_variante(almacenamiento, key)
+    for formato in formatos_disponibles() if formatos is None else formatos:
+        comprimido = comprimir(datos, formato)
+        almacenamiento.put(key + EXTENSIONES[formato], comprimido, metadatos)
+        tamanos[key + EXTENSIONES[formato]] = len(comprimido)
+    return tamanos
+
+
+def borrar(almacenamiento, key):
+    """Borra `key` y todas sus variantes comprimidas"""
+    almacenamiento.borrar(key)
+    for extension in EXTENSIONES.values():
+        almacenamiento.borrar(key + extension)
+
+
+def _escritor(formato, destino):
+    if formato == "zstd":
+        return zstandard.ZstdCompressor(level=NIVELES["zstd"]).stream_writer(destino, closefd=False)
+    return gzip.GzipFile(fileobj=destino, mode="wb", compresslevel=NIVELES["gzip"])
+
+
+def subir(almacenamiento, key, archivo, formatos=None):
+    """Como `publicar`, pero desde un archivo binario con `seek` (las salidas grandes de la Lambda).
+
+    Cada variante se comprime por bloques a un archivo temporal y se sube por partes.
+    """
+    almacenamiento.subir(key, archivo)
+    metadatos = metadatos_variante(almacenamiento, key)
+    for formato in formatos_disponibles() if formatos is None else formatos:
+        archivo.seek(0)
+        with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as comprimido:
+            with _escritor(formato, comprimido) as escritor:
+                shutil.copyfileobj(archivo, escritor)
+            comprimido.seek(0)
+            almacenamiento.subir(key + EXTENSIONES[formato], comprimido, metadatos)
+
+
+# ==========================================
+# LECTURA
+# ==========================================
+def resolver(almacenamiento, key, formatos=None):
+    """(key_real, formato, metadatos) de la variante preferida que exista y este al dia.
+
+    Un HEAD del original y uno por variante probada; una variante cuyo `etag-original`
+    no es el ETag actual del original se salta. El original siempre es la ultima opcion.
+    """
+    formatos = formatos_aceptados(almacenamiento) if formatos is None else formatos
+    if not formatos:
+        return key, None, almacenamiento.head(key)
+    original = almacenamiento.head(key)
+    for formato in formatos:
+        try:
+            variante = almacenamiento.head(key + EXTENSIONES[formato])
+        except ObjetoNoEncontrado:
+            continue
+        if variante.get("Metadata", {}).get(META_ORIGINAL) == _etag(original):
+            return key + EXTENSIONES[formato], formato, variante
+        incrementar("compresion:variante_vieja")
+    return key, None, original
+
+
+def descomprimir_stream(stream, formato):
+    """Objeto tipo archivo que entrega `stream` descomprimido conforme se lee"""
+    if formato == "zstd":
+        return zstandard.ZstdDecompressor().stream_reader(stream)
+    if formato == "gzip":
+        return gzip.GzipFile(fileobj=stream, mode="rb")
+    return stream
+
+
+def descomprimir(datos, key):
+    """Bytes originales de un objeto ya descargado, segun la extension de su key"""
+    formato = formato_de(key)
+    if formato == "zstd":
+        return zstandard.ZstdDecompressor().decompressobj().decompress(datos)
+    if formato == "gzip":
+        return gzip.decompress(datos)
+    return datos
+
+
+def leer_variante(almacenamiento, key_real, formato, tamano=None, etag=None, **kwargs):
+    """pd.read_csv de una variante ya resuelta, descomprimiendo mientras se parsea.
+
+    Con `tamano` (de los metadatos), los objetos grandes se bajan por rangos en paralelo,
+    todos de la version con `etag`.
+    """
+    stream = descarga.abrir(almacenamiento, key_real, tamano, etag=etag) if tamano is not None else almacenamiento.abrir(key_real)
+    return pd.read_csv(descomprimir_stream(stream, formato), **kwargs)
+
+
+def leer_csv(almacenamiento, key, formatos=None, **kwargs):
+    """pd.read_csv de la mejor variante de `key`"""
+    key_real, formato, meta = resolver(almacenamiento, key, formatos)
+    return leer_variante(almacenamiento, key_real, formato, meta["Size"], meta.get("ETag"), **kwargs)
+
+
+def elegir_variantes(objetos, formatos):
+    """De un listado con originales y variantes, una entrada por objeto: la variante preferida.
+
+    Negociar sobre el listado no cuesta peticiones extra (p. ej. los snapshots de raw/).
+    El listado no trae metadatos: una variante mas vieja que su original se descarta.
+    """
+    preferencia = {None: len(formatos), **{f: i for i, f in enumerate(formatos)}}
+    modificados = {obj["Key"]: obj["LastModified"] for obj in objetos if formato_de(obj["Key"]) is None}
+    elegidos = {}
+    for obj in objetos:
+        formato = formato_de(obj["Key"])
+        if formato is not None and formato not in formatos:
+            continue
+        original = modificados.get(sin_extension(obj["Key"]))
+        if formato is not None and original is not None and obj["LastModified"] < original:
+            continue
+        base = sin_extension(obj["Key"])
+        actual = elegidos.get(base)
+        if actual is None or preferencia[formato] < preferencia[formato_de(actual["Key"])]:
+            elegidos[base] = obj
+    return [elegidos[base] for base in sorted(elegidos)]
@@ -0,0 +1,232 @@
+"""Crossfilter: filtros cruzados entre graficas con reducciones por grupo incrementales.
+
+Cada grafica agrupa por una dimension (p. ej. Occupation) y cada dimension puede tener
+un filtro (las barras seleccionadas). Un grupo ve las filas que pasan todos los filtros
+excepto el de su propia dimension, asi la grafica donde se selecciona sigue mostrando
+todas sus barras y las demas se recalculan.
+
+En lugar de volver a filtrar y agrupar el DataFrame en cada cambio:
+
+    - Cada fila guarda una mascara de bits: el bit d esta prendido si el filtro de la
+      dimension d la excluye.
+    - Cada grupo mantiene conteos y sumas por categoria (np.bincount).
+    - Al cambiar el filtro de una dimension solo se visitan las filas de las categorias
+      que entraron o salieron (indice ordenado por categoria), y a cada grupo se le
+      restan las filas que dejo de ver y se le suman las que empezo a ver.
+
+El costo de un cambio es proporcional a las filas que cambian, no al tamaño del dataset.
+
+    base = Crossfilter(df, {"genero": "Gender", "ocupacion": "Occupation"}, medidas=["Heart Rate"])
+    cf = base.clonar()                       # estado propio de cada sesion
+    cf.grupo("ocupacion", medida="Heart Rate")
+    cf.filtrar("genero", ["Female"])
+    cf.reduccion("ocupacion")                # DataFrame categoria / conteo / promedio
+"""
+import numpy as np
+import pandas as pd
+
+from utils.metricas import incrementar
+
+MAX_DIMENSIONES = 32
+# Dimension de una sola categoria para los totales (KPIs)
+TODAS = "*"
+
+
+class _Dimension:
+    """Codigos por fila de una columna y las filas de cada categoria (compartido entre clones)"""
+
+    def __init__(self, bit, serie):
+        codigos, categorias = pd.factorize(serie, sort=True)
+        # Los nulos quedan como una categoria mas al final (para poder filtrarlos)
+        self.nulo = None
+        if (codigos < 0).any():
+            self.nulo = len(categorias)
+            codigos = np.where(codigos < 0, self.nulo, codigos)
+            categorias = categorias.append(pd.Index([None]))
+        self.bit = np.uint32(0 if bit is None else 1 << bit)
+        self.codigos = codigos.astype(np.int32)
+        self.categorias = categorias
+        self.orden = np.argsort(self.codigos, kind="stable")
+        self.inicios = np.searchsorted(self.codigos[self.orden], np.arange(len(categorias) + 1))
+
+    def filas_de(self, codigos):
+        """Filas de las categorias `codigos`, recorriendo solo esas categorias"""
+        if len(codigos) == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self.orden[self.inicios[c]:self.inicios[c + 1]] for c in codigos])
+
+    def codigos_de(self, valores):
+        """Codigos de las categorias que estan en `valores` (los desconocidos se ignoran).
+
+        None/NaN se buscan aparte: con categorias de texto de pandas 3, `get_indexer` no
+        encuentra el nulo que se agrego al final.
+        """
+        valores = list(valores)
+        conocidos = [v for v in valores if not pd.isna(v)]
+        posiciones = self.categorias.get_indexer(pd.Index(conocidos)) if conocidos else np.empty(0, dtype=np.intp)
+        posiciones = posiciones[posiciones >= 0]
+        if self.nulo is not None and len(conocidos) < len(valores):
+            posiciones = np.append(posiciones, self.nulo)
+        return posiciones
+
+
+class _Grupo:
+    """Conteo (y suma/no nulos de una medida) por categoria sobre las filas que ve el grupo"""
+
+    def __init__(self, dimension, bits_relevantes, valores=None):
+        self.dimension = dimension
+        self.bits_relevantes = np.uint32(bits_relevantes)
+        self.valores = valores
+        n = len(dimension.categorias)
+        self.conteo = np.zeros(n, dtype=np.int64)
+        self.suma = np.zeros(n) if valores is not None else None
+        self.no_nulos = np.zeros(n, dtype=np.int64) if valores is not None else None
+
+    def ve(self, mascaras):
+        return (mascaras & self.bits_relevantes) == 0
+
+    def actualizar(self, filas, signo):
+        if len(filas) == 0:
+            return
+        n = len(self.conteo)
+        codigos = self.dimension.codigos[filas]
+        self.conteo += signo * np.bincount(codigos, minlength=n)
+        if self.valores is not None:
+            valores = self.valores[filas]
+            validos = ~np.isnan(valores)
+            self.suma += signo * np.bincount(codigos[validos], weights=valores[validos], minlength=n)
+            self.no_nulos += signo * np.bincount(codigos[validos], minlength=n)
+            # Sin residuos de punto flotante en las categorias que se vaciaron
+            self.suma[self.no_nulos == 0] = 0.0
+
+    def clonar(self):
+        copia = _Grupo.__new__(_Grupo)
+        copia.__dict__.update(self.__dict__)
+        copia.conteo = self.conteo.copy()
+        copia.suma = None if self.suma is None else self.suma.copy()
+        copia.no_nulos = None if self.no_nulos is None else self.no_nulos.copy()
+        return copia
+
+
+class Crossfilter:
+    """Dimensiones filtrables y grupos que se actualizan de forma incremental.
+
+    `dimensiones` es {nombre: columna}; dos dimensiones pueden usar la misma columna
+    (p. ej. el filtro del sidebar y la seleccion en una grafica). `medidas` son las
+    columnas numericas que pueden promediar los grupos.
+    """
+
+    def __init__(self, df, dimensiones, medidas=()):
+        if len(dimensiones) > MAX_DIMENSIONES:
+            raise ValueError(f"A lo mas {MAX_DIMENSIONES} dimensiones")
+        self.df = df
+        self.tamano = len(df)
+        self._dimensiones = {
+            nombre: _Dimension(bit, df[columna]) for bit, (nombre, columna) in enumerate(dimensiones.items())
+        }
+        # No se puede filtrar (no tiene bit): solo sirve para agrupar todo en una categoria
+        self._todas = _Dimension(None, pd.Series(np.zeros(self.tamano, dtype=np.int8)))
+        self._medidas = {m: pd.to_numeric(df[m], errors="coerce").to_numpy(dtype=float) for m in medidas}
+        self._mascaras = np.zeros(self.tamano, dtype=np.uint32)
+        self._permitidos = {nombre: None for nombre in self._dimensiones}
+        self._grupos = {}
+
+    def clonar(self):
+        """Crossfilter con los mismos datos (sin copiarlos) y su propio estado de filtros y grupos"""
+        copia = Crossfilter.__new__(Crossfilter)
+        copia.__dict__.update(self.__dict__)
+        copia._mascaras = self._mascaras.copy()
+        copia._permitidos = {n: None if p is None else p.copy() for n, p in self._permitidos.items()}
+        copia._grupos = {n: g.clonar() for n, g in self._grupos.items()}
+        return copia
+
+    # ==========================================
+    # GRUPOS
+    # ==========================================
+    def grupo(self, nombre, dimension=None, medida=None, ignorar_propio=True):
+        """Registra el grupo `nombre` sobre `dimension` (default: la dimension con ese nombre).
+
+        Con `dimension=TODAS` el grupo tiene una sola categoria (totales para KPIs). Con
+        `ignorar_propio=False` el grupo tambien respeta el filtro de su dimension.
+        Registrarlo es un recorrido completo, solo la primera vez; despues se actualiza
+        incrementalmente.
+        """
+        if nombre in self._grupos:
+            return self._grupos[nombre]
+        dimension = self._todas if dimension == TODAS else self._dimensiones[dimension or nombre]
+        relevantes = np.uint32(sum(int(d.bit) for d in self._dimensiones.values()))
+        if ignorar_propio:
+            relevantes &= ~dimension.bit
+        grupo = _Grupo(dimension, relevantes, None if medida is None else self._medidas[medida])
+        grupo.actualizar(np.flatnonzero(grupo.ve(self._mascaras)), 1)
+        self._grupos[nombre] = grupo
+        return grupo
+
+    def reduccion(self, nombre, incluir_vacios=False):
+        """DataFrame categoria / conteo (/ promedio si el grupo tiene medida)"""
+        grupo = self._grupos[nombre]
+        df = pd.DataFrame({"categoria": grupo.dimension.categorias, "conteo": grupo.conteo})
+        if grupo.suma is not None:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                df["promedio"] = np.where(grupo.no_nulos > 0, grupo.suma / grupo.no_nulos, np.nan)
+        return df if incluir_vacios else df[df["conteo"] > 0].reset_index(drop=True)
+
+    # ==========================================
+    # FILTROS
+    # ==========================================
+    def filtro(self, dimension):
+        """Categorias permitidas en `dimension` (None = sin filtro)"""
+        permitidos = self._permitidos[dimension]
+        if permitidos is None:
+            return None
+        return list(self._dimensiones[dimension].categorias[permitidos])
+
+    def filtrar(self, dimension, valores=None):
+        """Deja pasar solo las categorias `valores` de `dimension` (None quita el filtro)"""
+        dim = self._dimensiones[dimension]
+        anterior = self._permitidos[dimension]
+        nuevo = None
+        if valores is not None:
+            nuevo = np.zeros(len(dim.categorias), dtype=bool)
+            nuevo[dim.codigos_de(valores)] = True
+
+        antes = np.ones(len(dim.categorias), dtype=bool) if anterior is None else anterior
+        despues = np.ones(len(dim.categorias), dtype=bool) if nuevo is None else nuevo
+        self._permitidos[dimension] = nuevo
+        cambiadas = np.flatnonzero(antes != despues)
+        if len(cambiadas) == 0:
+            return 0
+
+        # Solo las filas de las categorias que cambiaron cambian su bit de esta dimension
+        filas = dim.filas_de(cambiadas)
+        mascaras_antes = self._mascaras[filas]
+        mascaras_despues = mascaras_antes ^ dim.bit
+        for grupo in self._grupos.values():
+            veia, ve = grupo.ve(mascaras_antes), grupo.ve(mascaras_despues)
+            grupo.actualizar(filas[veia & ~ve], -1)
+            grupo.actualizar(filas[ve & ~veia], 1)
+        self._mascaras[filas] = mascaras_despues
+        incrementar("crossfilter:filas_actualizadas", len(filas))
+        return len(filas)
+
+    def limpiar(self):
+        for dimension in self._dimensiones:
+            self.filtrar(dimension, None)
+
+    # ==========================================
+    # FILAS QUE PASAN TODOS LOS FILTROS
+    # ==========================================
+    def filas(self):
+        """Posiciones de las filas que pasan todos los filtros"""
+        return np.flatnonzero(self._mascaras == 0)
+
+    def filtrado(self, columnas=None):
+        df = self.df if columnas is None else self.df[columnas]
+        return df.iloc[self.filas()]
+
+    def total(self, nombre):
+        """(filas, promedio) de un grupo sobre TODAS"""
+        reduccion = self.reduccion(nombre, incluir_vacios=True)
+        conteo = int(reduccion["conteo"].iloc[0])
+        promedio = reduccion["promedio"].iloc[0] if "promedio" in reduccion else np.nan
+        return conteo, None if pd.isna(promedio) else float(promedio)
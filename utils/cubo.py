@@ -0,0 +1,91 @@
+"""Cubo de resultados de partidos (results.csv de Kaggle) para consultas parametrizadas.
+
+El cubo cuenta partidos por pais sede x torneo x año x total de goles x resultado
+(local / empate / visita). Son a lo mucho unas decenas de miles de celdas no vacias, asi
+que cualquier combinacion de umbral de goles, rango de años y torneos se responde
+filtrando y sumando el cubo en milisegundos, sin volver a correr el notebook.
+
+`consultar_victorias` y `consultar_goles` devuelven las mismas columnas que los CSV
+precalculados (df_analisis_victoria.csv y df_conteo_goles.csv).
+"""
+import pandas as pd
+
+from utils.metricas import cronometrar
+
+DIMENSIONES = ["country", "tournament", "year", "total_goles", "resultado"]
+MEDIDA = "partidos"
+RESULTADOS = ("local", "empate", "visita")
+# El analisis original del notebook: partidos con mas de 4 goles
+MIN_GOLES_DEFAULT = 5
+
+
+def cubo_de_partidos(df_resultados):
+    """Cubo de un bloque de partidos (combinable con `combinar`)"""
+    local, visita = df_resultados["home_score"], df_resultados["away_score"]
+    partidos = pd.DataFrame({
+        "country": df_resultados["country"],
+        "tournament": df_resultados["tournament"],
+        "year": pd.to_datetime(df_resultados["date"], errors="coerce").dt.year,
+        "total_goles": local + visita,
+        "resultado": pd.Series(RESULTADOS[1], index=df_resultados.index).mask(local > visita, RESULTADOS[0]).mask(local < visita, RESULTADOS[2]),
+    }).dropna()
+    return partidos.groupby(DIMENSIONES, observed=True).size().rename(MEDIDA).reset_index()
+
+
+def combinar(cubos):
+    """Suma varios cubos parciales (p. ej. uno por bloque de results.csv)"""
+    cubo = pd.concat(cubos, ignore_index=True)
+    return cubo.groupby(DIMENSIONES, observed=True)[MEDIDA].sum().reset_index()
+
+
+def compactar(cubo):
+    """Tipos chicos para tenerlo en memoria: categorias para texto, enteros de 16/32 bits"""
+    cubo = cubo.copy()
+    for columna in ("country", "tournament", "resultado"):
+        cubo[columna] = cubo[columna].astype("category")
+    cubo["year"] = cubo["year"].astype("int16")
+    cubo["total_goles"] = cubo["total_goles"].astype("int16")
+    cubo[MEDIDA] = cubo[MEDIDA].astype("int32")
+    return cubo
+
+
+def _filtrar(cubo, min_goles, years=None, torneos=None):
+    mascara = cubo["total_goles"] >= min_goles
+    if years is not None:
+        mascara &= cubo["year"].between(*years)
+    if torneos:
+        mascara &= cubo["tournament"].isin(torneos)
+    return cubo[mascara]
+
+
+@cronometrar("cubo:victorias")
+def consultar_victorias(cubo, min_goles=MIN_GOLES_DEFAULT, years=None, torneos=None):
+    """country / Total_Partidos / Total_Victorias_Local / Porcentaje_Victoria_Local"""
+    filtrado = _filtrar(cubo, min_goles, years, torneos)
+    tabla = filtrado.pivot_table(
+        index="country", columns="resultado", values=MEDIDA, aggfunc="sum", fill_value=0, observed=True
+    )
+    tabla = tabla.reindex(columns=list(RESULTADOS), fill_value=0)
+    df = pd.DataFrame({
+        "country": tabla.index.astype(str),
+        "Total_Partidos": tabla.sum(axis=1).to_numpy(),
+        "Total_Victorias_Local": tabla["local"].to_numpy(),
+    })
+    df = df[df["Total_Partidos"] > 0]
+    df["Porcentaje_Victoria_Local"] = df["Total_Victorias_Local"] / df["Total_Partidos"] * 100
+    return df.sort_values("Total_Partidos", ascending=False, ignore_index=True)
+
+
+@cronometrar("cubo:goles")
+def consultar_goles(cubo, min_goles=MIN_GOLES_DEFAULT, years=None, torneos=None):
+    """total_goles / Total_Encuentros / total_goles_str"""
+    filtrado = _filtrar(cubo, min_goles, years, torneos)
+    df = filtrado.groupby("total_goles")[MEDIDA].sum().rename("Total_Encuentros").reset_index()
+    df = df[df["Total_Encuentros"] > 0].astype({"total_goles": "int64"})
+    df["total_goles_str"] = df["total_goles"].astype(str) + " goles"
+    return df.reset_index(drop=True)
+
+
+def torneos(cubo):
+    """Torneos ordenados por numero de partidos"""
+    return cubo.groupby("tournament", observed=True)[MEDIDA].sum().sort_values(ascending=False).index.astype(str).tolist()
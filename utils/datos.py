@@ -0,0 +1,107 @@
+"""Almacenamiento, cliente S3 y cache de datasets compartidos por todos los dashboards del proceso."""
+import functools
+import os
+
+import streamlit as st
+
+from utils import almacen_arrow, compresion
+from utils.resultados import entregar, marcar_version
+from utils.almacenamiento import backend_configurado, crear_almacenamiento
+from utils.importaciones import importar_diferido
+from utils.inmutable import congelar
+from utils.refresco import Refrescador
+
+boto3 = importar_diferido("boto3")
+botocore_config = importar_diferido("botocore.config")
+
+# Conexiones simultaneas del pool de S3 (compartido por todas las paginas)
+MAX_CONEXIONES_S3 = int(os.getenv("S3_MAX_CONEXIONES", "32"))
+# Segundos entre refrescos en segundo plano de cada dataset (si no se indica otro)
+INTERVALO_REFRESCO = int(os.getenv("REFRESCO_INTERVALO", "600"))
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_cliente_s3():
+    """Un solo cliente S3 (y un solo pool de conexiones) por proceso"""
+    opciones = {
+        "region_name": os.getenv("AWS_DEFAULT_REGION", "us-west-1"),
+        "config": botocore_config.Config(max_pool_connections=MAX_CONEXIONES_S3),
+    }
+    # Si no hay llaves en el entorno, boto3 usa su cadena normal (perfil, rol de la instancia...)
+    if os.getenv("AWS_ACCESS_KEY_ID") and os.getenv("AWS_SECRET_ACCESS_KEY"):
+        opciones["aws_access_key_id"] = os.getenv("AWS_ACCESS_KEY_ID")
+        opciones["aws_secret_access_key"] = os.getenv("AWS_SECRET_ACCESS_KEY")
+    return boto3.client("s3", **opciones)
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_almacenamiento(bucket):
+    """Almacenamiento de `bucket` con el backend configurado (S3, local o memoria)"""
+    cliente = obtener_cliente_s3() if backend_configurado() == "s3" else None
+    return crear_almacenamiento(bucket, cliente=cliente)
+
+
+def cargar_csv_mapeado(almacenamiento, key, transformar=None):
+    """CSV persistido como Arrow en disco local; todas las sesiones comparten el mismo mmap.
+
+    `transformar(df)` agrega columnas derivadas antes de persistir, asi tambien se comparten.
+    """
+    key_real, formato, meta = compresion.resolver(almacenamiento, key)
+    version = almacen_arrow.version_de(
+        meta.get("ETag"), meta["Size"], meta["LastModified"], getattr(transformar, "__name__", "")
+    )
+
+    def construir():
+        df = compresion.leer_variante(almacenamiento, key_real, formato, meta["Size"], meta.get("ETag"))
+        return transformar(df) if transformar else df
+
+    return almacen_arrow.obtener_o_construir(f"{almacenamiento.bucket}/{key}", version, construir)
+
+
+# ==========================================
+# REFRESCO EN SEGUNDO PLANO
+# ==========================================
+@st.cache_resource(show_spinner=False)
+def obtener_refrescador():
+    """Un refrescador por proceso: todas las sesiones leen los mismos datasets"""
+    return Refrescador()
+
+
+def _recargar_csv(almacenamiento, key, transformar, version_actual):
+    """Un HEAD para ver si el objeto cambio; solo se descarga y parsea si hay version nueva.
+
+    Se usa la variante comprimida preferida que exista (ver utils/compresion.py). El
+    DataFrame nuevo lleva ya sus columnas derivadas, se congela (solo lectura) y queda
+    marcado con su version para la cache de resultados (utils/resultados.py).
+    """
+    key_real, formato, meta = compresion.resolver(almacenamiento, key)
+    version = almacen_arrow.version_de(meta.get("ETag"), meta["Size"], meta["LastModified"])
+    if version == version_actual:
+        return version, None
+    if almacen_arrow.activo():
+        df = cargar_csv_mapeado(almacenamiento, key, transformar)
+    else:
+        df = compresion.leer_variante(almacenamiento, key_real, formato, meta["Size"], meta.get("ETag"))
+        df = transformar(df) if transformar else df
+    return version, marcar_version(congelar(df), f"{almacenamiento.bucket}/{key}:{version}")
+
+
+def cargar_varios_csv_refrescados(bucket, keys, intervalos=None, derivados=None):
+    """Datasets de `bucket` servidos desde memoria y recargados en segundo plano.
+
+    `intervalos` es un dict {prefijo o key: segundos}; gana el prefijo mas largo que coincida.
+    `derivados` es un dict {key: funcion(df) -> df} con las columnas que se calculan una
+    sola vez por version. Devuelve (datasets, errores) indexados por key; cada DataFrame
+    es una manija del dataset compartido (ver utils/inmutable.py).
+    """
+    refrescador = obtener_refrescador()
+    almacenamiento = obtener_almacenamiento(bucket)
+    intervalos = intervalos or {}
+    derivados = derivados or {}
+    for key in keys:
+        coincidencias = [p for p in intervalos if key.startswith(p)]
+        intervalo = intervalos[max(coincidencias, key=len)] if coincidencias else INTERVALO_REFRESCO
+        refrescador.registrar(f"{bucket}/{key}", functools.partial(_recargar_csv, almacenamiento, key, derivados.get(key)), intervalo)
+    valores, errores = refrescador.obtener_varios([f"{bucket}/{key}" for key in keys])
+    prefijo = len(bucket) + 1
+    return {n[prefijo:]: entregar(v) for n, v in valores.items()}, {n[prefijo:]: e for n, e in errores.items()}
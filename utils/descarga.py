@@ -0,0 +1,132 @@
+"""Descarga de objetos grandes por rangos de bytes en paralelo.
+
+Un solo `get_object` queda limitado por el throughput de una conexion TCP. Arriba de
+`UMBRAL` bytes el objeto se parte en rangos de `TAMANO_PARTE` que se piden a la vez
+(`Range: bytes=...`) y cada parte se escribe directo en su lugar de un buffer
+preasignado: un mmap anonimo (memoria) o un mmap de un archivo temporal (`en_disco`,
+para la Lambda, donde /tmp es mas grande que la memoria). Una parte que falla se
+reintenta sola, sin volver a bajar las demas.
+
+Todas las partes se piden condicionadas al ETag del objeto (`If-Match`): las Lambdas y
+los notebooks reescriben las mismas keys, y sin la condicion una descarga que cruza una
+reescritura mezclaria bytes de dos versiones (o cortaria la nueva al tamaño viejo). Si
+el objeto cambia a media descarga se descarta el buffer y se vuelve a empezar con el
+tamaño y ETag nuevos (hasta `REINICIOS` veces).
+
+Por debajo del umbral, o en backends que no son remotos, se usa el camino de siempre
+(`Almacenamiento.abrir`: stream de S3 o mmap local).
+
+    DESCARGA_UMBRAL_MB = 16   tamaño a partir del cual se descarga por rangos
+    DESCARGA_PARTE_MB  = 8    tamaño de cada rango
+    DESCARGA_HILOS     = 8    rangos simultaneos por objeto
+"""
+import mmap
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.almacenamiento import VersionCambiada
+from utils.metricas import incrementar, medir
+
+MB = 1024 * 1024
+UMBRAL = int(float(os.getenv("DESCARGA_UMBRAL_MB", "16")) * MB)
+TAMANO_PARTE = int(float(os.getenv("DESCARGA_PARTE_MB", "8")) * MB)
+MAX_HILOS = int(os.getenv("DESCARGA_HILOS", "8"))
+REINTENTOS = 3
+ESPERA_REINTENTO = 0.2
+# Descargas completas que se vuelven a empezar porque el objeto cambio a la mitad
+REINICIOS = 3
+
+
+def partes(tamano, tamano_parte=TAMANO_PARTE):
+    """Rangos [inicio, fin) que cubren un objeto de `tamano` bytes"""
+    return [(inicio, min(inicio + tamano_parte, tamano)) for inicio in range(0, tamano, tamano_parte)]
+
+
+def _buffer(tamano, en_disco):
+    if not en_disco:
+        return mmap.mmap(-1, tamano)
+    # El archivo se borra al cerrarlo; el mmap conserva las paginas mientras viva
+    with tempfile.TemporaryFile() as archivo:
+        archivo.truncate(tamano)
+        return mmap.mmap(archivo.fileno(), tamano)
+
+
+def _descargar_parte(almacenamiento, key, inicio, fin, buffer, etag):
+    for intento in range(REINTENTOS):
+        try:
+            datos = almacenamiento.get_rango(key, inicio, fin, etag)
+            if len(datos) != fin - inicio:
+                raise IOError(f"{key}: rango {inicio}-{fin} incompleto ({len(datos)} bytes)")
+            buffer[inicio:fin] = datos
+            return
+        except VersionCambiada:
+            # Reintentar la parte no sirve: las demas son de otra version
+            raise
+        except Exception:
+            if intento == REINTENTOS - 1:
+                raise
+            incrementar("descarga:reintento")
+            time.sleep(ESPERA_REINTENTO * 2 ** intento)
+
+
+def _descargar_version(almacenamiento, key, tamano, etag, tamano_parte, max_hilos, en_disco):
+    buffer = _buffer(tamano, en_disco)
+    try:
+        with ThreadPoolExecutor(max_workers=max_hilos) as ejecutor:
+            futuros = [
+                ejecutor.submit(_descargar_parte, almacenamiento, key, inicio, fin, buffer, etag)
+                for inicio, fin in partes(tamano, tamano_parte)
+            ]
+            try:
+                for futuro in futuros:
+                    futuro.result()
+            except BaseException:
+                # Si una parte se queda sin reintentos, las que no han empezado ya no se piden
+                for futuro in futuros:
+                    futuro.cancel()
+                raise
+    except BaseException:
+        buffer.close()
+        raise
+    return buffer
+
+
+def descargar(almacenamiento, key, tamano, tamano_parte=TAMANO_PARTE, max_hilos=MAX_HILOS, en_disco=False, etag=None):
+    """Descarga `key` completo por rangos en paralelo; devuelve un mmap posicionado al inicio.
+
+    `tamano` y `etag` son los del HEAD (o de compresion.resolver); sin `etag` se hace el HEAD
+    aqui, para que todas las partes sean de la misma version.
+    """
+    if etag is None:
+        meta = almacenamiento.head(key)
+        tamano, etag = meta["Size"], meta.get("ETag")
+    with medir("descarga:rangos"):
+        for reinicio in range(REINICIOS + 1):
+            try:
+                buffer = _descargar_version(almacenamiento, key, tamano, etag, tamano_parte, max_hilos, en_disco)
+                break
+            except VersionCambiada:
+                if reinicio == REINICIOS:
+                    raise
+                incrementar("descarga:reinicio")
+                meta = almacenamiento.head(key)
+                tamano, etag = meta["Size"], meta.get("ETag")
+    incrementar("descarga:paralela")
+    return buffer
+
+
+def abrir(almacenamiento, key, tamano=None, umbral=UMBRAL, en_disco=False, etag=None):
+    """Objeto tipo archivo para leer `key`: por rangos en paralelo si es remoto y grande.
+
+    `tamano` y `etag` evitan el HEAD cuando ya se conocen (p. ej. de compresion.resolver).
+    """
+    if not almacenamiento.remoto:
+        return almacenamiento.abrir(key)
+    if tamano is None or etag is None:
+        meta = almacenamiento.head(key)
+        tamano, etag = meta["Size"], meta.get("ETag")
+    if tamano < umbral:
+        return almacenamiento.abrir(key)
+    return descargar(almacenamiento, key, tamano, en_disco=en_disco, etag=etag)
@@ -0,0 +1,119 @@
+"""Graficas para datos grandes: WebGL arriba de un umbral de filas y decimacion en el servidor.
+
+Con pocas filas se usan las trazas SVG de siempre. Arriba de `UMBRAL_WEBGL` las
+dispersiones y series de tiempo se dibujan con WebGL (`Scattergl`) y, si aun asi hay
+demasiados puntos, se reducen antes de mandarlos al navegador:
+
+    - series de tiempo: LTTB (Largest-Triangle-Three-Buckets), conserva picos y valles
+    - dispersiones: muestra aleatoria con semilla fija (la forma de la nube se mantiene)
+
+El mismo API se usa en todos los dashboards (`dispersion`, `serie_temporal`).
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.importaciones import importar_diferido
+from utils.metricas import cronometrar
+
+px = importar_diferido("plotly.express")
+go = importar_diferido("plotly.graph_objects")
+
+UMBRAL_WEBGL = int(os.getenv("GRAFICAS_UMBRAL_WEBGL", "5000"))
+MAX_PUNTOS_DISPERSION = int(os.getenv("GRAFICAS_MAX_PUNTOS", "200000"))
+
+
+def usar_webgl(filas):
+    return filas > UMBRAL_WEBGL
+
+
+def modo_render(filas):
+    """`render_mode` para px.scatter / px.line segun el numero de filas"""
+    return "webgl" if usar_webgl(filas) else "svg"
+
+
+@cronometrar("decimacion:lttb")
+def lttb(x, y, n_salida):
+    """Indices de los `n_salida` puntos que elige Largest-Triangle-Three-Buckets.
+
+    `x` debe venir ordenado. Siempre conserva el primer y el ultimo punto; de cada
+    bucket intermedio elige el punto que forma el triangulo mas grande con el punto
+    elegido antes y el promedio del bucket siguiente.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    n = len(x)
+    if n_salida >= n or n_salida < 3:
+        return np.arange(n)
+
+    indices = np.empty(n_salida, dtype="int64")
+    indices[0], indices[-1] = 0, n - 1
+    # Limites de los n_salida - 2 buckets intermedios (sin el primer ni el ultimo punto)
+    limites = np.linspace(1, n - 1, n_salida - 1).astype("int64")
+    anterior = 0
+    for i in range(n_salida - 2):
+        inicio, fin = limites[i], limites[i + 1]
+        siguiente_inicio, siguiente_fin = fin, limites[i + 2] if i + 2 < len(limites) else n
+        promedio_x = x[siguiente_inicio:siguiente_fin].mean()
+        promedio_y = y[siguiente_inicio:siguiente_fin].mean()
+        areas = np.abs(
+            (x[anterior] - promedio_x) * (y[inicio:fin] - y[anterior])
+            - (x[anterior] - x[inicio:fin]) * (promedio_y - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(areas))
+        indices[i + 1] = anterior
+    return indices
+
+
+def _como_numero(serie):
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie.astype("int64").to_numpy()
+    return serie.to_numpy()
+
+
+def decimar(df, x, y, max_puntos):
+    """Reduce `df` (ordenado por `x`) a `max_puntos` filas con LTTB sobre la columna `y`"""
+    if len(df) <= max_puntos:
+        return df
+    df = df.dropna(subset=[x, y]).sort_values(x)
+    return df.iloc[lttb(_como_numero(df[x]), df[y].to_numpy(), max_puntos)]
+
+
+@cronometrar("figura:dispersion")
+def dispersion(df, x, y, color=None, regresion=False, max_puntos=MAX_PUNTOS_DISPERSION, **kwargs):
+    """px.scatter con WebGL cuando hay muchas filas y muestra aleatoria arriba de `max_puntos`"""
+    filas = len(df)
+    datos = df.sample(max_puntos, random_state=42) if filas > max_puntos else df
+    fig = px.scatter(datos, x=x, y=y, color=color, render_mode=modo_render(filas), **kwargs)
+    if regresion and len(df) > 1:
+        # La recta se ajusta con todas las filas, no solo con la muestra
+        pendiente, ordenada = np.polyfit(df[x].astype(float), df[y].astype(float), 1)
+        xs = np.array([df[x].min(), df[x].max()], dtype=float)
+        fig.add_trace(go.Scatter(x=xs, y=pendiente * xs + ordenada, mode="lines", name="Regresión"))
+    if filas > len(datos):
+        fig.add_annotation(
+            text=f"Muestra de {len(datos):,} de {filas:,} puntos", xref="paper", yref="paper",
+            x=1, y=1.08, showarrow=False, font_size=11,
+        )
+    return fig
+
+
+@cronometrar("figura:serie_temporal")
+def serie_temporal(df, x, y, color=None, max_puntos=2000, **kwargs):
+    """Linea(s) de tiempo; arriba del umbral usa Scattergl y decima cada serie con LTTB"""
+    filas = len(df)
+    if color is None:
+        datos = decimar(df, x, y, max_puntos)
+    else:
+        datos = pd.concat(
+            [decimar(grupo, x, y, max_puntos) for _, grupo in df.groupby(color, observed=True)],
+            ignore_index=True,
+        ) if filas else df
+    fig = px.line(datos.sort_values(x), x=x, y=y, color=color, render_mode=modo_render(filas), **kwargs)
+    if len(datos) < filas:
+        fig.add_annotation(
+            text=f"{len(datos):,} de {filas:,} puntos (LTTB)", xref="paper", yref="paper",
+            x=1, y=1.08, showarrow=False, font_size=11,
+        )
+    return fig
@@ -0,0 +1,112 @@
+"""Importaciones diferidas y calentamiento de modulos pesados."""
+import importlib
+import sys
+import threading
+import time
+
+# Modulos que mas tardan en importarse en los dashboards
+MODULOS_PESADOS = (
+    "pandas",
+    "plotly.express",
+    "plotly.graph_objects",
+    "boto3",
+    "matplotlib.pyplot",
+    "seaborn",
+)
+
+
+class ModuloDiferido:
+    """Proxy que importa el modulo real la primera vez que se usa uno de sus atributos."""
+
+    def __init__(self, nombre):
+        self._nombre = nombre
+        self._modulo = None
+        self._lock = threading.Lock()
+
+    def _cargar(self):
+        if self._modulo is None:
+            with self._lock:
+                if self._modulo is None:
+                    self._modulo = importlib.import_module(self._nombre)
+        return self._modulo
+
+    def __getattr__(self, atributo):
+        return getattr(self._cargar(), atributo)
+
+    def __repr__(self):
+        estado = "cargado" if self._modulo is not None else "pendiente"
+        return f"<ModuloDiferido {self._nombre} ({estado})>"
+
+
+def importar_diferido(nombre):
+    """Devuelve el modulo si ya esta importado o un proxy que lo importa al primer uso."""
+    if nombre in sys.modules:
+        return sys.modules[nombre]
+    return ModuloDiferido(nombre)
+
+
+# ==========================================
+# CALENTAMIENTO
+# ==========================================
+def _calentar_graficas():
+    """Construye y serializa una figura pequeña para pagar el costo de la primera grafica."""
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    fig = px.bar(x=["a", "b"], y=[1, 2], color=[1, 2], text=[1, 2])
+    fig.update_traces(texttemplate="%{text}", textposition="outside")
+    fig.to_json()
+    go.Figure(data=[go.Pie(labels=["a", "b"], values=[1, 2], hole=0.3)]).to_json()
+    go.Figure(go.Scatter(x=[1, 2], y=[1, 2], mode="lines+markers")).to_json()
+
+
+def _calentar_boto3():
+    """Carga el modelo de servicio de S3 (el JSON de botocore es lo mas lento)."""
+    import boto3
+
+    boto3.session.Session().client("s3", region_name="us-west-1")
+
+
+def calentar(modulos=MODULOS_PESADOS, graficas=True):
+    """Importa los modulos pesados y devuelve el tiempo (ms) que tomo cada paso."""
+    tiempos = {}
+    for nombre in modulos:
+        if nombre == "matplotlib.pyplot":
+            # Sin pantalla en el contenedor: backend sin interfaz antes de importar pyplot
+            try:
+                import matplotlib
+                matplotlib.use("Agg")
+            except ImportError:
+                continue
+        inicio = time.perf_counter()
+        try:
+            importlib.import_module(nombre)
+        except ImportError:
+            continue
+        tiempos[nombre] = (time.perf_counter() - inicio) * 1000
+
+    pasos = [("boto3:cliente_s3", _calentar_boto3)]
+    if graficas:
+        pasos.append(("plotly:primera_grafica", _calentar_graficas))
+    for nombre, paso in pasos:
+        inicio = time.perf_counter()
+        try:
+            paso()
+        except Exception:
+            continue
+        tiempos[nombre] = (time.perf_counter() - inicio) * 1000
+    return tiempos
+
+
+_hilo_calentamiento = None
+
+
+def calentar_en_segundo_plano(modulos=MODULOS_PESADOS):
+    """Lanza el calentamiento en un hilo daemon (solo una vez por proceso)."""
+    global _hilo_calentamiento
+    if _hilo_calentamiento is None:
+        _hilo_calentamiento = threading.Thread(
+            target=calentar, args=(modulos,), name="calentamiento", daemon=True
+        )
+        _hilo_calentamiento.start()
+    return _hilo_calentamiento
@@ -0,0 +1,55 @@
+"""DataFrames compartidos de solo lectura.
+
+Los datasets que sirve el refrescador (utils/refresco.py) y los resultados de
+utils/resultados.py son un solo objeto para todas las sesiones: no se copian ni se
+deserializan en cada rerun. Las sesiones nunca reciben ese objeto, sino una manija
+(`manija(df)`): una copia superficial que comparte los datos con el original. Con
+copy-on-write, el default de pandas 3, cualquier cambio en la manija (`df['n'] = ...`,
+`df.loc[...] = ...`, `df.iloc`, `df.at`, tambien en columnas de texto o Arrow) copia
+solo lo que modifica y nunca llega al DataFrame compartido ni a las demas sesiones.
+Crear una manija no copia datos.
+
+Ademas, `congelar(df)` marca los arreglos de numpy del DataFrame compartido como no
+escribibles, para que una escritura directa sobre el original (sin manija) falle en
+lugar de cambiar los datos de todos. Solo cubre columnas numericas y booleanas; por eso
+lo que se entrega a las sesiones es siempre una manija.
+
+Las columnas derivadas se calculan una sola vez al cargar (ver `derivados` en
+utils/datos.py), no en cada rerun.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _arreglos(df):
+    # to_numpy devuelve una vista de cada columna; congelar la vista no protege los datos,
+    # asi que se sube por `.base` hasta el arreglo que es dueño de la memoria
+    for posicion in range(df.shape[1]):
+        columna = df.iloc[:, posicion]
+        if not isinstance(columna.dtype, np.dtype) or columna.dtype.kind in "mM":
+            # Extension arrays (str, Arrow, categoricas...) y fechas: pandas no las escribe
+            # sobre un arreglo de numpy propio (asignarles falla dentro de pandas)
+            continue
+        arreglo = columna.to_numpy(copy=False)
+        while isinstance(arreglo.base, np.ndarray):
+            arreglo = arreglo.base
+        yield arreglo
+
+
+def congelar(df):
+    """Marca los arreglos de numpy de `df` como solo lectura y lo devuelve.
+
+    Escribir valores numericos sobre `df` mismo (`df.loc[0, 'a'] = 9`) lanza ValueError.
+    No impide agregar o reemplazar columnas ni escribir columnas de texto: eso lo evita
+    entregar manijas (`manija`) en lugar del DataFrame compartido.
+    """
+    for arreglo in _arreglos(df):
+        arreglo.flags.writeable = False
+    return df
+
+
+def manija(valor):
+    """Copia superficial de un DataFrame compartido (sin copiar datos); otros valores tal cual"""
+    if isinstance(valor, pd.DataFrame):
+        return valor.copy(deep=False)
+    return valor
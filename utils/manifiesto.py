@@ -0,0 +1,174 @@
+"""Manifiestos versionados: la ultima version de un dataset se resuelve con un solo GET.
+
+Cada vez que un productor publica datos escribe un manifiesto inmutable y despues
+reemplaza el apuntador `actual.json` (un PUT de S3 es atomico, asi que los lectores
+ven la version anterior completa o la nueva completa, nunca una mezcla). El apuntador
+se reemplaza con un PUT condicional al ETag que se leyo (If-Match): si otro productor lo
+movio en medio, se vuelve a leer, y nunca se regresa a una version anterior:
+
+    <prefix>_manifiesto/v000001.json
+    <prefix>_manifiesto/v000002.json
+    <prefix>_manifiesto/actual.json      <- copia del ultimo manifiesto
+
+Un manifiesto guarda la key principal, el esquema, el numero de filas, el checksum y la
+fecha de creacion, mas cualquier campo extra del productor (p. ej. snapshot y deltas).
+Las versiones viejas se conservan para poder consultarlas ("time travel"): cada
+`vNNNNNN.json` se escribe con un PUT condicional, asi dos productores simultaneos nunca
+se pisan una version; el que pierde reintenta con el siguiente numero.
+
+Uso desde la linea de comandos, para registrar un archivo que ya existe (solo tiene
+sentido si su productor tambien publica un manifiesto cada vez que escribe):
+    python -m utils.manifiesto --bucket xideralaws-curso-yalbani --prefix db_export/agregados/ --key <key>
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import random
+import time
+
+from utils.almacenamiento import ObjetoExistente, ObjetoNoEncontrado, VersionCambiada, crear_almacenamiento
+
+CARPETA = "_manifiesto/"
+# Versiones que se intentan si otros productores publican al mismo tiempo
+MAX_INTENTOS = 20
+# Espera maxima (s) antes de reintentar un PUT condicional del apuntador que perdio
+ESPERA_CONFLICTO = 0.05
+
+
+def _carpeta(prefix):
+    return f"{prefix}{CARPETA}"
+
+
+def _key_version(prefix, version):
+    return f"{_carpeta(prefix)}v{version:06d}.json"
+
+
+def key_actual(prefix):
+    return f"{_carpeta(prefix)}actual.json"
+
+
+def checksum(datos):
+    if isinstance(datos, str):
+        datos = datos.encode("utf-8")
+    return "sha256:" + hashlib.sha256(datos).hexdigest()
+
+
+def esquema_de(df):
+    """{columna: dtype} de un DataFrame"""
+    return {str(columna): str(tipo) for columna, tipo in df.dtypes.items()}
+
+
+def actual(almacenamiento, prefix):
+    """Ultimo manifiesto publicado bajo `prefix` (un solo GET), o None si no hay"""
+    try:
+        return json.loads(almacenamiento.get(key_actual(prefix)))
+    except ObjetoNoEncontrado:
+        return None
+
+
+def version(almacenamiento, prefix, numero):
+    """Manifiesto de una version especifica"""
+    return json.loads(almacenamiento.get(_key_version(prefix, numero)))
+
+
+def versiones(almacenamiento, prefix):
+    """Numeros de version disponibles, de la mas nueva a la mas vieja (lista la carpeta de manifiestos)"""
+    numeros = []
+    for obj in almacenamiento.listar(_carpeta(prefix)):
+        nombre = obj["Key"].rsplit("/", 1)[-1]
+        if nombre.startswith("v") and nombre.endswith(".json"):
+            numeros.append(int(nombre[1:-5]))
+    return sorted(numeros, reverse=True)
+
+
+def en_fecha(almacenamiento, prefix, momento):
+    """Manifiesto vigente en `momento` (datetime con zona horaria), o None si aun no existia"""
+    for numero in versiones(almacenamiento, prefix):
+        manifiesto = version(almacenamiento, prefix, numero)
+        if datetime.datetime.fromisoformat(manifiesto["creado"]) <= momento:
+            return manifiesto
+    return None
+
+
+def publicar(almacenamiento, prefix, key=None, datos=None, filas=None, esquema=None, **extra):
+    """Escribe un manifiesto nuevo y mueve el apuntador; devuelve el manifiesto.
+
+    `datos` (bytes) se usa para el checksum; si no se pasa y hay `key`, se toma el ETag.
+    """
+    if datos is not None:
+        suma = checksum(datos)
+    elif key is not None:
+        suma = f"etag:{almacenamiento.head(key).get('ETag', '').strip(chr(34))}"
+    else:
+        suma = None
+    anterior = actual(almacenamiento, prefix)
+    numero = anterior["version"] + 1 if anterior else 1
+    for _ in range(MAX_INTENTOS):
+        manifiesto = {
+            "version": numero,
+            "key": key,
+            "esquema": esquema,
+            "filas": filas,
+            "checksum": suma,
+            "creado": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            **extra,
+        }
+        contenido = json.dumps(manifiesto, ensure_ascii=False, indent=2, default=str)
+        # Primero la version inmutable (solo si nadie mas tomo ese numero) y despues el apuntador
+        try:
+            almacenamiento.put_si_no_existe(_key_version(prefix, numero), contenido)
+            break
+        except ObjetoExistente:
+            numero += 1
+    else:
+        raise RuntimeError(f"No se pudo publicar el manifiesto de {prefix}: {MAX_INTENTOS} versiones ocupadas")
+    _mover_apuntador(almacenamiento, prefix, numero, contenido)
+    return manifiesto
+
+
+def _mover_apuntador(almacenamiento, prefix, numero, contenido):
+    """Apunta `actual.json` a la version `numero`, salvo que ya apunte a una mas nueva"""
+    key = key_actual(prefix)
+    for intento in range(MAX_INTENTOS):
+        if intento:
+            time.sleep(random.uniform(0, ESPERA_CONFLICTO * min(intento, 5)))
+        # El HEAD va antes del GET: si el apuntador cambia entre los dos, el PUT condicional falla
+        try:
+            etag = almacenamiento.head(key).get("ETag")
+            vigente = json.loads(almacenamiento.get(key))
+        except ObjetoNoEncontrado:
+            etag, vigente = None, None
+        if vigente is not None and vigente["version"] >= numero:
+            # Un productor mas lento no regresa el apuntador a una version anterior
+            return
+        try:
+            almacenamiento.put_si_coincide(key, contenido, etag)
+            return
+        except (VersionCambiada, ObjetoExistente):
+            continue
+    raise RuntimeError(f"No se pudo mover el apuntador de {prefix}: {MAX_INTENTOS} intentos en conflicto")
+
+
+def verificar(datos, manifiesto):
+    """True si `datos` coincide con el checksum sha256 del manifiesto (los ETag no se verifican aqui)"""
+    suma = manifiesto.get("checksum") or ""
+    return not suma.startswith("sha256:") or checksum(datos) == suma
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publica un manifiesto para un archivo existente")
+    parser.add_argument("--bucket", required=True)
+    parser.add_argument("--prefix", required=True)
+    parser.add_argument("--key", required=True)
+    parser.add_argument("--backend", choices=["s3", "local", "memoria"], default=None)
+    args = parser.parse_args()
+
+    almacenamiento = crear_almacenamiento(args.bucket, backend=args.backend)
+    datos = almacenamiento.get(args.key)
+    manifiesto = publicar(almacenamiento, args.prefix, key=args.key, datos=datos)
+    print(f"Version {manifiesto['version']} de {args.prefix} -> {args.key}")
+
+
+if __name__ == "__main__":
+    main()
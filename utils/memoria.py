@@ -0,0 +1,193 @@
+"""Presupuesto de memoria del proceso para todo lo que se guarda en cache.
+
+Cada cache acota lo suyo (RESULTADOS_CACHE_MB, los indices por DataFrame...), pero la
+suma no tenia limite y el contenedor se quedaba sin memoria con carga. Aqui cada cache
+reporta lo que guarda y un solo presupuesto (MEMORIA_PRESUPUESTO_MB) decide que sale:
+
+    memoria.registrar("resultados", clave, tamano, costo_ms, liberar=functools.partial(cache.liberar, clave))
+    memoria.usar("resultados", clave)      # en cada acierto
+    memoria.quitar("resultados", clave)    # si la cache lo saco por su cuenta
+
+- Tamaño: `tamano_profundo` mide DataFrames (memory_usage deep), arreglos de numpy,
+  figuras de Plotly y contenedores anidados.
+- Desalojo: cuando el total pasa del presupuesto sale primero la entrada con mayor
+  tamaño × antiguedad / costo de recalculo. Una tabla grande, barata de recalcular y
+  sin usar hace rato sale antes que un agregado chico que costo segundos.
+- Entradas fijas (`liberar=None`, p. ej. los datasets del refrescador): cuentan para el
+  presupuesto pero no se desalojan; dejan menos lugar a lo demas.
+
+Las funciones `liberar` se llaman sin el lock de la contabilidad, pero quien llama a
+`registrar` no debe tener tomado un lock que esas funciones necesiten.
+
+Metricas (utils/metricas.py): contadores memoria:desalojo, memoria:desalojo:<dueño>,
+memoria:bytes_desalojados y memoria:rechazo; indicadores memoria:bytes,
+memoria:presupuesto_bytes y memoria:presion (bytes / presupuesto).
+"""
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.metricas import fijar, incrementar
+
+PRESUPUESTO_BYTES = int(float(os.getenv("MEMORIA_PRESUPUESTO_MB", "1024")) * 1024 * 1024)
+
+
+# ==========================================
+# TAMAÑO
+# ==========================================
+def tamano_profundo(valor, _vistos=None):
+    """Bytes que ocupa `valor` incluyendo lo que referencia (cada objeto se cuenta una vez)"""
+    vistos = set() if _vistos is None else _vistos
+    if id(valor) in vistos:
+        return 0
+    vistos.add(id(valor))
+
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(index=True, deep=True).sum())
+    if isinstance(valor, (pd.Series, pd.Index)):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, np.ndarray):
+        if valor.dtype == object:
+            return valor.nbytes + sum(tamano_profundo(v, vistos) for v in valor.ravel())
+        # Una vista no es dueña de sus datos
+        return valor.nbytes if valor.base is None else sys.getsizeof(valor)
+    if hasattr(valor, "to_plotly_json"):
+        # Figuras de Plotly: los arreglos de las trazas son la mayor parte
+        return sys.getsizeof(valor) + tamano_profundo(valor.to_plotly_json(), vistos)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(
+            tamano_profundo(k, vistos) + tamano_profundo(v, vistos) for k, v in valor.items()
+        )
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        return sys.getsizeof(valor) + sum(tamano_profundo(v, vistos) for v in valor)
+    if hasattr(valor, "__dict__") and not isinstance(valor, type):
+        return sys.getsizeof(valor) + tamano_profundo(vars(valor), vistos)
+    return sys.getsizeof(valor)
+
+
+# ==========================================
+# CONTABILIDAD
+# ==========================================
+class _Entrada:
+    __slots__ = ("tamano", "costo_ms", "ultimo_uso", "liberar")
+
+    def __init__(self, tamano, costo_ms, liberar):
+        self.tamano = tamano
+        self.costo_ms = costo_ms
+        self.ultimo_uso = time.monotonic()
+        self.liberar = liberar
+
+    def puntaje(self, ahora):
+        """Mas alto = mejor candidato a desalojar"""
+        return self.tamano * (ahora - self.ultimo_uso + 1.0) / (self.costo_ms + 1.0)
+
+
+class Contabilidad:
+    """Bytes en cache por (dueño, clave) y desalojo por costo cuando se pasa del presupuesto"""
+
+    def __init__(self, presupuesto=PRESUPUESTO_BYTES):
+        self.presupuesto = presupuesto
+        self.bytes = 0
+        self._entradas = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, dueno, clave, tamano, costo_ms=0.0, liberar=None):
+        """Cuenta una entrada nueva (o la reemplaza) y desaloja lo necesario.
+
+        Devuelve False si la entrada sola no cabe en el presupuesto; en ese caso ya se
+        llamo a su `liberar`.
+        """
+        entrada = _Entrada(tamano, costo_ms, liberar)
+        with self._lock:
+            anterior = self._entradas.pop((dueno, clave), None)
+            if anterior is not None:
+                self.bytes -= anterior.tamano
+            fijos = sum(e.tamano for e in self._entradas.values() if e.liberar is None)
+            cabe = liberar is None or tamano <= self.presupuesto - fijos
+            if cabe:
+                self._entradas[(dueno, clave)] = entrada
+                self.bytes += tamano
+            victimas = self._elegir_victimas()
+        if not cabe:
+            incrementar("memoria:rechazo")
+            liberar()
+        self._desalojar(victimas)
+        return cabe
+
+    def usar(self, dueno, clave):
+        entrada = self._entradas.get((dueno, clave))
+        if entrada is not None:
+            entrada.ultimo_uso = time.monotonic()
+
+    def quitar(self, dueno, clave):
+        """La cache dueña ya saco la entrada por su cuenta"""
+        with self._lock:
+            entrada = self._entradas.pop((dueno, clave), None)
+            if entrada is not None:
+                self.bytes -= entrada.tamano
+        self._publicar()
+
+    def _elegir_victimas(self):
+        victimas = []
+        if self.bytes <= self.presupuesto:
+            return victimas
+        ahora = time.monotonic()
+        candidatas = sorted(
+            ((llave, e) for llave, e in self._entradas.items() if e.liberar is not None),
+            key=lambda par: par[1].puntaje(ahora), reverse=True,
+        )
+        for llave, entrada in candidatas:
+            if self.bytes <= self.presupuesto:
+                break
+            del self._entradas[llave]
+            self.bytes -= entrada.tamano
+            victimas.append((llave[0], entrada))
+        return victimas
+
+    def _desalojar(self, victimas):
+        for dueno, entrada in victimas:
+            entrada.liberar()
+            incrementar("memoria:desalojo")
+            incrementar(f"memoria:desalojo:{dueno}")
+            incrementar("memoria:bytes_desalojados", entrada.tamano)
+        self._publicar()
+
+    def _publicar(self):
+        fijar("memoria:bytes", self.bytes)
+        fijar("memoria:presupuesto_bytes", self.presupuesto)
+        fijar("memoria:presion", self.bytes / self.presupuesto if self.presupuesto else 0.0)
+
+    def estado(self):
+        """Entradas y bytes por dueño, y el total contra el presupuesto"""
+        with self._lock:
+            por_dueno = {}
+            for (dueno, _), entrada in self._entradas.items():
+                fila = por_dueno.setdefault(str(dueno), {"entradas": 0, "bytes": 0, "fijos": 0})
+                fila["entradas"] += 1
+                fila["bytes"] += entrada.tamano
+                if entrada.liberar is None:
+                    fila["fijos"] += entrada.tamano
+            return {"bytes": self.bytes, "presupuesto": self.presupuesto, "duenos": por_dueno}
+
+
+_contabilidad = Contabilidad()
+
+
+def registrar(dueno, clave, tamano, costo_ms=0.0, liberar=None):
+    return _contabilidad.registrar(dueno, clave, tamano, costo_ms, liberar)
+
+
+def usar(dueno, clave):
+    _contabilidad.usar(dueno, clave)
+
+
+def quitar(dueno, clave):
+    _contabilidad.quitar(dueno, clave)
+
+
+def estado():
+    return _contabilidad.estado()
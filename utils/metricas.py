@@ -0,0 +1,267 @@
+"""Instrumentacion de rutas calientes: tiempos por etapa en un buffer circular del proceso.
+
+Uso:
+    with medir("asistencia:filtro"):
+        ...
+
+    @cronometrar("carga:datasets")
+    def cargar(...): ...
+
+Las mediciones se pueden ver en el panel de administracion (`panel_admin`, p50/p95 por
+etapa) o exportar como texto de Prometheus o JSON lines. Los percentiles salen del buffer
+circular (las ultimas N mediciones); la cuenta y la suma por etapa se acumulan aparte
+desde que arranco el proceso, asi `_count` y `_sum` de Prometheus nunca bajan.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+# (timestamp, etapa, milisegundos) de las ultimas N mediciones
+_mediciones = deque(maxlen=int(os.getenv("METRICAS_BUFFER", "10000")))
+# etapa -> [mediciones, milisegundos] desde el arranque (no salen del buffer)
+_acumulados = defaultdict(lambda: [0, 0.0])
+_contadores = defaultdict(float)
+# Valores actuales (no acumulados), p. ej. los bytes en cache
+_indicadores = {}
+_lock = threading.Lock()
+_contexto = threading.local()
+
+
+def iniciar_seccion(nombre):
+    """Prefijo para las etapas medidas a partir de aqui en este hilo (p. ej. "goles")"""
+    _contexto.seccion = nombre
+
+
+def _nombre_completo(etapa):
+    seccion = getattr(_contexto, "seccion", None)
+    return f"{seccion}:{etapa}" if seccion else etapa
+
+
+def registrar(etapa, ms):
+    """Guarda una medicion en el buffer circular"""
+    with _lock:
+        _mediciones.append((time.time(), etapa, ms))
+        acumulado = _acumulados[etapa]
+        acumulado[0] += 1
+        acumulado[1] += ms
+
+
+def incrementar(nombre, valor=1):
+    """Suma `valor` a un contador (aciertos de cache, desalojos, etc.)"""
+    with _lock:
+        _contadores[nombre] += valor
+
+
+def fijar(nombre, valor):
+    """Reemplaza el valor actual de un indicador (memoria usada, presion...)"""
+    with _lock:
+        _indicadores[nombre] = valor
+
+
+@contextmanager
+def medir(etapa):
+    """Mide el tiempo del bloque y lo registra como `seccion:etapa`"""
+    nombre = _nombre_completo(etapa)
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar(nombre, (time.perf_counter() - inicio) * 1000)
+
+
+def cronometrar(etapa=None):
+    """Decorador: mide cada llamada de la funcion (por default con su nombre como etapa)"""
+    def decorador(funcion):
+        nombre = etapa or funcion.__name__
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with medir(nombre):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+class FigurasMedidas:
+    """Envuelve un modulo de graficas (px, go) y mide cada figura que construye"""
+
+    def __init__(self, modulo, prefijo="figura"):
+        self._modulo = modulo
+        self._prefijo = prefijo
+
+    def __getattr__(self, atributo):
+        valor = getattr(self._modulo, atributo)
+        if not callable(valor):
+            return valor
+
+        @functools.wraps(valor)
+        def envoltura(*args, **kwargs):
+            with medir(f"{self._prefijo}:{atributo}"):
+                return valor(*args, **kwargs)
+        return envoltura
+
+
+# ==========================================
+# RESUMEN Y EXPORTACION
+# ==========================================
+def _percentil(valores_ordenados, p):
+    if not valores_ordenados:
+        return 0.0
+    indice = min(len(valores_ordenados) - 1, max(0, round(p / 100 * (len(valores_ordenados) - 1))))
+    return valores_ordenados[indice]
+
+
+def mediciones():
+    with _lock:
+        return list(_mediciones)
+
+
+def contadores():
+    with _lock:
+        return dict(_contadores)
+
+
+def acumulados():
+    """{etapa: (mediciones, ms)} desde el arranque del proceso"""
+    with _lock:
+        return {etapa: tuple(valores) for etapa, valores in _acumulados.items()}
+
+
+def indicadores():
+    with _lock:
+        return dict(_indicadores)
+
+
+def tasas_aciertos():
+    """{prefijo: aciertos / (aciertos + fallos)} para los contadores `prefijo:acierto` y `prefijo:fallo`"""
+    cuentas = contadores()
+    tasas = {}
+    for nombre, aciertos in cuentas.items():
+        if nombre.endswith(":acierto"):
+            prefijo = nombre[:-len(":acierto")]
+            total = aciertos + cuentas.get(f"{prefijo}:fallo", 0)
+            tasas[prefijo] = aciertos / total if total else 0.0
+    return tasas
+
+
+def resumen():
+    """Estadisticas por etapa: n, p50, p95, max y total (ms)"""
+    por_etapa = defaultdict(list)
+    for _, etapa, ms in mediciones():
+        por_etapa[etapa].append(ms)
+    filas = {}
+    for etapa, valores in por_etapa.items():
+        valores.sort()
+        filas[etapa] = {
+            "n": len(valores),
+            "p50_ms": _percentil(valores, 50),
+            "p95_ms": _percentil(valores, 95),
+            "max_ms": valores[-1],
+            "total_ms": sum(valores),
+        }
+    return filas
+
+
+def _etiqueta(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def exportar_prometheus():
+    """Texto en formato de exposicion de Prometheus"""
+    lineas = [
+        "# HELP dashboard_etapa_ms Duracion de cada etapa del dashboard en milisegundos",
+        "# TYPE dashboard_etapa_ms summary",
+    ]
+    # Cuantiles de la ventana del buffer; _sum y _count acumulados (monotonicos, para rate())
+    ventana = resumen()
+    for etapa, (n, total_ms) in sorted(acumulados().items()):
+        etiqueta = _etiqueta(etapa)
+        if etapa in ventana:
+            lineas.append(f'dashboard_etapa_ms{{etapa="{etiqueta}",quantile="0.5"}} {ventana[etapa]["p50_ms"]:.3f}')
+            lineas.append(f'dashboard_etapa_ms{{etapa="{etiqueta}",quantile="0.95"}} {ventana[etapa]["p95_ms"]:.3f}')
+        lineas.append(f'dashboard_etapa_ms_sum{{etapa="{etiqueta}"}} {total_ms:.3f}')
+        lineas.append(f'dashboard_etapa_ms_count{{etapa="{etiqueta}"}} {n}')
+    cuentas = contadores()
+    if cuentas:
+        lineas.append("# HELP dashboard_eventos_total Contadores de eventos del dashboard")
+        lineas.append("# TYPE dashboard_eventos_total counter")
+        for nombre, valor in sorted(cuentas.items()):
+            lineas.append(f'dashboard_eventos_total{{evento="{_etiqueta(nombre)}"}} {valor:g}')
+    valores = indicadores()
+    if valores:
+        lineas.append("# HELP dashboard_indicador Valores actuales del proceso (memoria en cache, presion)")
+        lineas.append("# TYPE dashboard_indicador gauge")
+        for nombre, valor in sorted(valores.items()):
+            lineas.append(f'dashboard_indicador{{nombre="{_etiqueta(nombre)}"}} {valor:g}')
+    return "\n".join(lineas) + "\n"
+
+
+def exportar_jsonl():
+    """Una linea JSON por medicion"""
+    return "".join(
+        json.dumps({"ts": ts, "etapa": etapa, "ms": round(ms, 3)}) + "\n" for ts, etapa, ms in mediciones()
+    )
+
+
+def limpiar():
+    with _lock:
+        _mediciones.clear()
+        _acumulados.clear()
+        _contadores.clear()
+        _indicadores.clear()
+
+
+# ==========================================
+# PANEL DE ADMINISTRACION
+# ==========================================
+def admin_activo():
+    """El panel se muestra con METRICAS_ADMIN=1, o con ?admin=<METRICAS_ADMIN_TOKEN> en la URL"""
+    import streamlit as st
+
+    if os.getenv("METRICAS_ADMIN") == "1":
+        return True
+    token = os.getenv("METRICAS_ADMIN_TOKEN", "")
+    return bool(token) and st.query_params.get("admin") == token
+
+
+def panel_admin():
+    """Panel opcional en el sidebar con p50/p95 por etapa y botones de exportacion"""
+    import pandas as pd
+    import streamlit as st
+
+    if not admin_activo():
+        return
+    with st.sidebar.expander("⏱️ Rendimiento (admin)", expanded=False):
+        filas = resumen()
+        if not filas:
+            st.caption("Aun no hay mediciones.")
+            _panel_memoria(st, pd)
+            return
+        tabla = pd.DataFrame.from_dict(filas, orient="index").sort_values("p95_ms", ascending=False)
+        st.dataframe(tabla.round(1), use_container_width=True)
+        cuentas = contadores()
+        if cuentas:
+            st.json(cuentas)
+        for prefijo, tasa in sorted(tasas_aciertos().items()):
+            st.caption(f"{prefijo}: {tasa:.0%} de aciertos")
+        _panel_memoria(st, pd)
+        st.download_button("Prometheus", exportar_prometheus(), file_name="metricas.prom", mime="text/plain")
+        st.download_button("JSON lines", exportar_jsonl(), file_name="metricas.jsonl", mime="application/json")
+
+
+def _panel_memoria(st, pd):
+    """Bytes en cache por dueño contra MEMORIA_PRESUPUESTO_MB"""
+    from utils import memoria
+
+    estado = memoria.estado()
+    mb = 1024 * 1024
+    presion = estado["bytes"] / estado["presupuesto"] if estado["presupuesto"] else 0.0
+    st.caption(f"Memoria en cache: {estado['bytes'] / mb:,.1f} de {estado['presupuesto'] / mb:,.0f} MB ({presion:.0%})")
+    if estado["duenos"]:
+        tabla = pd.DataFrame.from_dict(estado["duenos"], orient="index")
+        st.dataframe((tabla[["bytes", "fijos"]] / mb).round(1).assign(entradas=tabla["entradas"]),
+                     use_container_width=True)
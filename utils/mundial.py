@@ -0,0 +1,345 @@
+"""Filtros, agregaciones y figuras del dashboard del Mundial (app_proyecto.py).
+
+Son funciones puras de pandas/plotly, sin Streamlit, para poder medirlas y
+reutilizarlas fuera del dashboard (benchmarks, sitio estatico).
+"""
+import pandas as pd
+
+from utils.importaciones import importar_diferido
+from utils.metricas import cronometrar
+
+px = importar_diferido("plotly.express")
+go = importar_diferido("plotly.graph_objects")
+
+
+# ==========================================
+# ASISTENCIA Y CAPACIDAD
+# ==========================================
+@cronometrar("filtro")
+def filtrar_asistencia(df_asistencia, min_llenado, years_seleccionados):
+    """Eventos con al menos `min_llenado` % de sold-out en los años elegidos"""
+    return df_asistencia[
+        (df_asistencia['Porcentaje_Llenado'] >= min_llenado) &
+        (df_asistencia['Year'].isin(years_seleccionados))
+    ]
+
+
+def extremos_asistencia(df_filtrado, n=10, mayores=True):
+    """Primeros (o ultimos) `n` eventos con su etiqueta 'Estadio (Año)'"""
+    extremos = (df_filtrado.head(n) if mayores else df_filtrado.tail(n)).copy()
+    extremos['Label'] = extremos['STADIUM'] + ' (' + extremos['Year'].astype(str) + ')'
+    return extremos
+
+
+@cronometrar("figura:asistencia")
+def figura_asistencia(extremos, titulo, escala):
+    """Barras horizontales del porcentaje de sold-out"""
+    fig = px.bar(
+        extremos.sort_values('Porcentaje_Llenado', ascending=True),
+        x='Porcentaje_Llenado',
+        y='Label',
+        orientation='h',
+        color='Porcentaje_Llenado',
+        color_continuous_scale=escala,
+        text='Porcentaje_Llenado',
+        title=titulo
+    )
+    fig.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
+    fig.update_layout(height=500, showlegend=False)
+    return fig
+
+
+# ==========================================
+# ESTADIOS POR PAÍS
+# ==========================================
+@cronometrar("filtro")
+def filtrar_estadios(df_estadios, paises_seleccionados):
+    return df_estadios[df_estadios['Country'].isin(paises_seleccionados)]
+
+
+@cronometrar("figura:estadios")
+def figura_estadios(df_estadios_filtrado):
+    """Capacidad de cada estadio, una barra por estadio"""
+    fig = px.bar(
+        df_estadios_filtrado.sort_values('Capacity', ascending=True),
+        x='Capacity',
+        y='Stadium',
+        color='Country',
+        orientation='h',
+        title='Capacidad de Estadios Individuales',
+        text='Capacity',
+        height=max(600, len(df_estadios_filtrado) * 25)
+    )
+    fig.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
+    return fig
+
+
+@cronometrar("figura:capacidad_pais")
+def figura_capacidad_pais(df_resumen_paises, columna, titulo):
+    """Una barra por pais con `columna` (Capacidad_Maxima o Capacidad_Promedio)"""
+    fig = px.bar(
+        df_resumen_paises,
+        x='Country',
+        y=columna,
+        color='Country',
+        title=titulo,
+        text=columna
+    )
+    fig.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
+    fig.update_layout(showlegend=False)
+    return fig
+
+
+# ==========================================
+# GOLES Y VICTORIAS LOCALES
+# ==========================================
+@cronometrar("filtro")
+def filtrar_victorias(df_victorias, min_partidos):
+    return df_victorias[df_victorias['Total_Partidos'] >= min_partidos]
+
+
+@cronometrar("figura:victoria_local")
+def figura_victoria_local(df_victorias_filtrado, n=15):
+    """Porcentaje de victoria local de los primeros `n` paises"""
+    fig = px.bar(
+        df_victorias_filtrado.head(n),
+        x='country',
+        y='Porcentaje_Victoria_Local',
+        color='Total_Partidos',
+        color_continuous_scale='Teal',
+        title='Porcentaje de Victoria del Equipo Local',
+        text='Porcentaje_Victoria_Local'
+    )
+    fig.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
+    fig.update_layout(
+        xaxis_title="País Anfitrión",
+        yaxis_title="% Victoria Local",
+        yaxis_range=[0, 100],
+        height=500
+    )
+    return fig
+
+
+@cronometrar("agregacion:goles")
+def preparar_goles(df_goles):
+    """Agrega total_goles_num y total_goles_sumados (devuelve un DataFrame nuevo)"""
+    df = df_goles.copy()
+    try:
+        df['total_goles_num'] = df['total_goles_str'].astype(int)
+    except ValueError:
+        df['total_goles_num'] = df['total_goles_str'].str.extract(r'(\d+)')[0].astype(int)
+    df['total_goles_sumados'] = df['total_goles_num'] * df['Total_Encuentros']
+    return df
+
+
+def zoom_goles(df_goles, minimo=12, maximo=31):
+    """Encuentros en el rango alto de goles (el detalle que no se ve en la dona)"""
+    return df_goles[
+        (df_goles['total_goles_num'] >= minimo) &
+        (df_goles['total_goles_num'] <= maximo)
+    ].sort_values(by='Total_Encuentros', ascending=False)
+
+
+@cronometrar("figura:distribucion_goles")
+def figura_distribucion_goles(df_goles, min_goles=5):
+    """Dona con la distribucion de encuentros de `min_goles` goles o mas por cantidad de goles"""
+    fig = go.Figure(data=[go.Pie(
+        labels=df_goles['total_goles_str'],
+        values=df_goles['Total_Encuentros'],
+        hole=0.3,
+        marker=dict(
+            colors=px.colors.sequential.RdBu,
+            line=dict(color='white', width=0.1)
+        ),
+        textposition='outside',
+        textinfo='percent+label',
+    )])
+
+    total_goles_altos = df_goles['Total_Encuentros'].sum()
+    fig.update_layout(
+        title=f'Distribución de Encuentros con {min_goles} Goles o más en total.',
+        annotations=[dict(
+            text=f'{total_goles_altos}<br>Encuentros',
+            x=0.5, y=0.5,
+            font_size=20,
+            showarrow=False
+        )],
+        height=700
+    )
+    return fig
+
+
+@cronometrar("figura:zoom_goles")
+def figura_zoom_goles(df_zoom):
+    """Barras de los encuentros del rango alto (ver `zoom_goles`)"""
+    fig = px.bar(
+        df_zoom,
+        x='total_goles_str',
+        y='Total_Encuentros',
+        color='Total_Encuentros',
+        title='Comparación de Encuentros en Rango Alto',
+        template='plotly_white'
+    )
+    fig.update_layout(height=500, xaxis_title="Total de Goles por Encuentro", yaxis_title="Cantidad de Encuentros")
+    return fig
+
+
+# ==========================================
+# PROYECCIÓN FINANCIERA
+# ==========================================
+def separar_proyeccion(df_proyeccion):
+    """(historico, proyectado) segun la columna Tipo"""
+    return (
+        df_proyeccion[df_proyeccion['Tipo'] == 'Histórico'],
+        df_proyeccion[df_proyeccion['Tipo'] == 'Proyección'],
+    )
+
+
+@cronometrar("figura:proyeccion")
+def figura_proyeccion(df_historico, df_proyectado):
+    """Linea historica del fondo de premios y su proyeccion, unidas en el ultimo mundial real"""
+    fig = go.Figure()
+
+    # Línea histórica
+    fig.add_trace(go.Scatter(
+        x=df_historico['Year'].astype(str),
+        y=df_historico['Total_Fund_Millions'],
+        mode='lines+markers+text',
+        name='Histórico',
+        line=dict(color='#4ECDC4', width=3),
+        marker=dict(size=10, color='#4ECDC4'),
+        text=df_historico['Total_Fund_Millions'].apply(lambda x: f'${x:.0f}M'),
+        textposition='top center',
+        textfont=dict(size=11, color='#4ECDC4')
+    ))
+
+    # Línea de proyección
+    if not df_proyectado.empty:
+        # Conectar último histórico con proyección
+        df_conexion = pd.concat([df_historico.iloc[[-1]], df_proyectado])
+
+        fig.add_trace(go.Scatter(
+            x=df_conexion['Year'].astype(str),
+            y=df_conexion['Total_Fund_Millions'],
+            mode='lines+markers+text',
+            name='Proyección',
+            line=dict(color='#FF6B6B', width=3, dash='dash'),
+            marker=dict(size=12, color='#FF6B6B', symbol='star'),
+            text=df_conexion['Total_Fund_Millions'].apply(lambda x: f'${x:.0f}M'),
+            textposition='top center',
+            textfont=dict(size=12, color='#FF6B6B', family='Arial Black')
+        ))
+
+    fig.update_layout(
+        title='Evolución del Fondo Total de Premios (Millones USD)',
+        xaxis_title='Año del Mundial',
+        yaxis_title='Fondo Total (Millones USD)',
+        template='plotly_white',
+        height=500,
+        hovermode='x unified',
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    return fig
+
+
+# ==========================================
+# JUGADORES
+# ==========================================
+@cronometrar("filtro")
+def filtrar_goleadores(df_goleadores, min_goles):
+    return df_goleadores[df_goleadores['Goles'] >= min_goles]
+
+
+@cronometrar("figura:goleadores")
+def figura_goleadores(df_goleadores_filtrado, n=20):
+    """Top `n` goleadores, color por equipo/pais"""
+    fig = px.bar(
+        df_goleadores_filtrado.sort_values(by='Goles', ascending=False).head(n),
+        x='Goleador',
+        y='Goles',
+        color='Equipo_Pais',
+        title=f'Top {n} Goleadores Elite (Más Goles)',
+        template='plotly_white',
+        text='Goles',
+        labels={'Equipo_Pais': 'Equipo/País'}
+    )
+    fig.update_traces(texttemplate='%{text}', textposition='outside')
+    fig.update_layout(
+        xaxis_title="Goleador",
+        yaxis_title="Cantidad de Goles",
+        height=600,
+        xaxis={'tickangle': -45}
+    )
+    return fig
+
+
+@cronometrar("figura:top50_paises")
+def figura_top50_paises(df_top50_paises):
+    """Jugadores del top 50 de goles + asistencias por pais"""
+    fig = px.bar(
+        df_top50_paises,
+        x='COUNTRY',
+        y='Jugadores_Top_50',
+        title='Top 50 Jugadores por Goles + Asistencias - Distribución por País',
+        color='Jugadores_Top_50',
+        color_continuous_scale='Viridis',
+        text='Jugadores_Top_50',
+        template='plotly_white'
+    )
+    fig.update_traces(texttemplate='%{text}', textposition='outside')
+    fig.update_layout(
+        xaxis_title="País",
+        yaxis_title="Cantidad de Jugadores",
+        height=500,
+        showlegend=False
+    )
+    return fig
+
+
+@cronometrar("figura:paises_goleadores")
+def figura_pie_paises_goleadores(df_paises_goleadores):
+    """Dona con la proporcion de goleadores de cada pais/equipo"""
+    fig = px.pie(
+        df_paises_goleadores,
+        values='Numero_de_Goleadores',
+        names='Pais_Equipo',
+        title='Distribución de Goleadores por País/Equipo',
+        hole=0.4,
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    fig.update_traces(
+        textposition='inside',
+        textinfo='percent+label'
+    )
+    fig.update_layout(height=500)
+    return fig
+
+
+@cronometrar("figura:paises_goleadores")
+def figura_ranking_paises_goleadores(df_paises_goleadores):
+    """Barras horizontales de goleadores por pais/equipo"""
+    fig = px.bar(
+        df_paises_goleadores.sort_values('Numero_de_Goleadores', ascending=True),
+        x='Numero_de_Goleadores',
+        y='Pais_Equipo',
+        orientation='h',
+        title='Ranking de Países por Cantidad de Goleadores',
+        color='Numero_de_Goleadores',
+        color_continuous_scale='Blues',
+        text='Numero_de_Goleadores'
+    )
+    fig.update_traces(texttemplate='%{text}', textposition='outside')
+    fig.update_layout(
+        height=500,
+        showlegend=False,
+        yaxis_title="País/Equipo",
+        xaxis_title="Número de Goleadores"
+    )
+    return fig
@@ -0,0 +1,183 @@
+"""Transformaciones del dashboard de Netflix (Semana 1/app.py).
+
+Un CSV subido se procesa una sola vez por contenido, no por sesion ni por rerun:
+
+    datos = netflix.leer_subido(uploaded.getvalue())     # cache por huella del archivo
+    procesado = netflix.procesar(datos, mapeo)           # + mapeo de columnas
+    vista = netflix.vista_por_tipo(procesado, "Movie")   # + filtro de tipo
+
+Cada paso pasa por la cache de resultados (utils/resultados.py), asi que dos usuarios
+que suben el mismo archivo comparten el parseo, las columnas derivadas y las
+estadisticas. Al procesar un archivo, un hilo de fondo calcula las vistas y
+estadisticas de los tres tipos: cambiar el filtro de tipo o las columnas elegidas solo
+lee resultados ya calculados.
+"""
+import hashlib
+import io
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import pandas as pd
+
+from utils import resultados
+from utils.metricas import incrementar, medir
+
+TIPOS = ("Todos", "Movie", "TV Show")
+
+_ejecutor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="netflix")
+_programados = set()
+_lock = threading.Lock()
+
+
+def _agregar_numericas(out: pd.DataFrame) -> pd.DataFrame:
+    # release_year -> numeric
+    if "release_year" in out.columns:
+        out["release_year_num"] = pd.to_numeric(out["release_year"], errors="coerce")
+    # duration -> numeric (minutes for Movies / seasons for TV Show)
+    if "duration" in out.columns:
+        extracted = out["duration"].astype(str).str.extract(r"(\d+)")[0]
+        out["duration_num"] = pd.to_numeric(extracted, errors="coerce")
+    return out
+
+
+def coerce_numeric_columns(df: pd.DataFrame) -> pd.DataFrame:
+    return _agregar_numericas(df.copy())
+
+
+def count_by_year(df: pd.DataFrame, content_type: Optional[str] = None) -> pd.Series:
+    q = df
+    if content_type in ("Movie", "TV Show"):
+        q = q[q["type"] == content_type]
+    if "release_year_num" not in q.columns:
+        return pd.Series(dtype="int64")
+    return q["release_year_num"].dropna().astype(int).value_counts().sort_index()
+
+
+# ==========================================
+# PIPELINE POR CONTENIDO
+# ==========================================
+def huella(contenido: bytes) -> str:
+    """Hash del contenido del archivo subido (el nombre del archivo no importa)"""
+    return hashlib.blake2b(contenido, digest_size=16).hexdigest()
+
+
+def leer_subido(contenido: bytes) -> pd.DataFrame:
+    """pd.read_csv del archivo subido, una vez por contenido en todo el proceso"""
+    return resultados.consultar(
+        "netflix:csv", (), {"huella": huella(contenido)},
+        lambda: pd.read_csv(io.BytesIO(contenido))
+    )
+
+
+def aplicar_mapeo(datos: pd.DataFrame, mapeo: dict) -> pd.DataFrame:
+    """Copia con las columnas elegidas en el mapeo bajo su nombre canonico y las columnas *_num"""
+    out = datos.copy()
+    for canonica, columna in mapeo.items():
+        if columna and columna != canonica:
+            out[canonica] = out[columna]
+    return _agregar_numericas(out)
+
+
+def procesar(datos: pd.DataFrame, mapeo: dict) -> pd.DataFrame:
+    """DataFrame con el mapeo aplicado, compartido por (archivo, mapeo).
+
+    La primera vez programa en segundo plano las vistas y estadisticas de cada tipo.
+    """
+    procesado = resultados.consultar(
+        "netflix:procesado", datos, {"mapeo": mapeo}, lambda: aplicar_mapeo(datos, mapeo)
+    )
+    _programar_precalculo(procesado)
+    return procesado
+
+
+def vista_por_tipo(procesado: pd.DataFrame, tipo: str) -> pd.DataFrame:
+    if tipo not in ("Movie", "TV Show") or "type" not in procesado.columns:
+        return procesado
+    return resultados.consultar(
+        "netflix:vista", procesado, {"tipo": tipo}, lambda: procesado[procesado["type"] == tipo]
+    )
+
+
+def columnas_numericas(df: pd.DataFrame) -> list:
+    """Como select_dtypes(include="number"), sin copiar el DataFrame"""
+    return [c for c, tipo in df.dtypes.items() if pd.api.types.is_numeric_dtype(tipo)]
+
+
+def _resumen(vista):
+    years = vista["release_year_num"].dropna() if "release_year_num" in vista.columns else pd.Series(dtype=float)
+    duracion = vista["duration_num"].dropna() if "duration_num" in vista.columns else pd.Series(dtype=float)
+    return {
+        "registros": len(vista),
+        "year_min": int(years.min()) if not years.empty else None,
+        "year_max": int(years.max()) if not years.empty else None,
+        "duracion_mediana": float(duracion.median()) if not duracion.empty else None,
+    }
+
+
+def _correlacion(vista):
+    columnas = [c for c in columnas_numericas(vista) if vista[c].notna().any()]
+    if len(columnas) < 2:
+        return pd.DataFrame()
+    return vista[columnas].corr(numeric_only=True)
+
+
+def resumen(vista: pd.DataFrame) -> dict:
+    """Registros, rango de años y mediana de duracion (None si no hay datos)"""
+    return resultados.consultar("netflix:resumen", vista, {}, lambda: _resumen(vista))
+
+
+def conteo_por_year(vista: pd.DataFrame) -> pd.Series:
+    return resultados.consultar("netflix:conteo", vista, {}, lambda: count_by_year(vista))
+
+
+def correlacion(vista: pd.DataFrame) -> pd.DataFrame:
+    """Matriz de correlacion de las columnas numericas con algun valor"""
+    return resultados.consultar("netflix:correlacion", vista, {}, lambda: _correlacion(vista))
+
+
+def muestra(vista: pd.DataFrame, columnas, filas: int, semilla: int = 42) -> pd.DataFrame:
+    """Filas completas de `columnas` (en el orden elegido), con a lo mas `filas` al azar"""
+    columnas = [c for c in dict.fromkeys(columnas) if c in vista.columns]
+
+    def calcular():
+        df = vista[columnas].dropna()
+        return df.sample(filas, random_state=semilla) if len(df) > filas else df
+
+    # canonico() ordena las listas: con (posicion, columna) el orden elegido sigue en la clave
+    orden = list(enumerate(columnas))
+    return resultados.consultar("netflix:muestra", vista, {"columnas": orden, "filas": filas}, calcular)
+
+
+# ==========================================
+# PRECALCULO EN SEGUNDO PLANO
+# ==========================================
+def precalcular(procesado: pd.DataFrame):
+    """Vistas y estadisticas de los tres tipos (las que ya esten en cache no se recalculan)"""
+    with medir("netflix:precalculo"):
+        for tipo in TIPOS:
+            vista = vista_por_tipo(procesado, tipo)
+            resumen(vista)
+            conteo_por_year(vista)
+            correlacion(vista)
+
+
+def _precalcular_seguro(procesado):
+    try:
+        precalcular(procesado)
+    except Exception:
+        # La sesion que pida la vista la calcula (y ve el error) en primer plano
+        incrementar("netflix:precalculo_error")
+
+
+def _programar_precalculo(procesado):
+    version = resultados.version_de(procesado)
+    if version is None:
+        return
+    with _lock:
+        if version in _programados:
+            return
+        _programados.add(version)
+    weakref.finalize(procesado, _programados.discard, version)
+    _ejecutor.submit(_precalcular_seguro, procesado)
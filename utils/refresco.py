@@ -0,0 +1,180 @@
+"""Refresco en segundo plano de datasets (stale-while-revalidate).
+
+Cada dataset registrado se sirve siempre desde memoria con su ultima version buena.
+Un hilo de fondo lo recarga un poco antes de que venza su intervalo (con jitter, para
+que no se recarguen todos al mismo tiempo) y cambia la version servida de forma
+atomica. Solo la primera carga de un dataset es sincrona; en estado estable ninguna
+sesion espera a S3.
+
+La funcion de carga recibe la version que se sirve actualmente y devuelve
+`(version, valor)`. Si la version no cambio puede devolver `(version, None)` y se
+conserva el valor actual sin volver a parsear (p. ej. comparando el ETag de un HEAD).
+
+Los valores servidos cuentan como fijos en el presupuesto de memoria (utils/memoria.py).
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import memoria
+from utils.metricas import incrementar, medir
+
+# Los refrescos empiezan entre el (1 - JITTER) y el 100 % del intervalo
+JITTER = 0.2
+# Espera minima antes de reintentar un refresco que fallo
+REINTENTO_MIN = 15
+
+
+class Dataset:
+    """Estado de un dataset registrado; `estado` se reemplaza completo en cada refresco"""
+
+    def __init__(self, nombre, cargar, intervalo):
+        self.nombre = nombre
+        self.cargar = cargar
+        self.intervalo = intervalo
+        # (valor, version, cargado_en) se lee y se reemplaza como una sola tupla
+        self.estado = None
+        self.error = None
+        self.fallos = 0
+        self.proximo = 0.0
+        self.refrescando = False
+        self.lock = threading.Lock()
+
+    @property
+    def cargado(self):
+        return self.estado is not None
+
+    def programar(self, ahora):
+        self.proximo = ahora + self.intervalo * random.uniform(1 - JITTER, 1)
+
+    def programar_reintento(self, ahora):
+        # Backoff exponencial, sin pasar del intervalo normal
+        espera = min(self.intervalo, REINTENTO_MIN * 2 ** min(self.fallos, 6))
+        self.proximo = ahora + espera * random.uniform(0.8, 1.2)
+
+
+class Refrescador:
+    """Sirve datasets desde memoria y los recarga en un hilo de fondo"""
+
+    def __init__(self, max_hilos=4):
+        self._datasets = {}
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._ejecutor = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="refresco")
+        self._hilo = None
+
+    def registrar(self, nombre, cargar, intervalo):
+        """Registra un dataset (si ya existe, solo actualiza su intervalo)"""
+        with self._lock:
+            dataset = self._datasets.get(nombre)
+            if dataset is None:
+                dataset = self._datasets[nombre] = Dataset(nombre, cargar, intervalo)
+            else:
+                dataset.intervalo = intervalo
+        return dataset
+
+    # ==========================================
+    # LECTURA
+    # ==========================================
+    def obtener_varios(self, nombres):
+        """Devuelve (valores, errores) por nombre; solo espera por los datasets que nunca se han cargado"""
+        ahora = time.time()
+        # Un dataset que fallo se reintenta aqui solo cuando vence su backoff (si no, lo hace el hilo)
+        pendientes = [
+            d for d in (self._datasets[n] for n in nombres)
+            if not d.cargado and (d.error is None or d.proximo <= ahora)
+        ]
+        if pendientes:
+            list(self._ejecutor.map(self._cargar_primera_vez, pendientes))
+        self._iniciar_hilo()
+
+        valores, errores = {}, {}
+        for nombre in nombres:
+            dataset = self._datasets[nombre]
+            estado = dataset.estado
+            if estado is not None:
+                valores[nombre] = estado[0]
+            else:
+                errores[nombre] = dataset.error or "sin datos"
+        return valores, errores
+
+    def estado(self):
+        """Resumen por dataset: version, antiguedad y proximo refresco (segundos)"""
+        ahora = time.time()
+        filas = {}
+        for nombre, dataset in list(self._datasets.items()):
+            estado = dataset.estado
+            filas[nombre] = {
+                "version": estado[1] if estado else None,
+                "antiguedad_s": round(ahora - estado[2]) if estado else None,
+                "proximo_s": round(dataset.proximo - ahora),
+                "error": dataset.error,
+            }
+        return filas
+
+    # ==========================================
+    # CARGA
+    # ==========================================
+    def _cargar_primera_vez(self, dataset):
+        with dataset.lock:
+            if not dataset.cargado:
+                self._refrescar(dataset)
+
+    def _refrescar(self, dataset):
+        actual = dataset.estado
+        version_actual = actual[1] if actual else None
+        try:
+            with medir(f"refresco:{dataset.nombre}"):
+                version, valor = dataset.cargar(version_actual)
+        except Exception as e:
+            dataset.error = str(e)
+            dataset.fallos += 1
+            dataset.programar_reintento(time.time())
+            incrementar("refresco:error")
+            return
+        ahora = time.time()
+        if valor is None and actual is not None and version == version_actual:
+            # Sin cambios: se conserva el valor y solo se renueva la marca de tiempo
+            dataset.estado = (actual[0], version, ahora)
+            incrementar("refresco:sin_cambios")
+        else:
+            dataset.estado = (valor, version, ahora)
+            incrementar("refresco:actualizado")
+            # Cuenta para el presupuesto de memoria pero no se desaloja (siempre se sirve)
+            memoria.registrar("refresco", dataset.nombre, memoria.tamano_profundo(valor))
+        dataset.error = None
+        dataset.fallos = 0
+        dataset.programar(ahora)
+
+    def _refrescar_en_fondo(self, dataset):
+        try:
+            with dataset.lock:
+                self._refrescar(dataset)
+        finally:
+            dataset.refrescando = False
+            self._despertar.set()
+
+    # ==========================================
+    # HILO DE FONDO
+    # ==========================================
+    def _iniciar_hilo(self):
+        with self._lock:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._ciclo, name="refrescador", daemon=True)
+                self._hilo.start()
+
+    def _ciclo(self):
+        while True:
+            ahora = time.time()
+            siguiente = ahora + 60
+            for dataset in list(self._datasets.values()):
+                if dataset.refrescando or not dataset.cargado and dataset.error is None:
+                    continue
+                if dataset.proximo <= ahora:
+                    dataset.refrescando = True
+                    self._ejecutor.submit(self._refrescar_en_fondo, dataset)
+                else:
+                    siguiente = min(siguiente, dataset.proximo)
+            self._despertar.wait(max(0.5, siguiente - ahora))
+            self._despertar.clear()
@@ -0,0 +1,211 @@
+"""Cache de resultados de consultas compartida por todas las sesiones del proceso.
+
+Muchas sesiones terminan con los mismos widgets (los defaults de cada seccion) y cada
+una recalculaba los mismos filtros y agregados. Aqui cada resultado se guarda una vez
+por (vista, version de los datasets de entrada, filtros canonicos):
+
+    df_filtrado = resultados.consultar(
+        "asistencia:filtro", df_asistencia, {"min_llenado": 0, "years": years},
+        lambda: mundial.filtrar_asistencia(df_asistencia, 0, years),
+    )
+
+- Version: solo los DataFrames marcados con `marcar_version` (los que sirve el
+  refrescador, y los propios resultados de la cache) tienen una; con una entrada sin
+  version la consulta se calcula sin cache.
+- Filtros canonicos: el orden de las llaves y de una seleccion multiple no importa
+  ([2018, 2014] y [2014, 2018] son la misma consulta), ni los tipos de numpy.
+- LRU acotada por bytes (RESULTADOS_CACHE_MB) y por entradas (RESULTADOS_CACHE_ENTRADAS).
+- Si varias sesiones piden la misma consulta a la vez, solo una la calcula; las demas
+  esperan su resultado.
+- Los resultados se comparten: la cache guarda su propio DataFrame congelado y cada
+  llamada recibe una manija (utils/inmutable.py), asi lo que una sesion le cambie no
+  llega a la cache ni a las demas sesiones.
+- Cada entrada se reporta al presupuesto de memoria del proceso (utils/memoria.py) con
+  su tamaño y lo que costo calcularla; bajo presion el presupuesto puede sacarla antes
+  que la LRU.
+
+Contadores en utils/metricas.py: resultados:acierto, resultados:fallo,
+resultados:espera y resultados:desalojo.
+"""
+import functools
+import hashlib
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+from utils import memoria
+from utils.inmutable import congelar, manija
+from utils.metricas import incrementar
+
+MAX_BYTES = int(float(os.getenv("RESULTADOS_CACHE_MB", "64")) * 1024 * 1024)
+MAX_ENTRADAS = int(os.getenv("RESULTADOS_CACHE_ENTRADAS", "256"))
+
+_versiones = {}
+_lock_versiones = threading.Lock()
+
+
+# ==========================================
+# VERSIONES
+# ==========================================
+def marcar_version(df, version):
+    """Asocia `version` a este objeto DataFrame (no a sus derivados) y lo devuelve"""
+    clave = id(df)
+    with _lock_versiones:
+        _versiones[clave] = (weakref.ref(df), version)
+    weakref.finalize(df, _versiones.pop, clave, None)
+    return df
+
+
+def version_de(df):
+    """Version marcada de `df`, o None"""
+    entrada = _versiones.get(id(df))
+    if entrada is not None and entrada[0]() is df:
+        return entrada[1]
+    return None
+
+
+def entregar(valor):
+    """Manija de `valor` para una sesion (ver utils/inmutable.py), con la misma version"""
+    version = version_de(valor)
+    copia = manija(valor)
+    if version is not None and copia is not valor:
+        marcar_version(copia, version)
+    return copia
+
+
+# ==========================================
+# CLAVES
+# ==========================================
+def canonico(valor):
+    """Forma hashable y estable de un estado de filtros"""
+    if isinstance(valor, dict):
+        return tuple(sorted((str(k), canonico(v)) for k, v in valor.items()))
+    if isinstance(valor, (list, tuple, set, frozenset, pd.Index, pd.Series)) or hasattr(valor, "tolist"):
+        elementos = valor.tolist() if hasattr(valor, "tolist") else list(valor)
+        if not isinstance(elementos, list):
+            # Escalar de numpy
+            return canonico(elementos)
+        return tuple(sorted((canonico(e) for e in elementos), key=repr))
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
+
+
+# ==========================================
+# CACHE
+# ==========================================
+class CacheResultados:
+    """LRU de resultados acotada por bytes y entradas, con calculo unico por clave"""
+
+    def __init__(self, max_bytes=MAX_BYTES, max_entradas=MAX_ENTRADAS, nombre="resultados"):
+        self.nombre = nombre
+        self.max_bytes = max_bytes
+        self.max_entradas = max_entradas
+        self.bytes = 0
+        self._entradas = OrderedDict()
+        self._en_curso = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def obtener(self, clave, calcular):
+        """Valor de `clave`; si no esta, lo calcula una sola vez aunque lo pidan varios hilos"""
+        while True:
+            with self._lock:
+                if clave in self._entradas:
+                    self._entradas.move_to_end(clave)
+                    incrementar("resultados:acierto")
+                    memoria.usar(self.nombre, clave)
+                    return self._entradas[clave][0]
+                evento = self._en_curso.get(clave)
+                if evento is None:
+                    evento = self._en_curso[clave] = threading.Event()
+                    break
+            incrementar("resultados:espera")
+            evento.wait()
+            # Si quien calculaba fallo, el siguiente intento lo calcula este hilo
+
+        incrementar("resultados:fallo")
+        try:
+            inicio = time.perf_counter()
+            valor = calcular()
+            self._guardar(clave, valor, (time.perf_counter() - inicio) * 1000)
+            return valor
+        finally:
+            with self._lock:
+                self._en_curso.pop(clave, None)
+            evento.set()
+
+    def _guardar(self, clave, valor, costo_ms):
+        tamano = memoria.tamano_profundo(valor)
+        if tamano > self.max_bytes:
+            return
+        desalojadas = []
+        with self._lock:
+            self._entradas[clave] = (valor, tamano)
+            self.bytes += tamano
+            while self.bytes > self.max_bytes or len(self._entradas) > self.max_entradas:
+                desalojada, (_, liberado) = self._entradas.popitem(last=False)
+                self.bytes -= liberado
+                desalojadas.append(desalojada)
+                incrementar("resultados:desalojo")
+        # Fuera del lock: el presupuesto puede llamar a liberar() de esta misma cache
+        for desalojada in desalojadas:
+            memoria.quitar(self.nombre, desalojada)
+        if clave not in desalojadas:
+            memoria.registrar(self.nombre, clave, tamano, costo_ms, functools.partial(self.liberar, clave))
+
+    def liberar(self, clave):
+        """Saca `clave` de la cache (lo llama el presupuesto de memoria)"""
+        with self._lock:
+            entrada = self._entradas.pop(clave, None)
+            if entrada is not None:
+                self.bytes -= entrada[1]
+
+    def limpiar(self):
+        with self._lock:
+            claves = list(self._entradas)
+            self._entradas.clear()
+            self.bytes = 0
+        for clave in claves:
+            memoria.quitar(self.nombre, clave)
+
+
+_cache = CacheResultados()
+
+
+def consultar(vista, fuentes, filtros, calcular, cache=None):
+    """Resultado de `calcular()` compartido entre sesiones.
+
+    `fuentes` es el DataFrame (o tupla de DataFrames) del que depende el resultado y
+    `filtros` el estado de los widgets que lo determinan. Con `fuentes=()` el resultado
+    depende solo de `filtros` (p. ej. la huella de un archivo subido). Los DataFrames resultantes se
+    congelan y quedan marcados con su propia version, asi pueden ser fuente de otra vista;
+    quien llama recibe una manija, nunca el objeto guardado en la cache.
+    """
+    fuentes = fuentes if isinstance(fuentes, tuple) else (fuentes,)
+    versiones = tuple(version_de(f) for f in fuentes)
+    if None in versiones:
+        return calcular()
+    clave = (vista, versiones, canonico(filtros))
+
+    def calcular_compartido():
+        valor = calcular()
+        if isinstance(valor, pd.DataFrame):
+            # La cache guarda su propio objeto: `valor` puede ser la manija de quien calculo.
+            # Un filtro que devuelve la misma fuente no le cambia su version
+            version = version_de(valor) or hashlib.sha1(repr(clave).encode("utf-8")).hexdigest()[:16]
+            valor = marcar_version(congelar(manija(valor)), version)
+        return valor
+
+    return entregar((cache if cache is not None else _cache).obtener(clave, calcular_compartido))
+
+
+def estado():
+    """Entradas y bytes de la cache del proceso"""
+    return {"entradas": len(_cache), "bytes": _cache.bytes, "max_bytes": _cache.max_bytes}
@@ -0,0 +1,94 @@
+"""Carga, filtros y agregaciones del monitor de servidores (Semana 1/app_servers.py)."""
+import json
+
+import pandas as pd
+
+from utils import compresion
+from utils.almacenamiento_async import AlmacenamientoAsync, ejecutar
+from utils.importaciones import importar_diferido
+from utils.metricas import cronometrar
+
+px = importar_diferido("plotly.express")
+
+PREFIX = "raw/"
+COLUMNAS = ['timestamp', 'server_id', 'status', 'cpu_usage', 'memory_usage', 'disk_usage', 'region']
+USO_COLS = ['cpu_usage', 'memory_usage', 'disk_usage']
+
+
+def listar_snapshots(almacenamiento, prefix=PREFIX):
+    """Snapshots JSON disponibles bajo `prefix` (la variante comprimida preferida de cada uno)"""
+    objetos = [obj for obj in almacenamiento.listar(prefix) if compresion.sin_extension(obj["Key"]).endswith(".json")]
+    return compresion.elegir_variantes(objetos, compresion.formatos_aceptados(almacenamiento))
+
+
+@cronometrar("carga:snapshots")
+def construir_df(almacenamiento, keys, max_concurrencia=16):
+    """Descarga los snapshots en paralelo y los une en un solo DataFrame"""
+    s3 = AlmacenamientoAsync(almacenamiento, max_concurrencia=max_concurrencia)
+    # Un snapshot que falla no tumba a los demas
+    def leer(key):
+        return pd.json_normalize(json.loads(compresion.descomprimir(almacenamiento.get(key), key)))
+
+    snapshots = ejecutar(s3.mapear(keys, leer))
+    data_frames = [df_temp for df_temp in snapshots.values() if not isinstance(df_temp, Exception)]
+
+    if data_frames:
+        df = pd.concat(data_frames, ignore_index=True)
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+    else:
+        df = pd.DataFrame(columns=COLUMNAS)
+    return df
+
+
+@cronometrar("filtro")
+def filtrar(df, status, server):
+    return df[(df['status'].isin(status)) & (df['server_id'].isin(server))]
+
+
+@cronometrar("agregacion:uso_promedio")
+def uso_promedio(filtered_df):
+    """Promedio de CPU, memoria y disco como tabla Recurso / Uso Promedio"""
+    usage_df = filtered_df[USO_COLS].mean().reset_index()
+    usage_df.columns = ['Recurso', 'Uso Promedio']
+    usage_df['Uso Promedio'] = usage_df['Uso Promedio'].round(2)
+    return usage_df
+
+
+@cronometrar("figura:estados")
+def figura_estados(df):
+    estados_count = df['status'].value_counts()
+    return px.pie(
+        estados_count,
+        values=estados_count.values,
+        names=estados_count.index,
+        title="Estados en servidores",
+        color_discrete_map={'ERROR': 'red', 'WARN': 'yellow', 'OK': 'green'}
+    )
+
+
+@cronometrar("figura:uso_promedio")
+def figura_uso(usage_df):
+    fig = px.bar(
+        usage_df,
+        x='Recurso',
+        y='Uso Promedio',
+        title="Uso Promedio de CPU, Memoria y Disco (en %)",
+        color='Recurso',
+        text='Uso Promedio'  # valor en la barra
+    )
+    fig.update_yaxes(range=[0, 100])
+    return fig
+
+
+@cronometrar("figura:uso_tiempo")
+def figura_uso_tiempo(uso_tiempo):
+    """Lineas de CPU, memoria y disco a lo largo del tiempo (ya agregadas por intervalo)"""
+    fig = px.line(
+        uso_tiempo,
+        x='timestamp',
+        y=USO_COLS,
+        title="Uso promedio por intervalo (en %)",
+        labels={'value': 'Uso (%)', 'variable': 'Recurso', 'timestamp': 'Tiempo'}
+    )
+    fig.update_yaxes(range=[0, 100])
+    return fig
@@ -0,0 +1,268 @@
+"""Graficas prearmadas del dashboard del Mundial para el portafolio (GitHub Pages).
+
+Cada visitante del portafolio que abria el dashboard necesitaba un proceso de Streamlit
+leyendo de S3, aunque casi todos ven solo la vista por default de cada seccion. Este
+build calcula esas vistas una vez (mismos filtros, agregaciones y figuras que
+app_proyecto.py, via utils/mundial.py) y las guarda como JSON:
+
+    graficas/manifiesto.json       secciones, fecha del build y tamaño de cada archivo
+    graficas/<seccion>.json        KPIs ya calculados + especificaciones de Plotly
+
+Las especificaciones llevan solo los datos agregados que dibuja cada figura (top 10,
+resumen por pais, distribucion de goles...), sin el template de Plotly: `graficas.html`
+aplica el tema del sitio y las dibuja en el navegador con plotly.js. Una seccion cuyos
+datasets no existen se omite y la pagina muestra las demas.
+
+Uso (lo corre .github/workflows/static.yml antes de publicar):
+    python -m utils.sitio_estatico --bucket xideralaws-curso-yalbani --salida graficas
+    python -m utils.sitio_estatico --backend local --ruta datos_locales
+"""
+import argparse
+import datetime
+import json
+import os
+
+from utils import agregacion, compresion, cubo, mundial
+from utils.almacenamiento import ObjetoNoEncontrado, crear_almacenamiento
+from utils.importaciones import importar_diferido
+
+pio = importar_diferido("plotly.io")
+
+PREFIX = "datos_limpios/"
+PREFIX_LAMBDA = "datos_limpios/lambda/"
+# Mismos datasets que carga app_proyecto.py
+KEYS = {
+    "asistencia": f"{PREFIX}tabla_final.csv",
+    "estadios": f"{PREFIX}df_grafica_individual.csv",
+    "resumen_paises": f"{PREFIX}tabla_ordenada_max.csv",
+    "victorias": f"{PREFIX}df_analisis_victoria.csv",
+    "goles": f"{PREFIX}df_conteo_goles.csv",
+    "proyeccion": f"{PREFIX}df_proyeccion_financiera.csv",
+    "top50_paises": f"{PREFIX_LAMBDA}analisis_top_50_ga_paises.csv",
+    "goleadores_top3": f"{PREFIX_LAMBDA}analisis_goleadores_top_3.csv",
+    "top10_paises_goleadores": f"{PREFIX_LAMBDA}analisis_top_10_paises_goleadores.csv",
+    "cubo": f"{PREFIX_LAMBDA}cubo_resultados.csv",
+}
+SALIDA = "graficas"
+MANIFIESTO = "manifiesto.json"
+
+
+# ==========================================
+# SERIALIZACION
+# ==========================================
+def especificacion(fig):
+    """data + layout de la figura sin el template (el sitio aplica su propio tema)"""
+    spec = json.loads(pio.to_json(fig, pretty=False))
+    spec.get("layout", {}).pop("template", None)
+    return spec
+
+
+def figura(id_figura, fig):
+    return {"id": id_figura, "spec": especificacion(fig)}
+
+
+def kpi(etiqueta, valor, detalle=None):
+    return {"etiqueta": etiqueta, "valor": valor, "detalle": detalle}
+
+
+def _numero(valor, decimales=0):
+    return f"{valor:,.{decimales}f}"
+
+
+# ==========================================
+# VISTAS POR DEFAULT DE CADA SECCION
+# ==========================================
+def seccion_asistencia(d):
+    df = d["asistencia"]
+    # Sin minimo de sold-out y con todos los años, como el sidebar al entrar
+    filtrado = mundial.filtrar_asistencia(df, 0, sorted(df['Year'].dropna().unique()))
+    top_10 = mundial.extremos_asistencia(filtrado, 10, mayores=True)
+    bottom_10 = mundial.extremos_asistencia(filtrado, 10, mayores=False)
+    eventos_llenos = int((df['Porcentaje_Llenado'] >= 95).sum())
+    return {
+        "titulo": "🏟️ Asistencia y Capacidad",
+        "kpis": [
+            kpi("📊 Total de Eventos", _numero(len(df))),
+            kpi("📈 Promedio de sold-out", f"{df['Porcentaje_Llenado'].mean():.1f}%"),
+            kpi("👥 Máxima Asistencia", _numero(df['HIGHEST_ATTENDANCE'].max())),
+            kpi("🎉 Eventos >95% Llenos", str(eventos_llenos), f"{eventos_llenos / len(df) * 100:.1f}%"),
+        ],
+        "figuras": [
+            figura("asistencia_top", mundial.figura_asistencia(
+                top_10, 'Top 10 Eventos con Mayor Porcentaje de Sold Out', 'Viridis')),
+            figura("asistencia_bottom", mundial.figura_asistencia(
+                bottom_10, 'Top 10 Eventos con Menor Porcentaje de Sold Out', 'Reds_r')),
+        ],
+    }
+
+
+def seccion_estadios(d):
+    df, resumen = d["estadios"], d["resumen_paises"]
+    top = agregacion.top_n(df, 'Capacity', agregacion.max_categorias(agregacion.NIVEL_DEFAULT))
+    return {
+        "titulo": "🌎 Estadios por País Local",
+        "kpis": [
+            kpi("🏟️ Total de Estadios", _numero(len(df))),
+            kpi("👥 Capacidad Total", _numero(df['Capacity'].sum())),
+            kpi("📊 Capacidad Promedio", _numero(df['Capacity'].mean())),
+        ],
+        "figuras": [
+            figura("capacidad_maxima", mundial.figura_capacidad_pais(
+                resumen, 'Capacidad_Maxima', 'Capacidad Máxima por País')),
+            figura("capacidad_promedio", mundial.figura_capacidad_pais(
+                resumen, 'Capacidad_Promedio', 'Capacidad Promedio por País')),
+            figura("estadios", mundial.figura_estadios(top)),
+        ],
+    }
+
+
+def seccion_goles(d):
+    df_victorias, df_goles = d["victorias"], d["goles"]
+    if d.get("cubo") is not None:
+        # Con el cubo, el dashboard arranca con el minimo de goles por default y todos los años
+        df_cubo = cubo.compactar(d["cubo"])
+        years = (int(df_cubo['year'].min()), int(df_cubo['year'].max()))
+        df_victorias = cubo.consultar_victorias(df_cubo, cubo.MIN_GOLES_DEFAULT, years)
+        df_goles = cubo.consultar_goles(df_cubo, cubo.MIN_GOLES_DEFAULT, years)
+    df_goles = mundial.preparar_goles(df_goles)
+    if df_victorias.empty or df_goles.empty:
+        return None
+    filtrado = mundial.filtrar_victorias(df_victorias, 5)
+    df_zoom = mundial.zoom_goles(df_goles, 12, 31)
+    categorias = agregacion.max_categorias(agregacion.NIVEL_DEFAULT)
+    figuras = [
+        figura("victoria_local", mundial.figura_victoria_local(filtrado, 15)),
+        figura("distribucion_goles", mundial.figura_distribucion_goles(
+            agregacion.top_n_con_otros(df_goles, 'total_goles_str', 'Total_Encuentros', categorias),
+            cubo.MIN_GOLES_DEFAULT)),
+    ]
+    if not df_zoom.empty:
+        figuras.append(figura("zoom_goles", mundial.figura_zoom_goles(df_zoom)))
+    return {
+        "titulo": "⚽ Análisis de Goles",
+        "kpis": [
+            kpi(f"⚽ Partidos ≥{cubo.MIN_GOLES_DEFAULT} Goles", _numero(df_victorias['Total_Partidos'].sum())),
+            kpi("🏠 Victoria Local Promedio", f"{df_victorias['Porcentaje_Victoria_Local'].mean():.1f}%"),
+            kpi("📊 Total Encuentros", _numero(df_goles['Total_Encuentros'].sum())),
+            kpi("🔥 Máximo de Goles", f"{df_goles['total_goles_num'].max()} goles"),
+        ],
+        "figuras": figuras,
+    }
+
+
+def seccion_proyeccion(d):
+    historico, proyectado = mundial.separar_proyeccion(d["proyeccion"])
+    if historico.empty:
+        return None
+    ultimo = historico['Total_Fund_Millions'].iloc[-1]
+    kpis = [kpi("💵 Último Fondo Real", f"${ultimo:.1f}M", f"Año {int(historico['Year'].iloc[-1])}")]
+    if not proyectado.empty:
+        proyeccion_2026 = proyectado['Total_Fund_Millions'].iloc[0]
+        kpis += [
+            kpi("🔮 Proyección 2026", f"${proyeccion_2026:.1f}M", f"+${proyeccion_2026 - ultimo:.1f}M"),
+            kpi("📈 Crecimiento Esperado", f"{(proyeccion_2026 - ultimo) / ultimo * 100:.1f}%", "vs último mundial"),
+        ]
+    return {
+        "titulo": "💰 Proyección Financiera",
+        "kpis": kpis,
+        "figuras": [figura("proyeccion", mundial.figura_proyeccion(historico, proyectado))],
+    }
+
+
+def seccion_jugadores(d):
+    top50, goleadores, paises = d["top50_paises"], d["goleadores_top3"], d["top10_paises_goleadores"]
+    categorias = agregacion.max_categorias(agregacion.NIVEL_DEFAULT)
+    return {
+        "titulo": "👤 Análisis de Jugadores",
+        "kpis": [
+            kpi("⭐ Jugadores Top 50 G+A", _numero(top50['Jugadores_Top_50'].sum())),
+            kpi("🎯 Goleadores Elite", _numero(len(goleadores))),
+            kpi("🌍 Países con más Goleadores", _numero(len(paises))),
+        ],
+        "figuras": [
+            figura("top50_paises", mundial.figura_top50_paises(
+                agregacion.top_n_con_otros(top50, 'COUNTRY', 'Jugadores_Top_50', categorias))),
+            # El slider de goles arranca en el minimo: todos los goleadores
+            figura("goleadores", mundial.figura_goleadores(goleadores, 20)),
+            figura("paises_goleadores", mundial.figura_pie_paises_goleadores(
+                agregacion.top_n_con_otros(paises, 'Pais_Equipo', 'Numero_de_Goleadores', categorias))),
+            figura("ranking_paises", mundial.figura_ranking_paises_goleadores(paises)),
+        ],
+    }
+
+
+# Seccion -> (funcion, datasets que necesita)
+SECCIONES = {
+    "asistencia": (seccion_asistencia, ("asistencia",)),
+    "estadios": (seccion_estadios, ("estadios", "resumen_paises")),
+    "goles": (seccion_goles, ("victorias", "goles")),
+    "proyeccion": (seccion_proyeccion, ("proyeccion",)),
+    "jugadores": (seccion_jugadores, ("top50_paises", "goleadores_top3", "top10_paises_goleadores")),
+}
+
+
+# ==========================================
+# BUILD
+# ==========================================
+def cargar_datasets(almacenamiento):
+    """{nombre: DataFrame} de los datasets que existen (la mejor variante de cada uno)"""
+    datasets = {}
+    for nombre, key in KEYS.items():
+        try:
+            datasets[nombre] = compresion.leer_csv(almacenamiento, key)
+        except ObjetoNoEncontrado:
+            print(f"⚠️ No existe {key}")
+    return datasets
+
+
+def _escribir_json(ruta, contenido):
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump(contenido, archivo, ensure_ascii=False, separators=(",", ":"))
+    return os.path.getsize(ruta)
+
+
+def construir(almacenamiento, salida=SALIDA):
+    """Escribe un JSON por seccion y el manifiesto en `salida`; devuelve el manifiesto"""
+    os.makedirs(salida, exist_ok=True)
+    datasets = cargar_datasets(almacenamiento)
+    secciones = []
+    for nombre, (construir_seccion, requeridos) in SECCIONES.items():
+        faltantes = [r for r in requeridos if datasets.get(r) is None or datasets[r].empty]
+        if faltantes:
+            print(f"⚠️ Se omite la seccion {nombre}: faltan {', '.join(faltantes)}")
+            continue
+        seccion = construir_seccion(datasets)
+        if seccion is None:
+            print(f"⚠️ Se omite la seccion {nombre}: sin datos")
+            continue
+        archivo = f"{nombre}.json"
+        tamano = _escribir_json(os.path.join(salida, archivo), {"seccion": nombre, **seccion})
+        secciones.append({"seccion": nombre, "titulo": seccion["titulo"], "archivo": archivo, "bytes": tamano})
+        print(f"✅ {archivo}: {len(seccion['figuras'])} graficas, {tamano / 1024:,.1f} KB")
+
+    manifiesto = {
+        "generado": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "bucket": almacenamiento.bucket,
+        "secciones": secciones,
+    }
+    _escribir_json(os.path.join(salida, MANIFIESTO), manifiesto)
+    return manifiesto
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera las graficas estaticas del portafolio")
+    parser.add_argument("--bucket", default=os.getenv("BUCKET_MUNDIAL", "xideralaws-curso-yalbani"))
+    parser.add_argument("--backend", choices=["s3", "local", "memoria"], default=None)
+    parser.add_argument("--ruta", help="Carpeta raiz del backend local (ALMACENAMIENTO_RUTA)")
+    parser.add_argument("--salida", default=SALIDA)
+    args = parser.parse_args()
+    if args.ruta:
+        os.environ["ALMACENAMIENTO_RUTA"] = args.ruta
+
+    manifiesto = construir(crear_almacenamiento(args.bucket, args.backend), args.salida)
+    if not manifiesto["secciones"]:
+        raise SystemExit("❌ No se genero ninguna seccion")
+
+
+if __name__ == "__main__":
+    main()